@@ -1,9 +1,15 @@
-
 # ===================
 # | IMPORT PACKAGES |
 # ===================
-# packages for incrementing the ants
-from random import random, randint, choices
+# package for scheduling when trails decay
+import heapq
+
+# packages for storing the trails' steps compactly
+from array import array
+import numpy as np
+
+# class for recording the ant hill's history
+from history_recorder import HistoryRecorder
 
 
 # ====================
@@ -18,86 +24,498 @@ class AllAntsDead(Exception):
 # ===================
 class Trail:
 
-    def __init__(self, trail_id, path):
+    def __init__(self, trail_id, length, number=0):
+        # the trail's steps are kept in the ant hill's trail store under the trail's id - its number orders the trails
+        # by when they were laid, as the store hands out the ids of dropped paths again
         self.id = trail_id
-        self.path = path
-        self.length = len(path)
+        self.length = length
         self.strength = 1
-        self.time_elapsed = 0
+        self.number = number
 
     def is_active(self):
         return self.strength > 0
 
 
+# ========================
+# |  FENWICK TREE CLASS  |
+# ========================
+class FenwickTree:
+    """
+    Keeps a running sum over a growing list of weights so that a weight can be changed, and a position
+    picked in proportion to the weights, in O(log n) time.
+    """
+
+    def __init__(self):
+        # the tree is 1-indexed - position 0 is unused
+        self.tree = [0]
+        self.total = 0
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def prefix_sum(self, i):
+        # sum of the first i weights
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def append(self, weight):
+        # each node holds the sum of the weights in the range that ends at it
+        i = len(self.tree)
+        self.tree.append(weight + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+        self.total += weight
+
+    def add(self, position, change):
+        i = position + 1
+        while i < len(self.tree):
+            self.tree[i] += change
+            i += i & -i
+        self.total += change
+
+    def find(self, target):
+        # find the first position whose running sum is above the target
+        position = 0
+        step = 1 << (len(self).bit_length() - 1) if len(self) else 0
+        while step:
+            if position + step < len(self.tree) and self.tree[position + step] <= target:
+                position += step
+                target -= self.tree[position]
+            step >>= 1
+        return min(position, len(self) - 1)
+
+
+# ==========================
+# |  TRAIL REGISTRY CLASS  |
+# ==========================
+class TrailRegistry:
+    """
+    Holds an ant hill's trails by id, along with the number of active trails and a Fenwick tree over their
+    strengths, so trails can be looked up, reinforced and picked by strength without scanning every trail.
+    """
+
+    def __init__(self):
+        self.trails = {}
+        self.positions = {}
+        self.trails_by_position = []
+        self.free_positions = []
+        self.strengths = FenwickTree()
+        self.num_active = 0
+
+    def __len__(self):
+        return len(self.trails)
+
+    def __iter__(self):
+        # iterate through the trails in the order they were made
+        return iter(self.trails.values())
+
+    def __contains__(self, trail_id):
+        return trail_id in self.trails
+
+    def get(self, trail_id):
+        return self.trails[trail_id]
+
+    def add(self, trail):
+        # re-use the position of a removed trail if there is one
+        self.trails[trail.id] = trail
+        if self.free_positions:
+            position = self.free_positions.pop()
+            self.trails_by_position[position] = trail
+            self.strengths.add(position, trail.strength)
+        else:
+            position = len(self.strengths)
+            self.trails_by_position.append(trail)
+            self.strengths.append(trail.strength)
+        self.positions[trail.id] = position
+        if trail.is_active():
+            self.num_active += 1
+
+    def remove(self, trail_id):
+        # take the trail out of the registry entirely, freeing its position for the next trail
+        trail = self.trails.pop(trail_id)
+        position = self.positions.pop(trail_id)
+        self.strengths.add(position, -trail.strength)
+        self.trails_by_position[position] = None
+        self.free_positions.append(position)
+        if trail.is_active():
+            self.num_active -= 1
+
+    def change_strength(self, trail_id, change):
+        # keep the active count & the strength tree in step with the trail
+        trail = self.trails[trail_id]
+        was_active = trail.is_active()
+        trail.strength += change
+        self.strengths.add(self.positions[trail_id], change)
+        self.num_active += trail.is_active() - was_active
+
+    def sample(self, uniform_draw):
+        # pick a trail in proportion to its strength - the position of uniform_draw in the running total of the strengths
+        position = self.strengths.find(uniform_draw * float(self.strengths.total))
+        return self.trails_by_position[position]
+
+
+# =========================
+# |   TRAIL STORE CLASS   |
+# =========================
+class TrailStore:
+    """
+    Holds the steps of every trail, and of every ant's way home, back to back in one packed int8 buffer.
+    Ants follow a path through its id & a step count rather than holding their own copy, and the space
+    a path takes up is reclaimed once no ant or trail refers to it - its id is handed out again too, so
+    the store's size follows the paths in use rather than every path ever added.
+    """
+
+    def __init__(self, capacity=1024):
+
+        # the (x, y) steps of all the paths
+        self.steps = np.zeros((capacity, 2), dtype=np.int8)
+        self.size = 0
+        self.num_free_steps = 0
+
+        # where each path starts in the buffer, how long it is & how many ants or trails refer to it
+        self.num_paths = 0
+        self.offsets = np.zeros(capacity, dtype=np.int64)
+        self.lengths = np.zeros(capacity, dtype=np.int64)
+        self.refcounts = np.zeros(capacity, dtype=np.int64)
+
+        # the ids below num_paths of the paths dropped when the store was last compacted - handed out before new ids -
+        # & the number of paths nothing has referred to since
+        self.free_ids = np.zeros(0, dtype=np.int64)
+        self.num_free_paths = 0
+
+    def __getstate__(self):
+
+        # only save the parts of the buffers in use - along with their capacities so they are restored to the same size
+        state = dict(self.__dict__)
+        state["capacities"] = {"steps": len(self.steps), "paths": len(self.offsets)}
+        state["steps"] = self.steps[:self.size].copy()
+        for field in ["offsets", "lengths", "refcounts"]:
+            state[field] = getattr(self, field)[:self.num_paths].copy()
+        return state
+
+    def __setstate__(self, state):
+        capacities = state.pop("capacities")
+        self.__dict__.update(state)
+        self.steps = grow_array(self.steps, capacities["steps"])
+        for field in ["offsets", "lengths", "refcounts"]:
+            setattr(self, field, grow_array(getattr(self, field), capacities["paths"]))
+
+    def reserve(self, lengths):
+
+        # make room for a number of new paths & return their ids - the caller fills in their steps
+        lengths = np.asarray(lengths, dtype=np.int64)
+        num_steps = int(lengths.sum())
+        num_new_ids = max(len(lengths) - len(self.free_ids), 0)
+        steps_full = self.size + num_steps > len(self.steps)
+        ids_full = self.num_paths + num_new_ids > len(self.offsets)
+        if (steps_full and 2 * self.num_free_steps >= self.size) or (ids_full and 2 * self.num_free_paths >= self.num_paths):
+            self.compact()
+            num_new_ids = max(len(lengths) - len(self.free_ids), 0)
+        if steps_full:
+            in_use = self.size + num_steps
+            if not (2 * in_use <= len(self.steps) <= 8 * in_use):
+                self.steps = resize_array(self.steps[:self.size], 2 * in_use)
+        if self.num_paths + num_new_ids > len(self.offsets):
+            self.resize_ids(max(self.num_paths + num_new_ids, 2 * len(self.offsets)))
+
+        # give the paths the dropped paths' ids first, then new ones - & place them one after another at the end of the buffer
+        num_reused = len(lengths) - num_new_ids
+        path_ids = np.concatenate([self.free_ids[:num_reused], np.arange(self.num_paths, self.num_paths + num_new_ids)])
+        self.free_ids = self.free_ids[num_reused:]
+        self.offsets[path_ids] = self.size + np.cumsum(lengths) - lengths
+        self.lengths[path_ids] = lengths
+        self.num_paths += num_new_ids
+        self.size += num_steps
+        return path_ids
+
+    def resize_ids(self, new_capacity):
+        # copy the ids' offsets, lengths & reference counts into arrays of a new size - which may be smaller
+        self.offsets = resize_array(self.offsets, new_capacity)
+        self.lengths = resize_array(self.lengths, new_capacity)
+        self.refcounts = resize_array(self.refcounts, new_capacity)
+
+    def add_path(self, steps):
+        path_id = int(self.reserve([len(steps)])[0])
+        self.get_path(path_id)[:] = steps
+        return path_id
+
+    def get_path(self, path_id):
+        offset = self.offsets[path_id]
+        return self.steps[offset:offset + self.lengths[path_id]]
+
+    def get_length(self, path_id):
+        return int(self.lengths[path_id])
+
+    def get_step(self, path_id, step_num):
+        step = self.steps[self.offsets[path_id] + step_num]
+        return int(step[0]), int(step[1])
+
+    def is_in_use(self, path_id):
+        # whether an ant or trail refers to the path - ids past the ones in use may have been let go
+        return path_id < self.num_paths and self.refcounts[path_id] > 0
+
+    def acquire(self, path_ids):
+        if np.ndim(path_ids) == 0:
+            self.refcounts[path_ids] += 1
+        else:
+            np.add.at(self.refcounts, path_ids, 1)
+
+    def release(self, path_ids):
+        # once nothing refers to a path its steps are free to be reclaimed
+        if np.ndim(path_ids) == 0:
+            self.refcounts[path_ids] -= 1
+            if self.refcounts[path_ids] == 0:
+                self.num_free_steps += int(self.lengths[path_ids])
+                self.num_free_paths += 1
+        else:
+            np.subtract.at(self.refcounts, path_ids, 1)
+            released = np.unique(path_ids)
+            released = released[self.refcounts[released] == 0]
+            self.num_free_steps += int(self.lengths[released].sum())
+            self.num_free_paths += len(released)
+
+    def compact(self):
+
+        # move the paths that are still in use to the start of the buffer
+        in_use = np.flatnonzero(self.refcounts[:self.num_paths] > 0)
+        lengths = self.lengths[in_use]
+        new_offsets = np.cumsum(lengths) - lengths
+        moved_from = np.repeat(self.offsets[in_use] - new_offsets, lengths) + np.arange(int(lengths.sum()))
+        self.steps[:len(moved_from)] = self.steps[moved_from]
+        self.offsets[in_use] = new_offsets
+        self.size = len(moved_from)
+        self.num_free_steps = 0
+
+        # the ids of the paths dropped are handed out again, lowest first - & the ids past the last path in use are let go
+        old_num_paths = self.num_paths
+        self.num_paths = int(in_use[-1]) + 1 if len(in_use) else 0
+        is_free = np.ones(self.num_paths, dtype=bool)
+        is_free[in_use] = False
+        self.free_ids = np.flatnonzero(is_free)
+        self.offsets[self.free_ids], self.lengths[self.free_ids] = 0, 0
+        self.offsets[self.num_paths:old_num_paths], self.lengths[self.num_paths:old_num_paths] = 0, 0
+        self.num_free_paths = 0
+        if len(self.offsets) > max(8 * self.num_paths, 1024):
+            self.resize_ids(max(2 * self.num_paths, 1024))
+
+
 # ==================
 # | ANT HILL CLASS |
 # ==================
+# the values recorded about the ant hill every tick & their types
+anthill_history_columns = {
+    "num_active_ants": np.int64,
+    "num_ant_eggs": np.int64,
+    "num_ant_larvae": np.int64,
+    "num_ant_pupa": np.int64,
+    "num_dead_ants": np.int64,
+    "food_collected": np.float64,
+}
+
+
 class AntHill:
 
-    def __init__(self, population_size, x_location, y_location):
+    def __init__(self, population_size, x_location, y_location, trail_depreciation_time, return_path_compression="none", history_path=None,
+                 pheromones=None):
 
         # define the ant hill's location
         self.x_loc = x_location
         self.y_loc = y_location
 
-        # define a list of ants in the hill
-        self.ants = list(range(population_size))
+        # define the set of ants in the hill - a set so an ant can be added or removed without scanning the others
+        self.ants = set(range(population_size))
 
         # keep track of how long since last newborn
         self.time_since_last_new_ant = 0
 
+        # keep track of the next unused ant id - ids are never reused, even once an ant has died
+        self.next_ant_id = population_size
+
+        # keep track of how many ants have died
+        self.dead_ant_count = 0
+
         # define the amount of food in the ant hill
         self.food_count = 0
 
-        # define a list of trails from the ant hill to food
+        # define the trails from the ant hill to food - indexed by id & weighted by strength
         self.num_trails = 0
-        self.trails = []
+        self.trails = TrailRegistry()
+
+        # define the store holding the steps of the trails & the ants' ways home
+        self.trail_store = TrailStore()
+
+        # keep track of how the ants' searches are shortened into their ways home
+        self.return_path_compression = return_path_compression
+        self.num_search_steps = 0
+        self.num_return_steps = 0
+
+        # keep track of all the food that has been brought back, including what has since been eaten
+        self.food_brought_back = 0
 
-        # track the state of the simulation at any given time
-        self.num_active_ants = []
-        self.num_ant_eggs = []
-        self.num_ant_larvae = []
-        self.num_ant_pupa = []
-        self.food_collected = []
+        # keep a heap of (time of next decay, trail number, trail id) so only the trails due to decay are visited each tick
+        # - the trails due at the same time decay in the order they were laid
+        self.trail_depreciation_time = trail_depreciation_time
+        self.trail_clock = 0
+        self.trail_decay_schedule = []
+
+        # the colony's pheromone on the map when the ants lay it on a grid rather than keeping each trail as a route
+        self.pheromones = pheromones
+
+        # track the state of the simulation at any given time - streamed to the history file if there is one
+        self.history = HistoryRecorder(anthill_history_columns, history_path)
 
     def __contains__(self, ant):
         return (ant.x_loc == self.x_loc) and (ant.y_loc == self.y_loc)
 
     def remove(self, ant):
-        if ant.id in self.ants:
-            self.ants.remove(ant.id)
+        self.ants.discard(ant.id)
 
     def add(self, ant):
-        if ant.id not in self.ants:
-            self.ants.append(ant.id)
-
-    def get_trail(self):
-        strength_list = []
-        id_and_path_list = []
-        # iterate through the trails and get a list of the active trails & their pheromone strengths
-        for trail in self.trails:
+        self.ants.add(ant.id)
+
+    def new_ant_id(self):
+        ant_id = self.next_ant_id
+        self.next_ant_id += 1
+        return ant_id
+
+    def add_return_path(self, search_steps):
+        # shorten the search (if asked to) & store the way home - the search retraced backwards
+        search_steps = np.frombuffer(search_steps, dtype=np.int8).reshape(-1, 2)
+        route_steps = compress_search(search_steps, self.return_path_compression)
+        self.num_search_steps += len(search_steps)
+        self.num_return_steps += len(route_steps)
+        return self.trail_store.add_path(-route_steps[::-1])
+
+    def get_trail(self, uniform_draw):
+        # return the id of one active trail based on the pheromone strength of that trail
+        return self.trails.sample(uniform_draw).id
+
+    def add_trail(self, path_id):
+        self.num_trails += 1
+        # create instance of trail class - the trail shares its steps with the ant that found it
+        trail = Trail(path_id, self.trail_store.get_length(path_id), self.num_trails)
+        self.trail_store.acquire(path_id)
+        # add this to the other trails & schedule its first decay
+        self.trails.add(trail)
+        self.schedule_trail_decay(trail)
+
+    def schedule_trail_decay(self, trail):
+        # a trail loses one strength every (trail_depreciation_time * length + 1) ticks
+        next_decay_time = self.trail_clock + self.trail_depreciation_time * trail.length + 1
+        heapq.heappush(self.trail_decay_schedule, (next_decay_time, trail.number, trail.id))
+
+    def decay_trails(self):
+        # move the trail clock on by one tick & decay the trails that are due - or evaporate the pheromone on the map
+        self.trail_clock += 1
+        if self.pheromones is not None:
+            self.pheromones.update()
+        while self.trail_decay_schedule and self.trail_decay_schedule[0][0] <= self.trail_clock:
+            _, _, trail_id = heapq.heappop(self.trail_decay_schedule)
+            self.decrease_trail_strength(trail_id)
+            # fully decayed trails leave the registry - the rest wait for their next decay
+            trail = self.trails.get(trail_id)
             if trail.is_active():
-                id_and_path_list.append((trail.id, trail.path))
-                strength_list.append(trail.strength)
-        # return one trail based on the pheromone strength of that trail
-        return choices(population=id_and_path_list, weights=strength_list, k=1)[0]
+                self.schedule_trail_decay(trail)
+            else:
+                self.trails.remove(trail_id)
+                self.trail_store.release(trail_id)
 
-    def add_trail(self, trail_path):
-        self.num_trails += 1
-        # create instance of trail class
-        trail = Trail(self.num_trails, trail_path)
-        # add this to the other trails
-        self.trails.append(trail)
+    def has_trail(self, id):
+        return id in self.trails
 
     def increase_trail_strength(self, id):
-        for trail in self.trails:
-            if trail.id == id:
-                trail.strength += 1
+        if id in self.trails:
+            self.trails.change_strength(id, 1)
+
+    def decrease_trail_strength(self, id):
+        if id in self.trails:
+            self.trails.change_strength(id, -1)
 
     def has_active_trails(self):
-        for trail in self.trails:
-            if trail.is_active():
-                return True
+        if self.pheromones is not None:
+            return self.pheromones.has_scent_near(self.x_loc, self.y_loc)
+        return self.trails.num_active > 0
+
+
+# ===================
+# |  COLONY CLASS   |
+# ===================
+class Colony:
+    """
+    One colony on the map - its ant hill & its ants. The ants are a list of Ant objects (with the eggs waiting in
+    a LifecycleScheduler) or an AntPopulation, depending on the simulation engine.
+    """
+
+    def __init__(self, index, anthill, ants_list=None, ant_lifecycle=None, ant_population=None):
+        self.index = index
+        self.anthill = anthill
+        self.ants_list = ants_list
+        self.ant_lifecycle = ant_lifecycle
+        self.ant_population = ant_population
+
+    def __len__(self):
+        # the number of living ants, including the eggs
+        if self.ant_population is not None:
+            return len(self.ant_population)
+        return len(self.ants_list) + len(self.ant_lifecycle)
+
+
+# ================================
+# |  LIFECYCLE SCHEDULER CLASS   |
+# ================================
+class LifecycleScheduler:
+    """
+    Holds the eggs in a timer wheel - a ring of buckets indexed by the tick an egg is next due to change - so they
+    aren't visited until they hatch (or die of old age). Also keeps the number of ants at each stage, updated as
+    the ants develop or die rather than recounted every tick.
+    """
+
+    def __init__(self, time_till_egg_hatch, max_lifespan, num_slots=256):
+
+        # an egg is due once it hatches - or dies of old age if that comes first
+        self.egg_due_age = min(time_till_egg_hatch, max_lifespan)
+
+        # each bucket holds the (due tick, egg) pairs for the ticks that share its place on the ring
+        self.wheel = [[] for _ in range(num_slots)]
+        self.num_eggs_scheduled = 0
+
+        # the number of living ants at each stage
+        self.stage_counts = {"egg": 0, "larvae": 0, "pupa": 0, "mature": 0}
+
+    def __len__(self):
+        return self.num_eggs_scheduled
+
+    def get_scheduled_eggs(self):
+        # the eggs in the wheel & the ticks they are due - in the order they were laid
+        return sorted((entry for bucket in self.wheel for entry in bucket), key=lambda entry: entry[1].id)
+
+    def add(self, stage, num_ants=1):
+        self.stage_counts[stage] += num_ants
+
+    def add_egg(self, egg, due_time):
+        self.wheel[due_time % len(self.wheel)].append((due_time, egg))
+        self.num_eggs_scheduled += 1
+        self.add("egg")
+
+    def pop_due_eggs(self, current_time):
+
+        # take the eggs due this tick out of their bucket - leaving the ones due on a later turn of the ring
+        bucket = self.wheel[current_time % len(self.wheel)]
+        if not bucket:
+            return []
+        due_eggs = sorted((egg for due_time, egg in bucket if due_time == current_time), key=lambda egg: egg.id)
+        if due_eggs:
+            bucket[:] = [(due_time, egg) for due_time, egg in bucket if due_time != current_time]
+            self.num_eggs_scheduled -= len(due_eggs)
+        return due_eggs
+
+    def change_stage(self, old_stage, new_stage):
+        self.stage_counts[old_stage] -= 1
+        self.stage_counts[new_stage] += 1
+
+    def remove(self, stage):
+        self.stage_counts[stage] -= 1
 
 
 # ===================
@@ -123,17 +541,16 @@ class Ant:
         self.carrying_status = 0
         self.num_food_carrying = 0
 
-        # define whether the ant is following a trail or searching
+        # define whether the ant is following a trail or searching - the trail (or the way home) is a path
+        # in the ant hill's trail store & the search is kept as packed (x, y) steps
         self.following_status = 0
         self.food_scent_id = None
-        self.food_scent_trail = []
-        self.food_search_trail = []
+        self.food_scent_length = 0
+        self.food_search_trail = array('b')
 
-        # define the generators for incrementing the ants steps
+        # define the number of steps taken along the path to food & back to the ant hill
         self.count_steps_out = 0
-        self.to_food_increment = None
         self.count_steps_back = 0
-        self.to_anthill_increment = None
 
     def update_location(self, x, y, anthill):
         # simulate random motion but ensure the ant doesn't move off the screen
@@ -145,8 +562,8 @@ class Ant:
         else:
             anthill.remove(self)
 
-    def set_following_status(self, follow_prob):
-        self.following_status = 1 if random() < follow_prob else 0
+    def set_following_status(self, follow_prob, uniform_draw):
+        self.following_status = 1 if uniform_draw < follow_prob else 0
 
     def is_follower(self):
         return bool(self.following_status)
@@ -157,39 +574,74 @@ class Ant:
     def is_alive_and_mature(self):
         return self.maturity_status == "mature"
 
-    def increment_to_food(self):
-        for x, y in reversed(self.food_scent_trail):
-            yield -x, -y
-
-    def increment_to_anthill(self):
-        for x, y in self.food_scent_trail:
-            yield x, y
-
-    def move_towards_food(self, anthill, env_width, env_height):
-        # if finding food following a trail - get the next increment on the trail
-        if self.is_follower():
+    def set_food_scent(self, trail_store, path_id):
+        # swap the path the ant is following, keeping the trail store's reference counts up to date
+        if path_id is not None:
+            trail_store.acquire(path_id)
+        if self.food_scent_id is not None:
+            trail_store.release(self.food_scent_id)
+        self.food_scent_id = path_id
+        self.food_scent_length = 0 if path_id is None else trail_store.get_length(path_id)
+
+    def move_towards_food(self, anthill, env_width, env_height, random_increment):
+        # if finding food following a trail - get the next increment on the trail (walking it backwards)
+        # (followers of the pheromone on the map are given their step uphill as their increment)
+        if self.is_follower() and anthill.pheromones is None:
             self.count_steps_out += 1
-            x_increment, y_increment = next(self.to_food_increment)
+            x_increment, y_increment = anthill.trail_store.get_step(self.food_scent_id, self.food_scent_length - self.count_steps_out)
+            x_increment, y_increment = -x_increment, -y_increment
         # if not following a trail - get the next random increment
         else:
-            # generate random increments
-            rand_x_increment = randint(-1, 1)
-            rand_y_increment = randint(-1, 1)
+            # use the random increments drawn for this ant
+            rand_x_increment, rand_y_increment = random_increment
             # adjust these increments so the point stays on the screen
             x_increment = ensure_val_stays_in_window(self.x_loc + rand_x_increment, 0, env_width - 1) - self.x_loc
             y_increment = ensure_val_stays_in_window(self.y_loc + rand_y_increment, 0, env_height - 1) - self.y_loc
         # keep track of the points movements
-        self.food_search_trail.append((x_increment, y_increment))
+        self.food_search_trail.extend((x_increment, y_increment))
         # update the ants location
         self.update_location(x_increment, y_increment, anthill)
 
     def move_towards_anthill(self, anthill):
         # get the next increments back to the ant hill & move the ant in this direction
         self.count_steps_back += 1
-        x_back_increment, y_back_increment = next(self.to_anthill_increment)
+        if anthill.pheromones is not None:
+            anthill.pheromones.lay(self.x_loc, self.y_loc, self.food_scent_length - self.count_steps_back + 1, self.food_scent_length)
+        x_back_increment, y_back_increment = anthill.trail_store.get_step(self.food_scent_id, self.count_steps_back - 1)
         self.update_location(x_back_increment, y_back_increment, anthill)
 
 
+def compress_search(search_steps, method):
+
+    # keep the search as it was walked
+    if method == "none":
+        return search_steps
+
+    # head straight from the ant hill to the food - diagonally first, then along the remaining axis
+    if method == "net":
+        x_distance, y_distance = search_steps.sum(axis=0, dtype=np.int64)
+        num_diagonal = min(abs(x_distance), abs(y_distance))
+        num_straight = max(abs(x_distance), abs(y_distance)) - num_diagonal
+        straight_step = (np.sign(x_distance), 0) if abs(x_distance) > abs(y_distance) else (0, np.sign(y_distance))
+        steps = [(np.sign(x_distance), np.sign(y_distance))] * num_diagonal + [straight_step] * num_straight
+        return np.array(steps, dtype=np.int8).reshape(-1, 2)
+
+    # cut every loop out of the search - from each cell, jump to the last time it was visited & carry on from there
+    if method == "loop_erased":
+        positions = np.zeros((len(search_steps) + 1, 2), dtype=np.int64)
+        np.cumsum(search_steps, axis=0, out=positions[1:])
+        _, cell_of_position = np.unique(positions, axis=0, return_inverse=True)
+        last_visit = np.zeros(cell_of_position.max() + 1, dtype=np.int64)
+        np.maximum.at(last_visit, cell_of_position, np.arange(len(positions)))
+        last_visit_of_position = last_visit[cell_of_position].tolist()
+        kept = [last_visit_of_position[0]]
+        while kept[-1] < len(search_steps):
+            kept.append(last_visit_of_position[kept[-1] + 1])
+        return np.diff(positions[kept], axis=0).astype(np.int8)
+
+    raise ValueError("Unknown return path compression '{}'".format(method))
+
+
 def ensure_val_stays_in_window(val, window_start, window_end):
     if val < window_start:
         return window_start
@@ -197,3 +649,17 @@ def ensure_val_stays_in_window(val, window_start, window_end):
         return window_end
     else:
         return val
+
+
+def grow_array(values, new_capacity):
+
+    # copy an array into a bigger one, keeping its type & any trailing dimensions
+    new_values = np.zeros((new_capacity,) + values.shape[1:], dtype=values.dtype)
+    new_values[:len(values)] = values
+    return new_values
+
+
+def resize_array(values, new_capacity):
+
+    # copy the values in use into an array of a new size, which may be smaller than the current one
+    return grow_array(values[:new_capacity], new_capacity)
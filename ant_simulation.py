@@ -1,195 +1,302 @@
-
 # ===================
 # | IMPORT PACKAGES |
 # ===================
 # packages for reading from yaml file
+import os
 import yaml
 
+# package for spreading the colonies over the map
+import math
+
 # package for creating the environment
 import numpy as np
 
-# package for plotting the current state
-import matplotlib.cm as cm
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
+# package for grouping the values drawn in each frame
+from collections import namedtuple
 
-# packages for incrementing the ants
-from random import random, randint
+# package for storing the ants' searches compactly
+from array import array
+
+# package for saving & restoring the state of the simulation
+import pickle
 
 
 # ===================
 # | IMPORT CLASSES  |
 # ===================
-# class for the GUI
-import gui_class
-
 # class for the ants
 import ant_classes
 
+# class storing the ants as arrays for the vectorised engine
+import vectorised_ants
+
+# class storing the food on the map
+from food_grid import FoodGrid
+
+# class timing the phases of each tick when profiling is turned on
+from phase_profiler import PhaseProfiler
+
+# class counting the ants at each location
+from occupancy_grid import OccupancyGrid
+
+# class holding the pheromone on the map when the trails are laid on a grid
+from pheromone_grid import PheromoneGrid
+
+# the counter-based random streams - keyed on each ant rather than drawn in turn
+import random_streams
+from random_streams import AntRandoms
+
+# class publishing the frames drawn through shared memory
+from shared_frames import SharedFrameBuffers
+
 
 # ===================================
 # | READ CONFIG VARIABLES FROM YAML |
 # ===================================
-# read in the yaml file
-with open("ant_simulation_config.yaml", "r") as config:
-    config_variables = yaml.load(config, Loader=yaml.FullLoader)
-
-# extract the variables from the config file
-env_width = config_variables["environment_width"]
-env_height = config_variables["environment_height"]
-starting_population_size = config_variables["starting_population_size"]
-environment_starting_tree_percent = config_variables["environment_starting_tree_percent"]
-tree_spawn_prob = config_variables["tree_spawn_prob"]
-max_food_per_location = config_variables["max_food_per_location"]
-follow_prob = config_variables["follow_prob"]
-trail_depreciation_time = config_variables["trail_depreciation_time"]
-max_lifespan = config_variables["max_lifespan"]
-max_without_food = config_variables["max_without_food"]
-time_till_hungry = config_variables["time_till_hungry"]
-num_ants_laid_daily = config_variables["num_ants_laid_daily"]
-time_till_egg_hatch = config_variables["time_till_egg_hatch"]
-time_till_larvae_become_pupa = config_variables["time_till_larvae_become_pupa"]
-time_till_pupa_become_mature_ants = config_variables["time_till_pupa_become_mature_ants"]
-num_food_brought_back_to_nest = config_variables["num_food_brought_back_to_nest"]
+# the config file that sits beside this script is used unless another one is given
+default_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ant_simulation_config.yaml")
+
+
+# the ways the ants can be stored & updated
+simulation_engines = ("object", "vectorised")
+
+# the ways an ant's search can be shortened into its way home
+return_path_compressions = ("none", "loop_erased", "net")
+
+# the ways the trails to food can be kept - as routes picked by their strength or as pheromone on the map
+trail_backends = ("routes", "grid")
+
+# the ways the random numbers can be drawn - in turn from one generator or keyed on the tick & ant
+random_stream_types = ("shared", "counter")
+
+
+def read_config_file(config_path):
+
+    # read in the yaml file
+    with open(config_path, "r") as config:
+        return yaml.load(config, Loader=yaml.FullLoader)
+
+
+def set_config_variables(new_config_variables):
+
+    global config_variables, env_width, env_height, starting_population_size, environment_starting_tree_percent, \
+        tree_spawn_prob, max_food_per_location, follow_prob, trail_depreciation_time, max_lifespan, max_without_food, \
+        time_till_hungry, num_ants_laid_daily, time_till_egg_hatch, time_till_larvae_become_pupa, \
+        time_till_pupa_become_mature_ants, num_food_brought_back_to_nest, simulation_engine, return_path_compression, \
+        random_seed, history_path, profile_phases, profile_ticks, profile_path, num_colonies, colony_locations, track_occupancy, \
+        trail_backend, pheromone_deposit, pheromone_evaporation, pheromone_diffusion, pheromone_threshold, random_stream_type, \
+        share_frames
+
+    # extract the variables from the config
+    config_variables = dict(new_config_variables)
+    env_width = config_variables["environment_width"]
+    env_height = config_variables["environment_height"]
+    starting_population_size = config_variables["starting_population_size"]
+    environment_starting_tree_percent = config_variables["environment_starting_tree_percent"]
+    tree_spawn_prob = config_variables["tree_spawn_prob"]
+    max_food_per_location = config_variables["max_food_per_location"]
+    follow_prob = config_variables["follow_prob"]
+    trail_depreciation_time = config_variables["trail_depreciation_time"]
+    max_lifespan = config_variables["max_lifespan"]
+    max_without_food = config_variables["max_without_food"]
+    time_till_hungry = config_variables["time_till_hungry"]
+    num_ants_laid_daily = config_variables["num_ants_laid_daily"]
+    time_till_egg_hatch = config_variables["time_till_egg_hatch"]
+    time_till_larvae_become_pupa = config_variables["time_till_larvae_become_pupa"]
+    time_till_pupa_become_mature_ants = config_variables["time_till_pupa_become_mature_ants"]
+    num_food_brought_back_to_nest = config_variables["num_food_brought_back_to_nest"]
+    random_seed = config_variables.get("random_seed")
+    history_path = config_variables.get("history_path")
+    profile_phases = config_variables.get("profile_phases") or False
+    profile_ticks = config_variables.get("profile_ticks")
+    profile_path = config_variables.get("profile_path")
+    colony_locations = config_variables.get("colony_locations")
+    num_colonies = len(colony_locations) if colony_locations else config_variables.get("num_colonies", 1)
+    track_occupancy = config_variables.get("track_occupancy") or False
+    simulation_engine = config_variables.get("simulation_engine", "object")
+    if simulation_engine not in simulation_engines:
+        raise ValueError("Unknown simulation engine '{}' - choose from {}".format(simulation_engine, simulation_engines))
+    return_path_compression = config_variables.get("return_path_compression", "none")
+    if return_path_compression not in return_path_compressions:
+        raise ValueError("Unknown return path compression '{}' - choose from {}".format(return_path_compression, return_path_compressions))
+    trail_backend = config_variables.get("trail_backend", "routes")
+    if trail_backend not in trail_backends:
+        raise ValueError("Unknown trail backend '{}' - choose from {}".format(trail_backend, trail_backends))
+    pheromone_deposit = config_variables.get("pheromone_deposit", 1.0)
+    pheromone_evaporation = config_variables.get("pheromone_evaporation", 0.05)
+    pheromone_diffusion = config_variables.get("pheromone_diffusion", 0.1)
+    pheromone_threshold = config_variables.get("pheromone_threshold", 0.01)
+    random_stream_type = config_variables.get("random_streams", "shared")
+    if random_stream_type not in random_stream_types:
+        raise ValueError("Unknown random streams '{}' - choose from {}".format(random_stream_type, random_stream_types))
+    share_frames = config_variables.get("share_frames") or False
+
+
+def load_config(config_path=default_config_path, overrides=None):
+
+    # read the config file & apply any overriding values on top of it
+    new_config_variables = read_config_file(config_path)
+    if overrides:
+        new_config_variables.update(overrides)
+    set_config_variables(new_config_variables)
+
+
+# read in the default config variables so the module can be used straight away
+load_config()
 
 
 # ===================================
 # | DEFINE FUNCTIONS FOR SIMULATION |
 # ===================================
-def initialise_environment():
+# times the phases of each tick - None unless profiling is turned on, so the ticks aren't slowed down otherwise
+profiler = None
 
-    global time, anthill, ants_list, envir
+# counts each colony's mature ants at each location - None unless track_occupancy is turned on
+occupancy = None
 
-    # initialise the time
-    time = 0
 
-    # define the anthill
-    anthill = ant_classes.AntHill(starting_population_size, env_width//2, env_height//2)
+def start_profiler():
+
+    # start timing the phases of a new (or restored) simulation if profiling is turned on - or a range of ticks is to be run under cProfile
+    global profiler
+    profiler = PhaseProfiler(profile_ticks, profile_path) if (profile_phases or profile_ticks) else None
+
+
+def draw_ant_randoms(num_ants):
+
+    # draw every ant's random step, following decision & trail choice for this tick in one go
+    # - indexed by the ant's place among the mature ants
+    steps = rng.integers(-1, 2, size=(num_ants, 2), dtype=np.int8)
+    follow = rng.random(num_ants)
+    trail = rng.random(num_ants)
+    return AntRandoms(steps, follow, trail)
+
+
+def get_colony_randoms(colony):
+
+    # the random numbers for the colony's tick - drawn in turn from the generator, or from the counter-based streams for
+    # each of the ant population's entries (the object engine keys them on its ant list once the due eggs have joined it)
+    if random_stream_type == "shared":
+        return draw_ant_randoms(len(colony))
+    if colony.ant_population is not None:
+        return random_streams.get_ant_randoms(stream_seed, time, colony.index, colony.ant_population.id[:colony.ant_population.size])
+    return None
+
+
+def get_stream_seed():
+    # the seed of the counter-based random streams - drawn from the generator when the run has no seed
+    if random_stream_type == "shared":
+        return None
+    return random_seed if random_seed is not None else int(rng.integers(2**63))
+
+
+def get_colony_locations():
+    # the locations of the ant hills of the config's colonies
+    return place_colonies(colony_locations, num_colonies, env_width, env_height)
+
+
+def place_colonies(locations, count, width, height):
+
+    # the locations of the ant hills - as listed in the config file, or spread evenly over the map (at its centre for one colony)
+    if locations:
+        return [(int(x_loc), int(y_loc)) for x_loc, y_loc in locations]
+    num_columns = math.isqrt(count - 1) + 1
+    num_rows = -(-count // num_columns)
+    return [((2 * (i % num_columns) + 1) * width // (2 * num_columns), (2 * (i // num_columns) + 1) * height // (2 * num_rows))
+            for i in range(count)]
+
+
+def get_colony_path(path, colony_index, colony_count):
+    # each colony's history gets its own file when there is more than one colony
+    if path is None or colony_count == 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return "{}_colony{}{}".format(root, colony_index + 1, extension)
+
 
-    # define the ants
+def create_colony(colony_index, x_loc, y_loc, colony_count):
+
+    # define the anthill - with its pheromone on the map if the trails are laid on a grid
+    pheromones = None
+    if trail_backend == "grid":
+        pheromones = PheromoneGrid(env_width, env_height, pheromone_deposit, pheromone_evaporation, pheromone_diffusion, pheromone_threshold)
+    anthill = ant_classes.AntHill(starting_population_size, x_loc, y_loc, trail_depreciation_time, return_path_compression,
+                                  get_colony_path(history_path, colony_index, colony_count), pheromones)
+
+    # define the ants - either as a list of Ant objects or as arrays for the vectorised engine
+    if simulation_engine == "vectorised":
+        ant_population = vectorised_ants.AntPopulation(config_variables, capacity=max(starting_population_size, 1024))
+        for i in range(starting_population_size):
+            ant_population.add_ant(i, vectorised_ants.MATURE, anthill.x_loc, anthill.y_loc)
+        return ant_classes.Colony(colony_index, anthill, ant_population=ant_population)
     ants_list = []
     for i in range(starting_population_size):
         ant = ant_classes.Ant(i, "mature", anthill.x_loc, anthill.y_loc)
         ants_list.append(ant)
+    ant_lifecycle = ant_classes.LifecycleScheduler(time_till_egg_hatch, max_lifespan)
+    ant_lifecycle.add("mature", starting_population_size)
+    return ant_classes.Colony(colony_index, anthill, ants_list=ants_list, ant_lifecycle=ant_lifecycle)
 
-    # define the environment
-    envir = np.zeros([env_height, env_width])
 
-    # plant trees in specific locations
-    for w in range(env_width):
-        for h in range(env_height):
-            # ensure we don't spawn food in the anthill
-            if w != anthill.x_loc and h != anthill.y_loc:
-                if random() < environment_starting_tree_percent:
-                    # spawn new tree to the map in this location
-                    envir[h, w] = randint(1, max_food_per_location)
+def set_first_colony():
 
+    # the first colony's ant hill & ants are also kept as module variables - the only colony in the default config
+    global anthill, ants_list, ant_lifecycle, ant_population
+    first_colony = colonies[0]
+    anthill, ants_list, ant_lifecycle, ant_population = first_colony.anthill, first_colony.ants_list, first_colony.ant_lifecycle, first_colony.ant_population
 
-def turn_hours_to_more_appealing_output(hours):
 
-    # get the number of weeks
-    weeks = hours // (24 * 7)
-    hours %= (24 * 7)
+# the shared memory the frames are published through - None unless the frames are shared
+frame_buffers = None
 
-    # get the number of days
-    days = hours // 24
-    hours %= 24
 
-    return "{} weeks, {} days, {} hours".format(weeks, days, hours)
+def start_frame_buffers():
 
+    # publish the food & ants drawn in each frame through shared memory if asked to - sized for the (new or restored) map
+    global frame_buffers
+    if frame_buffers is not None:
+        frame_buffers.close()
+    frame_buffers = SharedFrameBuffers(envir.shape, envir.dtype) if share_frames else None
 
-def plot_simulation_summary_stats(mature_pop_axis, immature_pop_axis, food_axis):
 
-    # plot the mature ant populations
-    if anthill.num_active_ants:
-        max_mpop_y_val = int(max(anthill.num_active_ants))
-        mature_pop_axis.set_ylim((-0.2*max_mpop_y_val, 1.2*max_mpop_y_val))
-        mpop_label_pad = 25 + max((5, 5*len(str(max_mpop_y_val))))
-    else:
-        mpop_label_pad = 30
-        mature_pop_axis.set_yticks([])
-    mature_pop_axis.plot(list(range(len(anthill.num_active_ants))), anthill.num_active_ants)
-    mature_pop_axis.set_ylabel("Mature\nPopulation", size=10, rotation='horizontal', labelpad=mpop_label_pad)
-    mature_pop_axis.set_xticks([])
-
-    # plot the immature ant populations
-    if anthill.num_ant_eggs:
-        max_impop_y_val = 0
-        for i in range(len(anthill.num_ant_eggs)):
-            i_val = int(anthill.num_ant_eggs[i]) + int(anthill.num_ant_larvae[i]) + int(anthill.num_ant_pupa[i])
-            if i_val > max_impop_y_val:
-                max_impop_y_val = i_val
-        if max_impop_y_val != 0:
-            immature_pop_axis.set_ylim((-0.2*max_impop_y_val, 1.2*max_impop_y_val))
-        else:
-            immature_pop_axis.axhline(y=0)
-        impop_label_pad = 25 + max((5, 5*len(str(max_impop_y_val))))
-    else:
-        impop_label_pad = 30
-        immature_pop_axis.set_yticks([])
-    immature_pop_axis.stackplot(list(range(len(anthill.num_ant_eggs))), anthill.num_ant_eggs, anthill.num_ant_larvae, anthill.num_ant_pupa, labels=["Ant Eggs", "Ant Larvea", "Ant Pupa"])
-    immature_pop_axis.set_ylabel("Immature\nPopulation", size=10, rotation='horizontal', labelpad=impop_label_pad)
-    immature_pop_axis.set_xticks([])
-
-    # plot the food supply
-    if anthill.food_collected:
-        max_food_y_val = max(anthill.food_collected)
-        if max_food_y_val != 0:
-            food_axis.set_ylim((-0.2*max_food_y_val, 1.2*max_food_y_val))
-        food_label_pad = 15 + max((5, 5*len(str(int(max_food_y_val)))))
+def start_occupancy():
+
+    # count each colony's mature ants at each location if asked to
+    global occupancy
+    occupancy = None
+    if track_occupancy:
+        occupancy = OccupancyGrid(env_width, env_height, len(colonies))
+        for colony in colonies:
+            x, y, _ = get_mature_ant_states([colony])
+            occupancy.add_many(colony.index, x, y)
+
+
+def initialise_environment():
+
+    global time, rng, stream_seed, colonies, food_grid, envir
+
+    # initialise the time & the random number generator - the same seed gives the same run
+    time = 0
+    rng = np.random.default_rng(random_seed)
+    stream_seed = get_stream_seed()
+    start_profiler()
+
+    # define the colonies - each with its anthill & ants
+    colonies = [create_colony(i, x_loc, y_loc, num_colonies) for i, (x_loc, y_loc) in enumerate(get_colony_locations())]
+    set_first_colony()
+    start_occupancy()
+
+    # define the environment - envir is the food at each location, looked up directly as the ants move
+    food_grid = FoodGrid(env_width, env_height, max_food_per_location)
+    envir = food_grid.amounts
+
+    # plant trees in random locations - ensuring we don't spawn food in the rows or columns of the anthills
+    anthill_rows, anthill_columns = [colony.anthill.y_loc for colony in colonies], [colony.anthill.x_loc for colony in colonies]
+    if random_stream_type == "shared":
+        food_grid.plant(rng, environment_starting_tree_percent, max_food_per_location, anthill_rows, anthill_columns)
     else:
-        food_label_pad = 30
-        food_axis.set_yticks([])
-    food_axis.plot(list(range(len(anthill.food_collected))), anthill.food_collected)
-    food_axis.set_ylabel("Food\nSupply", size=10, rotation='horizontal', labelpad=food_label_pad)
-    food_axis.set_xlabel("Time (hrs)", size=10)
-
-
-def plot_environment_state(env_axis):
-
-    # plot the environments state
-    env_axis.imshow(envir, cmap=cm.YlOrRd, vmin=0, vmax=max_food_per_location)
-    env_axis.axis('off')
-    # plot the anthills location
-    env_axis.scatter(anthill.x_loc, anthill.y_loc, c="black")
-    # plot the coordinates of the ants that are alive
-    x = [ant.x_loc for ant in ants_list if ant.is_alive_and_mature()]
-    y = [ant.y_loc for ant in ants_list if ant.is_alive_and_mature()]
-    s = [ant.carrying_status for ant in ants_list if ant.is_alive_and_mature()]
-    env_axis.scatter(x, y, c=s, cmap=cm.bwr)
-
-
-def plot_current_state():
-
-    # set up this new plot
-    plt.clf()
-    fig = plt.gcf()
-    gs = fig.add_gridspec(nrows=1, ncols=2, wspace=0.7)
-
-    # set the title of the plot to be the time that has past in the simulation
-    fig.suptitle('Time Past = {}'.format(turn_hours_to_more_appealing_output(time)))
-
-    # plot the environments state
-    env_axis = fig.add_subplot(gs[0])
-    plot_environment_state(env_axis)
-
-    # plot summary graphs
-    summary_gs = gs[1].subgridspec(nrows=3, ncols=10, hspace=0.1)
-    mature_pop_axis = fig.add_subplot(summary_gs[0, 1:])
-    immature_pop_axis = fig.add_subplot(summary_gs[1, 1:])
-    food_axis = fig.add_subplot(summary_gs[2, 1:])
-    plot_simulation_summary_stats(mature_pop_axis, immature_pop_axis, food_axis)
-
-    # re-locate the graph labels
-    handles, labels = immature_pop_axis.get_legend_handles_labels()
-    fig.legend(handles, labels, loc='center right', fontsize="small")
-    '''
-    # make the figure become full screen
-    mng = plt.get_current_fig_manager()
-    mng.window.state('zoomed')
-    '''
-    # plot the figure
-    plt.show()
+        food_grid.plant_from_streams(stream_seed, environment_starting_tree_percent, max_food_per_location, anthill_rows, anthill_columns)
+    start_frame_buffers()
 
 
 def move_ant_toward_location(ant, x, y):
@@ -218,180 +325,525 @@ def eat_if_hungry(ant, time_till_hungry, anthill=None, envir=None, amount_eaten=
         ant.time_since_eaten += 1
 
 
-def update_state():
+def get_mature_ant_states(shown_colonies=None):
 
-    global time, anthill, ants_list, envir
+    # get the locations & carrying statuses of the ants that are alive and mature - in every colony unless given the colonies
+    x, y, s = [], [], []
+    for colony in colonies if shown_colonies is None else shown_colonies:
+        if colony.ant_population is not None:
+            colony_x, colony_y, colony_s = colony.ant_population.get_mature_ants()
+            x.extend(colony_x.tolist())
+            y.extend(colony_y.tolist())
+            s.extend(colony_s.tolist())
+        else:
+            x.extend(ant.x_loc for ant in colony.ants_list if ant.is_alive_and_mature())
+            y.extend(ant.y_loc for ant in colony.ants_list if ant.is_alive_and_mature())
+            s.extend(ant.carrying_status for ant in colony.ants_list if ant.is_alive_and_mature())
+    return x, y, s
 
-    # set helper variables
-    full_time_till_larvae_become_pupa = time_till_egg_hatch + time_till_larvae_become_pupa
-    full_time_till_pupa_become_mature_ants = full_time_till_larvae_become_pupa + time_till_pupa_become_mature_ants
 
-    # update the time
-    time += 1
+# a copy of everything drawn in a frame - so the simulation can carry on while the frame is drawn
+# (food_cells holds the flat indices of the locations with food, the ants are those of every colony, history_rows holds the first
+# colony's history from the hour history_start onwards & phase_summary the slowest phases of the ticks when profiling is turned on)
+# - when the frames are shared, the food & ants are None & are read from frame_buffers instead
+SimulationFrame = namedtuple("SimulationFrame", ["time", "anthill", "anthill_locations", "envir_shape", "food_cells", "food_amounts", "ant_x", "ant_y",
+                                                 "ant_carrying", "history_start", "history_rows", "phase_summary", "frame_buffers"])
 
-    # update the trail list over time
-    for trail in anthill.trails:
-        if trail.is_active() and trail.time_elapsed == trail_depreciation_time * trail.length:
-            trail.strength -= 1
-            trail.time_elapsed = 0
-        else:
-            trail.time_elapsed += 1
 
-    # update food on map
-    if random() < tree_spawn_prob:
-        # spawn new tree to the map
-        tree_x_loc = randint(0, env_width-1)
-        tree_y_loc = randint(0, env_height-1)
-        if (tree_x_loc != anthill.x_loc) or (tree_y_loc != anthill.y_loc):
-            # add tree in this location
-            envir[tree_y_loc, tree_x_loc] = randint(1, max_food_per_location)
+def get_frame(history_start=0):
 
-    # add new ants to the colony
-    if anthill.time_since_last_new_ant > (24/num_ants_laid_daily):
-        ant = ant_classes.Ant(len(ants_list)+1, "egg", anthill.x_loc, anthill.y_loc)
-        ants_list.append(ant)
-        anthill.time_since_last_new_ant = 0
+    # copy the current state - only the locations with food - along with the history from the given hour
+    # (the food & ants are written to the shared memory instead when the frames are shared - & copied if that frame is dropped)
+    x, y, s = get_mature_ant_states()
+    anthill_locations = [(colony.anthill.x_loc, colony.anthill.y_loc) for colony in colonies]
+    if (frame_buffers is not None) and frame_buffers.publish(time, envir, x, y, s):
+        food_cells = food_amounts = ant_x = ant_y = ant_carrying = None
     else:
-        anthill.time_since_last_new_ant += 1
+        food_cells, food_amounts = food_grid.get_food_cells()
+        ant_x, ant_y, ant_carrying = np.array(x, dtype=np.int64), np.array(y, dtype=np.int64), np.array(s, dtype=np.int8)
+    return SimulationFrame(time, anthill, anthill_locations, envir.shape, food_cells, food_amounts, ant_x, ant_y, ant_carrying, history_start,
+                           anthill.history.get_rows(history_start), profiler.get_summary() if profiler is not None else "", frame_buffers)
 
-    # update the locations of the ants
-    count_num_active_ants = count_num_ant_eggs = count_num_larvae = count_num_pupa = 0
-    for ant in ants_list:
-        ant.time_since_born += 1
 
-        # check if the ant is now dead from starvation
-        if ant.time_since_eaten > max_without_food:
-            ant.maturity_status = "dead"
+def merge_frames(older_frame, newer_frame):
+
+    # a frame replacing one that was never drawn takes on its history too - so no hours are missed from the graphs
+    if older_frame.anthill is not newer_frame.anthill:
+        return newer_frame
+    history_rows = np.concatenate([older_frame.history_rows, newer_frame.history_rows[older_frame.history_start + len(older_frame.history_rows) - newer_frame.history_start:]])
+    return newer_frame._replace(history_start=older_frame.history_start, history_rows=history_rows)
 
-        # check if the ant is dead from old age
-        if ant.time_since_born > max_lifespan:
+
+def update_ants(colony, randoms):
+
+    # set helper variables
+    full_time_till_larvae_become_pupa = time_till_egg_hatch + time_till_larvae_become_pupa
+    full_time_till_pupa_become_mature_ants = full_time_till_larvae_become_pupa + time_till_pupa_become_mature_ants
+
+    anthill, ants_list, ant_lifecycle = colony.anthill, colony.ants_list, colony.ant_lifecycle
+    pheromones = anthill.pheromones
+
+    # the eggs only need visiting once they are due to hatch (or die of old age) - they are then the youngest ants,
+    # so they join the end of the list & are dealt with below as they were laid this many ticks ago
+    for egg in ant_lifecycle.pop_due_eggs(time):
+        egg.time_since_born = ant_lifecycle.egg_due_age
+        ants_list.append(egg)
+
+    # get the random numbers for this tick as lists - drawn for each ant in the list from the counter-based streams
+    keyed_on_ants = randoms is None
+    if keyed_on_ants:
+        randoms = random_streams.get_ant_randoms(stream_seed, time, colony.index, [ant.id for ant in ants_list])
+    random_steps, follow_draws, trail_draws = randoms.steps.tolist(), randoms.follow.tolist(), randoms.trail.tolist()
+
+    # update the locations of the ants - keeping only the ones that are still alive
+    # (the stage counts are kept up to date as the ants develop, the ones changing stage are counted in their old stage)
+    stage_counts = ant_lifecycle.stage_counts
+    num_hatched = num_pupated = num_matured = mature_rank = 0
+    profiling = profiler is not None
+    tracking = occupancy is not None
+    living_ants = []
+    for position, ant in enumerate(ants_list):
+        ant.time_since_born += 1
+
+        # check if the ant is now dead from starvation or old age - if so, drop it & its trails
+        if (ant.time_since_eaten > max_without_food) or (ant.time_since_born > max_lifespan):
+            ant_lifecycle.remove(ant.maturity_status)
+            if tracking and ant.is_alive_and_mature():
+                occupancy.remove(colony.index, ant.x_loc, ant.y_loc)
             ant.maturity_status = "dead"
+            ant.set_food_scent(anthill.trail_store, None)
+            anthill.remove(ant)
+            anthill.dead_ant_count += 1
+            if profiling:
+                profiler.lap("lifecycle")
+            continue
+        living_ants.append(ant)
 
         # update the immature ants
         if not ant.is_alive_and_mature():
             # deal with the eggs
             if ant.maturity_status == "egg":
-                count_num_ant_eggs += 1
                 # check if the ant egg should now hatch
                 if ant.time_since_born > time_till_egg_hatch:
                     ant.maturity_status = "larvae"
+                    ant_lifecycle.change_stage("egg", "larvae")
+                    num_hatched += 1
             # deal with the larvae
             elif ant.maturity_status == "larvae":
-                count_num_larvae += 1
                 # check if the ant should now be mature
                 if ant.time_since_born > full_time_till_larvae_become_pupa:
                     ant.maturity_status = "pupa"
+                    ant_lifecycle.change_stage("larvae", "pupa")
+                    num_pupated += 1
             # deal with the pupa
             elif ant.maturity_status == "pupa":
-                count_num_pupa += 1
                 # check if the ant should now be mature
                 if ant.time_since_born > full_time_till_pupa_become_mature_ants:
                     ant.maturity_status = "mature"
+                    ant_lifecycle.change_stage("pupa", "mature")
+                    num_matured += 1
+                    if tracking:
+                        occupancy.add(colony.index, ant.x_loc, ant.y_loc)
             # get the ant to eat food if he's hungry - amount = relative to his development
             if ant.maturity_status != "egg":
                 amount_he_will_eat = ant.time_since_born/full_time_till_pupa_become_mature_ants
                 eat_if_hungry(ant, time_till_hungry, anthill=anthill, amount_eaten=amount_he_will_eat)
+            if profiling:
+                profiler.lap("lifecycle")
 
-        # update the ants that are mature and alive
+        # update the ants that are mature and alive - using the random numbers for their place among the mature ants (or in the list)
         elif ant.is_alive_and_mature():
-            count_num_active_ants += 1
+            draw = position if keyed_on_ants else mature_rank
 
             # if not carrying food
             if not ant.is_carrying_food():
                 # if in the ant hill - choose a trail to follow/restart your search
                 if ant in anthill:
                     # restart the current search
-                    ant.food_search_trail = []
+                    ant.food_search_trail = array('b')
 
                     # check if the ant is hungry - if there is food, let him eat food
                     eat_if_hungry(ant, time_till_hungry, anthill=anthill)
 
                     # choose to maybe follow a trail
                     if anthill.has_active_trails():
-                        ant.set_following_status(follow_prob)
-                        if ant.is_follower():
-                            trail_id, path = anthill.get_trail()
-                            ant.food_scent_trail = path
-                            ant.food_scent_id = trail_id
-                            ant.to_food_increment = ant.increment_to_food()
-                            ant.count_steps_out = 0
-
-                # if we have reached the end of the trail
-                if ant.is_follower() and ant.count_steps_out == len(ant.food_scent_trail):
+                        ant.set_following_status(follow_prob, follow_draws[draw])
+                        trail_id = anthill.get_trail(trail_draws[draw]) if ant.is_follower() and pheromones is None else None
+                        ant.set_food_scent(anthill.trail_store, trail_id)
+                        ant.count_steps_out = 0
+                        if profiling and trail_id is not None:
+                            profiler.count("trails_sampled")
+                    if profiling:
+                        profiler.lap("departing")
+
+                # if we have reached the end of the trail - or the strongest pheromone around
+                uphill_step = None
+                if ant.is_follower() and pheromones is not None:
+                    uphill_step = pheromones.get_uphill_step(ant.x_loc, ant.y_loc, trail_draws[draw])
+                    trail_ended = uphill_step is None
+                else:
+                    trail_ended = ant.is_follower() and ant.count_steps_out == ant.food_scent_length
+                if trail_ended:
                     ant.following_status = 0
                     ant.count_steps_out = 0
+                    ant.set_food_scent(anthill.trail_store, None)
                     ant.time_since_eaten += 1
+                    if profiling:
+                        profiler.lap("following")
 
                 else:
                     # move the ant one increment - randomly or following a trail
-                    ant.move_towards_food(anthill, env_width, env_height)
+                    old_x_loc, old_y_loc = ant.x_loc, ant.y_loc
+                    ant.move_towards_food(anthill, env_width, env_height, random_steps[draw] if uphill_step is None else uphill_step)
+                    if tracking:
+                        occupancy.move(colony.index, old_x_loc, old_y_loc, ant.x_loc, ant.y_loc)
+                    if profiling:
+                        profiler.count("ants_moved")
+                        profiler.lap("following" if ant.is_follower() else "searching")
 
                     # if there is food in this new area, eat one food & pick up any other pieces
                     if envir[ant.y_loc, ant.x_loc] > 0 and ant not in anthill:
                         eat_if_hungry(ant, time_till_hungry, envir=envir)
                         # if there is still food left, pick it up and bring it home
                         if envir[ant.y_loc, ant.x_loc] > 0:
-                            food_to_pick_up = min(envir[ant.y_loc, ant.x_loc], num_food_brought_back_to_nest)
+                            food_to_pick_up = min(int(envir[ant.y_loc, ant.x_loc]), num_food_brought_back_to_nest)
                             envir[ant.y_loc, ant.x_loc] -= food_to_pick_up
                             ant.num_food_carrying = food_to_pick_up
                             ant.carrying_status = 1
-                            # check if this is the food the follower was supposed to have picked up
-                            if ant.is_follower() and (ant.count_steps_out != len(ant.food_scent_trail)):
+                            # check if this is the food the follower was supposed to have picked up - followers of the
+                            # pheromone on the map find their own way home
+                            if ant.is_follower() and (pheromones is not None or ant.count_steps_out != ant.food_scent_length):
                                 ant.following_status = 0
-                            # set the ants trail home
+                            # set the ants trail home - followers retrace their trail, searchers their search
                             if not ant.is_follower():
-                                ant.food_scent_trail = [(-x, -y) for (x, y) in ant.food_search_trail[::-1]]
-                            ant.to_anthill_increment = ant.increment_to_anthill()
+                                ant.set_food_scent(anthill.trail_store, anthill.add_return_path(ant.food_search_trail))
+                            if profiling:
+                                profiler.count("food_picked_up")
                     else:
                         ant.time_since_eaten += 1
+                    if profiling:
+                        profiler.lap("food_pickup")
 
             # if carrying food
             elif ant.is_carrying_food():
                 # if at the anthill - unload the food
                 if ant in anthill:
                     anthill.food_count += ant.num_food_carrying
+                    anthill.food_brought_back += ant.num_food_carrying
                     ant.num_food_carrying = 0
                     ant.carrying_status = 0
                     ant.count_steps_back = 0
                     eat_if_hungry(ant, time_till_hungry, anthill, None)
 
-                    # update the trail list associated with the anthill
-                    if ant.is_follower():
-                        anthill.increase_trail_strength(ant.food_scent_id)
-                    else:
-                        anthill.add_trail(ant.food_scent_trail)
+                    # update the trail list associated with the anthill - a followed trail that has since
+                    # fully decayed is laid again as a new trail (the pheromone on the map was laid on the way home)
+                    if pheromones is None:
+                        if ant.is_follower() and anthill.has_trail(ant.food_scent_id):
+                            anthill.increase_trail_strength(ant.food_scent_id)
+                        else:
+                            anthill.add_trail(ant.food_scent_id)
+                            if profiling:
+                                profiler.count("trails_created")
 
                     # reset variables for next run
                     ant.following_status = 0
-                    ant.num_follow_increments = 0
-                    ant.food_search_trail = []
-                    ant.trail_to_anthill = []
+                    ant.set_food_scent(anthill.trail_store, None)
+                    ant.food_search_trail = array('b')
+                    if profiling:
+                        profiler.count("food_unloaded")
+                        profiler.lap("unloading")
 
                 # if not at the ant hill - keep retracing steps to the ant hill
                 else:
                     # move the ant one increment back towards the anthill
+                    old_x_loc, old_y_loc = ant.x_loc, ant.y_loc
                     ant.move_towards_anthill(anthill)
+                    if tracking:
+                        occupancy.move(colony.index, old_x_loc, old_y_loc, ant.x_loc, ant.y_loc)
                     ant.time_since_eaten += 1
+                    if profiling:
+                        profiler.count("ants_moved")
+                        profiler.lap("returning")
+
+            mature_rank += 1
+
+    ants_list[:] = living_ants
+    return (stage_counts["mature"] - num_matured, stage_counts["egg"] + num_hatched,
+            stage_counts["larvae"] - num_hatched + num_pupated, stage_counts["pupa"] - num_pupated + num_matured)
+
+
+def lay_egg(colony):
+
+    # add a new ant to the colony
+    anthill = colony.anthill
+    if anthill.time_since_last_new_ant > (24/num_ants_laid_daily):
+        if colony.ant_population is not None:
+            colony.ant_population.add_ant(anthill.new_ant_id(), vectorised_ants.EGG, anthill.x_loc, anthill.y_loc)
+        else:
+            ant = ant_classes.Ant(anthill.new_ant_id(), "egg", anthill.x_loc, anthill.y_loc)
+            colony.ant_lifecycle.add_egg(ant, time + colony.ant_lifecycle.egg_due_age)
+        anthill.time_since_last_new_ant = 0
+        if profiler is not None:
+            profiler.count("eggs_laid")
+    else:
+        anthill.time_since_last_new_ant += 1
+
+
+def get_tree():
+
+    # whether a tree spawns this tick - & if so its location & food
+    if random_stream_type == "counter":
+        return random_streams.get_tree(stream_seed, time, tree_spawn_prob, env_width, env_height, max_food_per_location)
+    if rng.random() < tree_spawn_prob:
+        return rng.integers(0, env_width), rng.integers(0, env_height), rng.integers(1, max_food_per_location, endpoint=True)
+    return None
+
+
+def update_state():
+
+    global time
+
+    # update the time
+    time += 1
+    if profiler is not None:
+        profiler.start_tick(time)
 
-    # keep track of all the variables at that point in time
-    anthill.num_active_ants.append(count_num_active_ants)
-    anthill.num_ant_eggs.append(count_num_ant_eggs)
-    anthill.num_ant_larvae.append(count_num_larvae)
-    anthill.num_ant_pupa.append(count_num_pupa)
-    anthill.food_collected.append(anthill.food_count)
+    # the colonies take turns to go first each tick - so no colony always reaches the food they share first
+    first_colony = time % len(colonies)
+    colonies_in_turn = colonies[first_colony:] + colonies[:first_colony]
+
+    # update the trail lists over time
+    for colony in colonies_in_turn:
+        colony.anthill.decay_trails()
+    if profiler is not None:
+        profiler.lap("trail_decay")
+
+    # update food on map
+    tree = get_tree()
+    if tree is not None:
+        # spawn new tree to the map
+        tree_x_loc, tree_y_loc, tree_food = tree
+        if all((tree_x_loc != colony.anthill.x_loc) or (tree_y_loc != colony.anthill.y_loc) for colony in colonies):
+            # add tree in this location
+            food_grid.add_food(tree_y_loc, tree_x_loc, tree_food)
+            if profiler is not None:
+                profiler.count("trees_spawned")
+    if profiler is not None:
+        profiler.lap("tree_spawning")
+
+    # add new ants to the colonies
+    for colony in colonies_in_turn:
+        lay_egg(colony)
+    if profiler is not None:
+        profiler.lap("egg_laying")
+
+    all_colonies_dead = True
+    for colony in colonies_in_turn:
+        # update the ants - one at a time or as arrays - using one batch of random numbers for the colony's tick
+        anthill = colony.anthill
+        if colony.ant_population is not None:
+            counts = colony.ant_population.update_ants(anthill, envir, get_colony_randoms(colony), profiler, occupancy, colony.index)
+        else:
+            counts = update_ants(colony, get_colony_randoms(colony))
+        count_num_active_ants, count_num_ant_eggs, count_num_larvae, count_num_pupa = counts
+
+        # keep track of all the variables at that point in time
+        anthill.history.append(count_num_active_ants, count_num_ant_eggs, count_num_larvae, count_num_pupa,
+                               anthill.dead_ant_count, anthill.food_count)
+        if profiler is not None:
+            profiler.lap("recording")
+
+        # check if the colony still has mature ants or food
+        if (count_num_active_ants != 0) or (anthill.food_count != 0):
+            all_colonies_dead = False
+    if profiler is not None:
+        profiler.end_tick(time)
 
     # stop the simulation if there are no more mature or baby ants
-    if (count_num_active_ants == 0) and (anthill.food_count == 0):
+    if all_colonies_dead:
         # raise an exception to stop the simulation
         print("All ants have died")
         raise ant_classes.AllAntsDead("All ants have died")
 
 
+# ======================================
+# | DEFINE FUNCTIONS FOR CHECKPOINTING |
+# ======================================
+# the version of the checkpoint layout - increased whenever the saved state changes
+checkpoint_version = 7
+
+# the config values that are options of a run rather than of the model - never saved in a checkpoint, as the run carrying
+# on from it sets its own
+run_options = ("history_path", "profile_phases", "profile_ticks", "profile_path", "share_frames")
+
+# the attributes of each Ant saved as one column per attribute in a checkpoint
+ant_columns = ["id", "x_loc", "y_loc", "time_since_born", "time_since_eaten", "carrying_status", "num_food_carrying",
+               "following_status", "food_scent_length", "count_steps_out", "count_steps_back"]
+
+
+def pack_ants(ants):
+
+    # store the Ant objects as columns - the searches are joined into one array with the length of each
+    columns = {column: np.array([getattr(ant, column) for ant in ants]) for column in ant_columns}
+    columns["num_food_carrying"] = columns["num_food_carrying"].astype(np.float64)
+    columns["maturity_status"] = np.array([vectorised_ants.maturity_status_names.index(ant.maturity_status) for ant in ants], dtype=np.int8)
+    columns["food_scent_id"] = np.array([-1 if ant.food_scent_id is None else ant.food_scent_id for ant in ants], dtype=np.int64)
+    columns["search_lengths"] = np.array([len(ant.food_search_trail) for ant in ants], dtype=np.int64)
+    columns["search_steps"] = np.frombuffer(b"".join(ant.food_search_trail.tobytes() for ant in ants), dtype=np.int8)
+    return columns
+
+
+def unpack_ants(columns):
+
+    # rebuild the Ant objects from their columns
+    values = {column: columns[column].tolist() for column in ant_columns}
+    maturity_statuses = [vectorised_ants.maturity_status_names[status] for status in columns["maturity_status"].tolist()]
+    food_scent_ids = [None if path_id < 0 else path_id for path_id in columns["food_scent_id"].tolist()]
+    search_ends = np.cumsum(columns["search_lengths"]).tolist()
+    search_steps = columns["search_steps"]
+
+    ants = []
+    for i, search_end in enumerate(search_ends):
+        ant = ant_classes.Ant(values["id"][i], maturity_statuses[i], values["x_loc"][i], values["y_loc"][i])
+        for column in ant_columns[3:]:
+            setattr(ant, column, values[column][i])
+        ant.food_scent_id = food_scent_ids[i]
+        ant.food_search_trail = array('b', search_steps[search_end - int(columns["search_lengths"][i]):search_end].tobytes())
+        ants.append(ant)
+    return ants
+
+
+def get_all_ants(colony):
+
+    # the colony's ants in the list & the eggs waiting in the lifecycle scheduler - each egg's age worked out from when it is due
+    ant_lifecycle = colony.ant_lifecycle
+    scheduled_eggs = ant_lifecycle.get_scheduled_eggs()
+    for due_time, egg in scheduled_eggs:
+        egg.time_since_born = time - due_time + ant_lifecycle.egg_due_age + 1
+    return colony.ants_list + [egg for due_time, egg in scheduled_eggs]
+
+
+def schedule_ants(ants):
+
+    # keep the eggs in the lifecycle scheduler until they are due & count the ants at each stage
+    lifecycle = ant_classes.LifecycleScheduler(time_till_egg_hatch, max_lifespan)
+    listed_ants = []
+    for ant in ants:
+        if ant.maturity_status == "egg":
+            lifecycle.add_egg(ant, time - ant.time_since_born + lifecycle.egg_due_age + 1)
+        else:
+            lifecycle.add(ant.maturity_status)
+            listed_ants.append(ant)
+    return listed_ants, lifecycle
+
+
+def save_checkpoint(checkpoint_path):
+
+    # gather everything needed to carry on the simulation from this tick
+    state = {
+        "version": checkpoint_version,
+        "config_variables": {name: value for name, value in config_variables.items() if name not in run_options},
+        "time": time,
+        "rng_state": rng.bit_generator.state,
+        "stream_seed": stream_seed,
+        "colonies": [{
+            "anthill": colony.anthill,
+            "ants": pack_ants(get_all_ants(colony)) if colony.ants_list is not None else None,
+            "ant_population": colony.ant_population,
+        } for colony in colonies],
+        "food_grid": food_grid,
+    }
+
+    # write to a temporary file first so an interrupted save never replaces a good checkpoint
+    temporary_path = checkpoint_path + ".tmp"
+    with open(temporary_path, "wb") as checkpoint_file:
+        pickle.dump(state, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def load_checkpoint(checkpoint_path, overrides=None):
+
+    global time, rng, stream_seed, colonies, food_grid, envir
+
+    with open(checkpoint_path, "rb") as checkpoint_file:
+        state = pickle.load(checkpoint_file)
+    if state["version"] != checkpoint_version:
+        raise ValueError("Checkpoint '{}' has version {} - expected version {}".format(checkpoint_path, state["version"], checkpoint_version))
+
+    # use the checkpoint's config - with the run options of the config loaded now & any overrides for the runs branching off from it
+    overrides = dict(overrides or {})
+    saved_config_variables = {name: value for name, value in state["config_variables"].items() if name not in run_options}
+    loaded_run_options = {name: config_variables[name] for name in run_options if name in config_variables}
+    new_config_variables = dict(saved_config_variables, **loaded_run_options)
+    new_config_variables.update(overrides)
+    set_config_variables(new_config_variables)
+    saved_engine = state["config_variables"].get("simulation_engine", "object")
+    if simulation_engine != saved_engine:
+        raise ValueError("Checkpoint '{}' was saved by the '{}' engine - it can't be restored into the '{}' engine".format(
+            checkpoint_path, saved_engine, simulation_engine))
+
+    # carry on the random numbers from where they stopped - unless a new seed is given to branch the run
+    time = state["time"]
+    rng = np.random.default_rng(random_seed)
+    if "random_seed" not in overrides:
+        rng.bit_generator.state = state["rng_state"]
+    stream_seed = state["stream_seed"] if ("random_seed" not in overrides) and (state["stream_seed"] is not None) else get_stream_seed()
+
+    # restore the colonies & the environment
+    colonies = []
+    for colony_index, colony_state in enumerate(state["colonies"]):
+        anthill = colony_state["anthill"]
+        anthill.trail_depreciation_time = trail_depreciation_time
+        anthill.return_path_compression = return_path_compression
+
+        # the history carries on in the file it was saved with if this run streams to the same one - it's copied to a new one
+        # or read back into memory otherwise, leaving the saved run's file alone
+        if history_path is not None:
+            anthill.history.stream_to(get_colony_path(history_path, colony_index, len(state["colonies"])))
+        else:
+            anthill.history.stop_streaming()
+        colony = ant_classes.Colony(colony_index, anthill, ant_population=colony_state["ant_population"])
+        if colony.ant_population is not None:
+            colony.ant_population.set_parameters(config_variables)
+        else:
+            colony.ants_list, colony.ant_lifecycle = schedule_ants(unpack_ants(colony_state["ants"]))
+        colonies.append(colony)
+    set_first_colony()
+    start_occupancy()
+    food_grid = state["food_grid"]
+    food_grid.set_max_food(max_food_per_location)
+    envir = food_grid.amounts
+    start_frame_buffers()
+    start_profiler()
+
+
+def run_simulation(num_ticks, checkpoint_path=None, overrides=None):
+
+    # start a fresh simulation (or carry one on from a checkpoint) & step it until the tick count is reached or the colony dies out
+    if checkpoint_path is None:
+        initialise_environment()
+    else:
+        load_checkpoint(checkpoint_path, overrides)
+    for _ in range(num_ticks):
+        try:
+            update_state()
+        except ant_classes.AllAntsDead:
+            break
+    anthill.history.flush()
+    if profiler is not None:
+        profiler.finish()
+    return time
+
+
 def main():
 
+    # only load the GUI & plotting packages when the simulation is going to be displayed
+    import gui_class
+    import simulation_plots
+
     # run the simulation - open the control panel & plot the figure
     gui = gui_class.Gui()
-    gui.start_simulation(initialise_environment, plot_current_state, update_state)
+    gui.start_simulation(initialise_environment, simulation_plots.plot_current_state, update_state, get_frame, merge_frames)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the command line arguments & finding the simulation
+import argparse
+import os
+import sys
+
+# package for timing the simulation
+from time import perf_counter
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation being compared
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ant_simulation
+import headless_simulation
+
+
+# ==================================
+# | DEFINE FUNCTIONS FOR BENCHMARK |
+# ==================================
+def run_with_compression(compression, num_ticks, engine, config_path):
+
+    # run the simulation with one way of shortening the searches & summarise it
+    ant_simulation.load_config(config_path, overrides={"return_path_compression": compression, "simulation_engine": engine})
+    start = perf_counter()
+    ticks_run = ant_simulation.run_simulation(num_ticks)
+    summary = headless_simulation.summarise_run(ant_simulation.anthill, ticks_run)
+    summary["seconds"] = perf_counter() - start
+    summary["trail_store_steps"] = ant_simulation.anthill.trail_store.size
+    return summary
+
+
+def parse_arguments(args=None):
+
+    parser = argparse.ArgumentParser(description="Compare the ways of shortening the ants' searches into their ways home")
+    parser.add_argument("--config", default=ant_simulation.default_config_path, help="the yaml file containing the simulation parameters")
+    parser.add_argument("--ticks", type=int, default=4000, help="the number of hours to simulate for each method")
+    parser.add_argument("--engine", default="vectorised", choices=ant_simulation.simulation_engines, help="the simulation engine to use")
+    parser.add_argument("--methods", nargs="+", default=list(ant_simulation.return_path_compressions), choices=ant_simulation.return_path_compressions)
+    return parser.parse_args(args)
+
+
+def main(args=None):
+
+    arguments = parse_arguments(args)
+
+    print("{:>12} {:>12} {:>14} {:>14} {:>12} {:>10}".format("method", "ratio", "food brought", "ticks / food", "store steps", "seconds"))
+    for method in arguments.methods:
+        summary = run_with_compression(method, arguments.ticks, arguments.engine, arguments.config)
+        print("{:>12} {:>12.2f} {:>14.0f} {:>14.3f} {:>12} {:>10.2f}".format(
+            method, summary["path_compression_ratio"], summary["food_brought_back"], summary["ticks_per_food_unit"], summary["trail_store_steps"], summary["seconds"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the command line arguments & finding the simulation
+import argparse
+import os
+import sys
+
+# package for timing the simulation
+from time import perf_counter
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation being timed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ant_simulation
+from ant_classes import AllAntsDead
+
+
+# ==================================
+# | DEFINE FUNCTIONS FOR BENCHMARK |
+# ==================================
+def time_ticks(population_size, num_ticks, engine):
+
+    # start a colony of the given size & time how long each tick takes on average - over the ticks run before the colony
+    # died out if it did
+    ant_simulation.load_config(overrides={"starting_population_size": population_size, "simulation_engine": engine})
+    ant_simulation.initialise_environment()
+    ticks_run = 0
+    start = perf_counter()
+    for _ in range(num_ticks):
+        try:
+            ant_simulation.update_state()
+        except AllAntsDead:
+            break
+        ticks_run += 1
+    seconds = perf_counter() - start
+    return (seconds / ticks_run if ticks_run else float("nan")), ticks_run
+
+
+def parse_arguments(args=None):
+
+    parser = argparse.ArgumentParser(description="Time how the cost of a tick grows with the starting population size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000, 16000, 32000], help="the starting population sizes to time")
+    parser.add_argument("--ticks", type=int, default=20, help="the number of ticks timed for each population size")
+    parser.add_argument("--engine", default="object", choices=ant_simulation.simulation_engines, help="the simulation engine to time")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+
+    arguments = parse_arguments(args)
+
+    # a linear tick loop keeps the time per ant roughly constant as the colony grows
+    print("{:>12} {:>10} {:>12} {:>12} {:>16}".format("population", "ticks run", "ticks / s", "ms / tick", "us / ant / tick"))
+    for population_size in arguments.sizes:
+        seconds_per_tick, ticks_run = time_ticks(population_size, arguments.ticks, arguments.engine)
+        print("{:>12} {:>10} {:>12.1f} {:>12.2f} {:>16.3f}".format(population_size, ticks_run, 1 / seconds_per_tick, 1e3 * seconds_per_tick,
+                                                                   1e6 * seconds_per_tick / population_size))
+
+
+if __name__ == "__main__":
+    main()
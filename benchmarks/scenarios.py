@@ -0,0 +1,224 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the command line arguments, finding the simulation & writing the results
+import argparse
+import json
+import os
+import platform
+import sys
+
+# packages for timing each tick & running each scenario in its own process
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+
+# package for the peak memory used - only found on unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# package for the tick latency percentiles
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation being timed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ant_simulation
+from ant_classes import AllAntsDead
+
+
+# ===================================
+# | DEFINE THE BENCHMARK SCENARIOS  |
+# ===================================
+# each scenario is the default config with some values overridden, run for a number of ticks from a fixed seed
+# - a frame is drawn every render_every ticks to time the plotting
+scenarios = {
+    "tiny": {"overrides": {}, "num_ticks": 3000, "render_every": 100},
+    "ants_10k": {"overrides": {"starting_population_size": 10000}, "num_ticks": 200, "render_every": 20},
+    "large_sparse_grid": {"overrides": {"environment_width": 4000, "environment_height": 4000, "environment_starting_tree_percent": 0.01},
+                          "num_ticks": 200, "render_every": 50},
+    "trail_heavy": {"overrides": {"follow_prob": 0.99, "trail_depreciation_time": 200, "starting_population_size": 500},
+                    "num_ticks": 2000, "render_every": 100},
+    "brood_heavy": {"overrides": {"num_ants_laid_daily": 24}, "num_ticks": 3000, "render_every": 100},
+}
+
+# the seed every scenario is run from
+benchmark_seed = 0
+
+# the measurements compared against a baseline - & whether a larger value is better
+compared_measurements = {
+    "ticks_per_second": True,
+    "tick_latency_ms.p99": False,
+    "peak_rss_mb": False,
+    "render_ms.mean": False,
+}
+
+
+# ==================================
+# | DEFINE FUNCTIONS FOR BENCHMARK |
+# ==================================
+def get_peak_rss_mb():
+
+    # the most memory this process has held at once - linux reports it in kilobytes & macos in bytes
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def summarise_times(times):
+
+    # the percentiles of a list of times in milliseconds
+    if not times:
+        return None
+    times_ms = 1000 * np.array(times)
+    return {"mean": float(times_ms.mean()), "p50": float(np.percentile(times_ms, 50)), "p90": float(np.percentile(times_ms, 90)),
+            "p99": float(np.percentile(times_ms, 99)), "max": float(times_ms.max())}
+
+
+def run_scenario(name, engine=None, render=True):
+
+    # start the scenario from its fixed seed - on the given engine if there is one
+    scenario = scenarios[name]
+    overrides = dict(scenario["overrides"], random_seed=benchmark_seed, history_path=None)
+    if engine is not None:
+        overrides["simulation_engine"] = engine
+    ant_simulation.load_config(overrides=overrides)
+    start = perf_counter()
+    ant_simulation.initialise_environment()
+    setup_time = perf_counter() - start
+
+    # draw the frames off screen - only loading the plotting packages when they are used
+    renderer = figure = None
+    if render:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import simulation_plots
+        figure = plt.figure(figsize=(12, 5))
+
+    # time each tick & each frame drawn until the tick count is reached or the colony dies out
+    tick_times, render_times = [], []
+    for tick in range(scenario["num_ticks"]):
+        start = perf_counter()
+        try:
+            ant_simulation.update_state()
+        except AllAntsDead:
+            break
+        finally:
+            tick_times.append(perf_counter() - start)
+        if render and (tick + 1) % scenario["render_every"] == 0:
+            start = perf_counter()
+            frame = ant_simulation.get_frame(renderer.num_rows_read if renderer is not None else 0)
+            if renderer is None:
+                renderer = simulation_plots.SimulationRenderer(figure, frame)
+            renderer.draw_frame(frame)
+            render_times.append(perf_counter() - start)
+
+    return {
+        "overrides": scenario["overrides"],
+        "engine": ant_simulation.simulation_engine,
+        "ticks_run": len(tick_times),
+        "setup_seconds": setup_time,
+        "ticks_per_second": len(tick_times) / sum(tick_times) if tick_times else 0.0,
+        "tick_latency_ms": summarise_times(tick_times),
+        "peak_rss_mb": get_peak_rss_mb(),
+        "render_ms": summarise_times(render_times),
+    }
+
+
+def run_benchmarks(names, engine=None, render=True):
+
+    # run each scenario in a new process so the peak memory is its own
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[name] = executor.submit(run_scenario, name, engine, render).result()
+        print_scenario(name, results[name])
+    return {"python": platform.python_version(), "platform": platform.platform(), "seed": benchmark_seed, "scenarios": results}
+
+
+def print_scenario(name, result):
+    latency = result["tick_latency_ms"]
+    render_ms = result["render_ms"]
+    print("{:<18} {:>9.1f} ticks/s  p50 {:>7.2f}ms  p99 {:>7.2f}ms  peak rss {}  render {}".format(
+        name, result["ticks_per_second"], latency["p50"] if latency else 0, latency["p99"] if latency else 0,
+        "{:.0f}MB".format(result["peak_rss_mb"]) if result["peak_rss_mb"] is not None else "n/a",
+        "{:.1f}ms/frame".format(render_ms["mean"]) if render_ms else "n/a"))
+
+
+def get_measurement(result, measurement):
+
+    # look up a measurement such as "tick_latency_ms.p99" - None if the run didn't record it
+    value = result
+    for key in measurement.split("."):
+        if value is None:
+            return None
+        value = value.get(key)
+    return value
+
+
+def compare_results(baseline, results, tolerance):
+
+    # flag each measurement that is worse than the baseline by more than the tolerance
+    regressions = []
+    for name, result in results["scenarios"].items():
+        baseline_result = baseline["scenarios"].get(name)
+        if baseline_result is None:
+            continue
+        for measurement, higher_is_better in compared_measurements.items():
+            old_value, new_value = get_measurement(baseline_result, measurement), get_measurement(result, measurement)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            print("{:<18} {:<20} {:>10.2f} -> {:>10.2f} ({:+.1%}){}".format(
+                name, measurement, old_value, new_value, change, "  REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append((name, measurement))
+    return regressions
+
+
+def parse_arguments(args=None):
+
+    parser = argparse.ArgumentParser(description="Time the ant simulation over a set of scenarios")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the scenarios & write the results to a json file")
+    run_parser.add_argument("results_path", help="the json file the results are written to")
+    run_parser.add_argument("--scenarios", nargs="+", choices=list(scenarios), default=list(scenarios), help="the scenarios to run - defaults to all of them")
+    run_parser.add_argument("--engine", choices=ant_simulation.simulation_engines, default=None, help="the engine to run - defaults to the one in the config file")
+    run_parser.add_argument("--no-render", action="store_true", help="don't time drawing the frames")
+
+    compare_parser = subparsers.add_parser("compare", help="compare results against a baseline & flag the regressions")
+    compare_parser.add_argument("baseline_path", help="the json file of the baseline results")
+    compare_parser.add_argument("results_path", help="the json file of the new results")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1, help="the fraction a measurement can worsen by before it is flagged")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+
+    arguments = parse_arguments(args)
+    if arguments.command == "run":
+        results = run_benchmarks(arguments.scenarios, arguments.engine, not arguments.no_render)
+        with open(arguments.results_path, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+        print("Benchmark results written to {}".format(arguments.results_path))
+        return 0
+
+    with open(arguments.baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(arguments.results_path) as results_file:
+        results = json.load(results_file)
+    regressions = compare_results(baseline, results, arguments.tolerance)
+    print("{} regression{} found".format(len(regressions), "" if len(regressions) == 1 else "s"))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
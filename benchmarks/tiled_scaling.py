@@ -0,0 +1,82 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the command line arguments & finding the simulation
+import argparse
+import os
+import sys
+
+# package for timing the simulation
+from time import perf_counter
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation being timed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ant_simulation
+import tiled_simulation
+
+
+# ==================================
+# | DEFINE FUNCTIONS FOR BENCHMARK |
+# ==================================
+def time_ticks(config_variables, num_ticks, num_tiles, num_warmup_ticks):
+
+    # run a few ticks so the ants have spread over the map, then time how long each tick takes on average
+    simulation = tiled_simulation.TiledSimulation(num_tiles, num_tiles > 1, config_variables)
+    try:
+        for _ in range(num_warmup_ticks):
+            simulation.update_state()
+        start = perf_counter()
+        for _ in range(num_ticks):
+            simulation.update_state()
+        return (perf_counter() - start) / num_ticks
+    finally:
+        simulation.close()
+
+
+def time_single_process(config_variables, num_ticks, num_warmup_ticks):
+
+    # the same run in one process - the vectorised engine with the counter-based streams
+    ant_simulation.set_config_variables(dict(config_variables, simulation_engine="vectorised", random_streams="counter"))
+    ant_simulation.initialise_environment()
+    for _ in range(num_warmup_ticks):
+        ant_simulation.update_state()
+    start = perf_counter()
+    for _ in range(num_ticks):
+        ant_simulation.update_state()
+    return (perf_counter() - start) / num_ticks
+
+
+def parse_arguments(args=None):
+
+    parser = argparse.ArgumentParser(description="Time how the throughput of the tiled simulation grows with the number of tiles")
+    parser.add_argument("--tiles", type=int, nargs="+", default=[1, 2, 4, 8], help="the numbers of tiles (processes) to time")
+    parser.add_argument("--size", type=int, default=1000, help="the width & height of the map")
+    parser.add_argument("--population", type=int, default=100000, help="the starting population size of each colony")
+    parser.add_argument("--colonies", type=int, default=4, help="the number of colonies on the map")
+    parser.add_argument("--ticks", type=int, default=20, help="the number of ticks timed for each number of tiles")
+    parser.add_argument("--warmup", type=int, default=50, help="the number of ticks run before the timing starts")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+
+    arguments = parse_arguments(args)
+    config_variables = dict(ant_simulation.config_variables, random_seed=0, environment_width=arguments.size, environment_height=arguments.size,
+                            starting_population_size=arguments.population, num_colonies=arguments.colonies)
+
+    # the speed up is the single process time per tick over the tiled time per tick - the tiles run in parallel but
+    # the coordinator still updates the ant hills & hands the ants over in one process
+    single_seconds = time_single_process(config_variables, arguments.ticks, arguments.warmup)
+    print("{:>8} {:>12} {:>10}".format("tiles", "ms / tick", "speed up"))
+    print("{:>8} {:>12.1f} {:>10.2f}".format("single", 1e3 * single_seconds, 1.0))
+    for num_tiles in arguments.tiles:
+        seconds_per_tick = time_ticks(config_variables, arguments.ticks, num_tiles, arguments.warmup)
+        print("{:>8} {:>12.1f} {:>10.2f}".format(num_tiles, 1e3 * seconds_per_tick, single_seconds / seconds_per_tick))
+
+
+if __name__ == "__main__":
+    main()
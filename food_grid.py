@@ -0,0 +1,126 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for storing the food on the map
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the counter-based random streams the trees can be planted from
+import random_streams
+
+
+# ===================================
+# | DEFINE FUNCTIONS FOR FOOD GRID  |
+# ===================================
+def get_food_dtype(max_food_per_location):
+    # the smallest signed integer type that holds the most food a location can have - food is only ever whole pieces
+    return np.promote_types(np.min_scalar_type(-max_food_per_location), np.int8)
+
+
+# ===================
+# | FOOD GRID CLASS |
+# ===================
+class FoodGrid:
+    """
+    Holds the food at each location of the map in a compact integer array - looked up directly as the ants move -
+    along with an index of the locations that have food. Locations are added to the index as trees are planted &
+    the ones the ants have emptied are only dropped from it when it is read, so the ants never need to update it.
+    The array still has an entry for every location, empty or not - only its type is smaller than the old float grid.
+    """
+
+    def __init__(self, width, height, max_food_per_location):
+
+        self.width = width
+        self.height = height
+
+        # the food at each location - indexed by [y, x]
+        self.amounts = np.zeros((height, width), dtype=get_food_dtype(max_food_per_location))
+
+        # the flat indices (y * width + x) of the locations planted with food - some may since have been emptied
+        self.cells = np.zeros(1024, dtype=np.int64)
+        self.num_cells = 0
+
+    def __getstate__(self):
+
+        # only save the locations with food
+        state = dict(self.__dict__)
+        cells, amounts = self.get_food_cells()
+        state["cells"], state["cell_amounts"] = cells, amounts
+        state["num_cells"] = len(cells)
+        del state["amounts"]
+        return state
+
+    def __setstate__(self, state):
+        cell_amounts = state.pop("cell_amounts")
+        self.__dict__.update(state)
+        self.amounts = np.zeros((self.height, self.width), dtype=cell_amounts.dtype)
+        self.amounts.reshape(-1)[self.cells] = cell_amounts
+
+    def plant(self, rng, tree_percent, max_food_per_location, excluded_rows, excluded_columns, rows_per_block=1024):
+
+        # choose the locations a block of rows at a time - so the random numbers for the whole map are never held at once
+        # (the random numbers drawn are the same as drawing them for every location in one go)
+        planted = []
+        for first_row in range(0, self.height, rows_per_block):
+            block = rng.random((min(rows_per_block, self.height - first_row), self.width)) < tree_percent
+            for excluded_row in excluded_rows:
+                if first_row <= excluded_row < first_row + len(block):
+                    block[excluded_row - first_row, :] = False
+            block[:, list(excluded_columns)] = False
+            planted.append(np.flatnonzero(block) + first_row * self.width)
+        planted = np.concatenate(planted)
+
+        # give each planted location its food
+        self.amounts.reshape(-1)[planted] = rng.integers(1, max_food_per_location, size=len(planted), endpoint=True)
+        self.add_cells(planted)
+
+    def plant_from_streams(self, seed, tree_percent, max_food_per_location, excluded_rows, excluded_columns, first_row=0, rows_per_block=1024):
+
+        # choose the locations from the counter-based random streams, keyed on each location - the grid may hold only a band
+        # of the map's rows starting at first_row, & gets the same trees as those rows of a grid holding the whole map
+        excluded_columns = np.asarray(list(excluded_columns), dtype=np.int64)
+        for block_start in range(0, self.height, rows_per_block):
+            num_rows = min(rows_per_block, self.height - block_start)
+            planted, food = random_streams.get_planted_rows(seed, first_row + block_start, num_rows, self.width, tree_percent, max_food_per_location)
+            kept = ~np.isin(first_row + block_start + planted // self.width, list(excluded_rows)) & ~np.isin(planted % self.width, excluded_columns)
+            planted, food = planted[kept] + block_start * self.width, food[kept]
+            self.amounts.reshape(-1)[planted] = food
+            self.add_cells(planted)
+
+    def add_cells(self, cells):
+
+        # drop the emptied locations from the index before making room for more
+        if self.num_cells + len(cells) > len(self.cells):
+            self.get_food_cells()
+        if self.num_cells + len(cells) > len(self.cells):
+            grown = np.zeros(2 * (self.num_cells + len(cells)), dtype=np.int64)
+            grown[:self.num_cells] = self.cells[:self.num_cells]
+            self.cells = grown
+        self.cells[self.num_cells:self.num_cells + len(cells)] = cells
+        self.num_cells += len(cells)
+
+    def add_food(self, y_loc, x_loc, amount):
+
+        # only locations that were empty need adding to the index
+        if self.amounts[y_loc, x_loc] <= 0:
+            self.add_cells([y_loc * self.width + x_loc])
+        self.amounts[y_loc, x_loc] = amount
+
+    def get_food_cells(self):
+
+        # drop the locations that have been emptied (or listed twice) & return the rest in order with their food
+        cells = self.cells[:self.num_cells]
+        cells = np.unique(cells[self.amounts.reshape(-1)[cells] > 0])
+        self.cells[:len(cells)] = cells
+        self.num_cells = len(cells)
+        return cells.copy(), self.amounts.reshape(-1)[cells]
+
+    def set_max_food(self, max_food_per_location):
+
+        # widen the food type if a location can now hold more food than it fits
+        food_dtype = np.promote_types(self.amounts.dtype, get_food_dtype(max_food_per_location))
+        if food_dtype != self.amounts.dtype:
+            self.amounts = self.amounts.astype(food_dtype)
@@ -10,6 +10,10 @@ import matplotlib.pyplot as plt
 from tkinter import *
 from tkinter.ttk import Notebook
 
+# packages for running the simulation on its own thread
+import threading
+import time
+
 
 # =====================
 # | IMPORT Exceptions |
@@ -25,6 +29,35 @@ from ant_classes import AllAntsDead
 matplotlib.use('TkAgg')
 
 
+# ===========================
+# |  LATEST FRAME SLOT CLASS |
+# ===========================
+class LatestFrameSlot:
+    """
+    Holds the newest frame published by the simulation's thread until the GUI takes it.
+    A frame put in before the last one was taken replaces it - merged with it if a merge function is given.
+    """
+
+    def __init__(self, merge_frames=None):
+        self.lock = threading.Lock()
+        self.frame = None
+        self.merge_frames = merge_frames
+
+    def put(self, frame):
+        with self.lock:
+            if (self.frame is not None) and (self.merge_frames is not None):
+                frame = self.merge_frames(self.frame, frame)
+            self.frame = frame
+
+    def take(self):
+        with self.lock:
+            frame, self.frame = self.frame, None
+        return frame
+
+    def clear(self):
+        self.take()
+
+
 # ===================
 # |    GUI CLASS    |
 # ===================
@@ -42,6 +75,29 @@ class Gui:
         self.step_size = 1
         self.step_delay = 0
 
+        # in fast-forward, the model is stepped as many times as fit in this many ms before a frame is published (0 is off)
+        self.fast_forward_budget = 0
+
+        # the rate the model is being stepped at - measured over the time between status updates
+        self.status_update_interval = 0.25
+        self.last_status_update_time = None
+        self.last_status_update_iteration = 0
+        self.ticks_per_second = 0
+
+        # the slowest phases of the ticks - only set when the simulation is being profiled
+        self.phase_summary = ""
+
+        # the simulation runs on its own thread - publishing frames that the controller draws when it is free
+        # (the lock is held while the model is stepped or reset so only one thread changes it at a time)
+        self.frame_poll_interval = 15
+        self.simulation_lock = threading.Lock()
+        self.run_event = threading.Event()
+        self.is_exiting = False
+        self.all_ants_dead = False
+        self.num_history_rows_published = 0
+        self.simulation_thread = None
+        self.latest_frame = None
+
         # initialise the variables needed when running the model simulation
         self.simulation_figure = None
         self.simulation_settings = None
@@ -53,6 +109,7 @@ class Gui:
         self.initialise_model_function = None
         self.draw_simulation_state_function = None
         self.update_simulation_function = None
+        self.get_frame_function = None
         self.status_text = ""
 
         # create the tkinter simulation controller window
@@ -65,7 +122,7 @@ class Gui:
         self.controller_window.wm_title('Ant Simulation Controller')
 
         # set the dimensions of this controller
-        self.controller_window.geometry('320x250')
+        self.controller_window.geometry('320x310')
         self.controller_window.columnconfigure(0, weight=1)
         self.controller_window.rowconfigure(0, weight=1)
 
@@ -112,6 +169,9 @@ class Gui:
         # add parameter to select how long to wait between each step
         self.add_sliding_parameter_to_settings_tab("Step visualisation\ndelay (ms)", self.change_model_step_delay, default=0, min_val=0, max_val=2000, step=10)
 
+        # add parameter to fast-forward the model - stepping it as often as fits in this many ms between frames
+        self.add_sliding_parameter_to_settings_tab("Fast-forward\nbudget (ms)", self.change_fast_forward_budget, default=0, min_val=0, max_val=200, step=5)
+
     def add_button_to_run_controls_tab(self, button_name, button_command, help_text, text_is_variable=False):
         """
         Used to create buttons on the run controls tab in the initialisation of the control panel
@@ -165,6 +225,12 @@ class Gui:
         """
         self.step_delay = int(val)
 
+    def change_fast_forward_budget(self, val):
+        """
+        model control function for changing the fast-forward time budget parameter
+        """
+        self.fast_forward_budget = int(val)
+
     def start_or_stop_running_the_simulation(self):
         """
         When the 'Run' or 'Pause' button is clicked, this function is triggered
@@ -172,9 +238,11 @@ class Gui:
         # if the model is running -> stop it OR if the model is not running -> run it
         self.is_running = not self.is_running
 
-        # if the model is now running
+        # if the model is now running - let the simulation's thread step it & start drawing its frames
         if self.is_running:
-            self.controller_window.after(self.step_delay, self.iteratively_step_model)
+            self.last_status_update_time = None
+            self.run_event.set()
+            self.controller_window.after(self.frame_poll_interval, self.draw_latest_frame)
 
             # update the run button text to reflect that if the button is clicked, the model will pause
             self.run_and_pause_button_text.set("Pause")
@@ -183,8 +251,14 @@ class Gui:
             self.step_button.configure(state=DISABLED)
             self.reset_button.configure(state=DISABLED)
 
-        # if the model is now paused
+        # if the model is now paused - the simulation's thread stops after the step it is on, then its last frame is drawn
         else:
+            self.run_event.clear()
+            with self.simulation_lock:
+                frame = self.latest_frame.take()
+            if frame is not None:
+                self.draw_model_state(frame)
+
             # update the pause button text to reflect that if the button is clicked, the model will run
             self.run_and_pause_button_text.set("Continue Run")
 
@@ -193,88 +267,159 @@ class Gui:
             self.reset_button.configure(state=NORMAL)
 
     def iteratively_step_model(self):
-        # check if the model is running
+        # runs on the simulation's thread - stepping the model whenever it is running
+        while not self.is_exiting:
+            if not self.run_event.wait(timeout=0.1):
+                continue
+            with self.simulation_lock:
+                # check the model wasn't paused while waiting for the lock
+                if not self.run_event.is_set():
+                    continue
+                try:
+                    # in fast-forward - step the model until the time budget is used up, then publish the state once
+                    if self.fast_forward_budget:
+                        batch_end_time = time.perf_counter() + self.fast_forward_budget / 1000
+                        while self.run_event.is_set() and time.perf_counter() < batch_end_time:
+                            self.update_simulation_function()
+                            self.current_iteration_num += 1
+                        self.publish_frame()
+                        continue
+
+                    # update the simulation by stepping the model once
+                    self.update_simulation_function()
+                    self.current_iteration_num += 1
+
+                    # if we have stepped enough times - publish the new model state to be drawn
+                    if (self.current_iteration_num % self.step_size) == 0:
+                        self.publish_frame()
+
+                except AllAntsDead:
+                    # if this custom exception has been caught, we know all ants in the simulation are dead
+                    # in this case, stop stepping & let the controller pause the simulation
+                    self.run_event.clear()
+                    self.publish_frame()
+                    self.all_ants_dead = True
+
+            # wait between the steps if asked to
+            if self.step_delay:
+                time.sleep(self.step_delay / self.step_size / 1000)
+
+    def publish_frame(self):
+        # pass a copy of the model's state (with the history since the last published frame) to the controller
+        frame = self.get_frame_function(self.num_history_rows_published)
+        self.num_history_rows_published = frame.history_start + len(frame.history_rows)
+        self.latest_frame.put(frame)
+
+    def draw_latest_frame(self):
+        # runs on the controller's thread - drawing only the newest frame & skipping any that were replaced
+        frame = self.latest_frame.take()
+        if frame is not None:
+            self.draw_model_state(frame)
+            self.phase_summary = getattr(frame, "phase_summary", "")
+
+        # update the status to reflect the steps taken & how fast they are being taken - along with the slowest phases if profiling
         if self.is_running:
-            try:
-                # update the simulation by stepping the model once
-                self.update_simulation_function()
-                self.current_iteration_num += 1
-
-                # update the status to reflect this step
-                self.set_status_bar("Step {}".format(self.current_iteration_num))
-                self.status.configure(foreground='black')
+            self.update_ticks_per_second()
+            status = "Step {} ({:.0f} steps/s)".format(self.current_iteration_num, self.ticks_per_second)
+            self.set_status_bar(status + "\n" + self.phase_summary if self.phase_summary else status)
+            self.status.configure(foreground='black')
 
-                # if we have stepped enough times - plot the new model state in the figure
-                if (self.current_iteration_num % self.step_size) == 0:
-                    self.draw_model_state()
+        # pause the simulation once all the ants are dead
+        if self.all_ants_dead:
+            self.all_ants_dead = False
+            if self.is_running:
+                self.start_or_stop_running_the_simulation()
 
-                # call this function again to continue updating the simulation
-                self.controller_window.after(int(self.step_delay*1.0/self.step_size), self.iteratively_step_model)
+        # keep drawing while the model is running
+        if self.is_running:
+            self.controller_window.after(self.frame_poll_interval, self.draw_latest_frame)
 
-            except AllAntsDead:
-                # if this custom exception has been caught, we know all ants in the simulation are dead
-                # in this case, pause the simulation
-                self.start_or_stop_running_the_simulation()
+    def update_ticks_per_second(self):
+        # measure the rate over the steps taken since the last measurement - once enough time has passed
+        now = time.perf_counter()
+        if self.last_status_update_time is None:
+            self.last_status_update_time, self.last_status_update_iteration = now, self.current_iteration_num
+        elif now - self.last_status_update_time >= self.status_update_interval:
+            self.ticks_per_second = (self.current_iteration_num - self.last_status_update_iteration) / (now - self.last_status_update_time)
+            self.last_status_update_time, self.last_status_update_iteration = now, self.current_iteration_num
 
     def step_model_once(self):
         # stop the model from running
         self.is_running = False
+        self.run_event.clear()
         self.run_and_pause_button_text.set("Continue Run")
 
-        # update the simulation by stepping the model once
-        self.update_simulation_function()
-        self.current_iteration_num += 1
+        # update the simulation by stepping the model once - once the simulation's thread has finished its step
+        with self.simulation_lock:
+            self.update_simulation_function()
+            self.current_iteration_num += 1
+            self.publish_frame()
 
         # update the status to reflect this step
         self.set_status_bar("Step {}".format(self.current_iteration_num))
 
         # plot the new model state in the figure
-        self.draw_model_state()
+        self.draw_model_state(self.latest_frame.take())
 
     def reset_model(self):
         # stop the model from running
         self.is_running = False
+        self.run_event.clear()
         self.run_and_pause_button_text.set("Run")
 
-        # re-initialise the model so it starts again
-        self.initialise_model_function()
-        self.current_iteration_num = 0
+        # re-initialise the model so it starts again - once the simulation's thread has finished its step
+        with self.simulation_lock:
+            self.initialise_model_function()
+            self.current_iteration_num = 0
+            self.all_ants_dead = False
+            self.latest_frame.clear()
+            self.num_history_rows_published = 0
+            self.publish_frame()
         self.set_status_bar("Model has been reset")
 
         # plot the initialised state of the model
-        self.draw_model_state()
+        self.draw_model_state(self.latest_frame.take())
 
-    def draw_model_state(self):
+    def draw_model_state(self, frame):
         plt.ion()
 
         # if there has not been a figure created for the plot yet - create one
         if (self.simulation_figure == None) or (self.simulation_figure.canvas.manager.window == None):
             self.simulation_figure = plt.figure(figsize=(self.figXDim, self.figYDim))
 
-        # draw the current state of the simulation
-        self.draw_simulation_state_function()
+        # draw the state of the simulation in the frame
+        self.draw_simulation_state_function(frame)
         self.simulation_figure.canvas.manager.window.update()
         plt.show()
 
-    def start_simulation(self, initialise_func, draw_func, update_func):
+    def start_simulation(self, initialise_func, draw_func, update_func, frame_func, merge_frames_func=None):
 
         # define class variables of these functions for updating the ant simulation
         self.initialise_model_function = initialise_func
         self.draw_simulation_state_function = draw_func
         self.update_simulation_function = update_func
+        self.get_frame_function = frame_func
+        self.latest_frame = LatestFrameSlot(merge_frames_func)
 
         # initialise the simulation model
         self.initialise_model_function()
 
         # draw the initial state of the simulation
-        self.draw_model_state()
+        self.publish_frame()
+        self.draw_model_state(self.latest_frame.take())
+
+        # start the thread the simulation is stepped on - it waits until the simulation is run
+        self.simulation_thread = threading.Thread(target=self.iteratively_step_model, daemon=True)
+        self.simulation_thread.start()
 
         # run the simulation following user input commands in the control panel
         self.controller_window.mainloop()
 
     def exit_gui(self):
-        # stop the model running
+        # stop the model running & the simulation's thread
         self.is_running = False
+        self.is_exiting = True
+        self.run_event.clear()
         self.controller_window.quit()
 
         # close all the plot windows and close the control panel
@@ -0,0 +1,126 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the command line arguments
+import argparse
+
+# package for writing the simulation history
+import csv
+
+# package for reading the history a chunk at a time
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation being run - this never loads the GUI or plotting packages
+import ant_simulation
+import tiled_simulation
+from ant_classes import anthill_history_columns
+
+
+# ===================================
+# | DEFINE FUNCTIONS FOR SIMULATION |
+# ===================================
+# the anthill time series that are written out at the end of the run
+history_columns = list(anthill_history_columns)
+
+# the number of rows of history read at a time while writing it out
+history_rows_per_read = 65536
+
+
+def write_anthill_history(anthill, output_path):
+
+    # write one row per simulated hour with each of the tracked variables - reading the history a block at a time
+    with open(output_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(["time"] + history_columns)
+        for start in range(0, len(anthill.history), history_rows_per_read):
+            rows = anthill.history.get_rows(start, start + history_rows_per_read)
+            times = np.arange(start + 1, start + len(rows) + 1)
+            writer.writerows(zip(times.tolist(), *(rows[column].tolist() for column in history_columns)))
+
+
+def summarise_run(anthill, ticks_run):
+
+    # summarise how far the searches were shortened & how quickly the colony gathered food
+    summary = {
+        "ticks_run": ticks_run,
+        "food_brought_back": float(anthill.food_brought_back),
+        "num_search_steps": anthill.num_search_steps,
+        "num_return_steps": anthill.num_return_steps,
+        "path_compression_ratio": anthill.num_search_steps / anthill.num_return_steps if anthill.num_return_steps else 1.0,
+        "ticks_per_food_unit": ticks_run / anthill.food_brought_back if anthill.food_brought_back else float("inf"),
+    }
+    return summary
+
+
+def parse_arguments(args=None):
+
+    parser = argparse.ArgumentParser(description="Run the ant simulation without the GUI")
+    parser.add_argument("config_path", help="the yaml file containing the simulation parameters")
+    parser.add_argument("num_ticks", type=int, help="the number of hours to simulate")
+    parser.add_argument("output_path", help="the csv file the anthill history is written to - one per colony (with _colony<N> added) when there are several")
+    parser.add_argument("--seed", type=int, default=None, help="the random seed - overrides the one in the config file")
+    parser.add_argument("--from-checkpoint", default=None, help="carry on the simulation saved in this checkpoint file")
+    parser.add_argument("--save-checkpoint", default=None, help="save the state of the simulation to this checkpoint file at the end of the run")
+    parser.add_argument("--profile", action="store_true", help="time each phase of the ticks & report them at the end of the run")
+    parser.add_argument("--profile-ticks", type=int, nargs=2, default=None, metavar=("START", "STOP"), help="run the ticks from START up to STOP under cProfile")
+    parser.add_argument("--profile-output", default=None, help="save the cProfile stats to this file rather than printing them")
+    parser.add_argument("--tiles", type=int, default=None, help="split the map into this many bands of rows, each run in its own process")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+
+    arguments = parse_arguments(args)
+
+    # run the simulation until the tick count is reached or all the ants have died
+    overrides = {}
+    if arguments.seed is not None:
+        overrides["random_seed"] = arguments.seed
+    if arguments.profile or arguments.profile_ticks:
+        overrides.update(profile_phases=True, profile_ticks=arguments.profile_ticks, profile_path=arguments.profile_output)
+    ant_simulation.load_config(arguments.config_path, overrides)
+    if arguments.tiles is not None:
+        # the tiled runs can't be carried on from (or saved to) a checkpoint
+        if arguments.from_checkpoint or arguments.save_checkpoint:
+            raise ValueError("The tiled simulation can't be checkpointed")
+        simulation = tiled_simulation.run_simulation(arguments.num_ticks, arguments.tiles)
+        ticks_run, colonies = simulation.time, simulation.colonies
+    else:
+        # a run carried on from a checkpoint takes the values in the config file over the checkpoint's - apart from its seed,
+        # so the random numbers carry on from where they stopped unless --seed is given
+        if arguments.from_checkpoint:
+            file_config_variables = ant_simulation.read_config_file(arguments.config_path)
+            file_config_variables.pop("random_seed", None)
+            overrides = dict(file_config_variables, **overrides)
+        ticks_run = ant_simulation.run_simulation(arguments.num_ticks, arguments.from_checkpoint, overrides)
+        if arguments.save_checkpoint:
+            ant_simulation.save_checkpoint(arguments.save_checkpoint)
+            print("Checkpoint saved to {}".format(arguments.save_checkpoint))
+        colonies = ant_simulation.colonies
+
+    # save the history of each anthill
+    for colony in colonies:
+        output_path = ant_simulation.get_colony_path(arguments.output_path, colony.index, len(colonies))
+        write_anthill_history(colony.anthill, output_path)
+        print("Simulated {} hours - history written to {}".format(ticks_run, output_path))
+
+    # report how each colony's searches were shortened & the effect on gathering food
+    for colony in colonies:
+        summary = summarise_run(colony.anthill, ticks_run)
+        if len(colonies) > 1:
+            print("Colony {} at ({}, {}):".format(colony.index + 1, colony.anthill.x_loc, colony.anthill.y_loc))
+        print("Return paths ({}): {} steps searched, {} steps home - compression ratio {:.2f}".format(
+            ant_simulation.return_path_compression, summary["num_search_steps"], summary["num_return_steps"], summary["path_compression_ratio"]))
+        print("Food brought back: {:.0f} units - {:.3f} ticks per food unit".format(summary["food_brought_back"], summary["ticks_per_food_unit"]))
+
+    # report the time spent in each phase of the ticks
+    if ant_simulation.profiler is not None:
+        print(ant_simulation.profiler.get_report())
+
+
+if __name__ == "__main__":
+    main()
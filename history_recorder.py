@@ -0,0 +1,315 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for describing the history file
+import json
+import os
+
+# package for keeping the recent history in memory
+from collections import deque
+
+# package for storing the history as typed arrays
+import numpy as np
+
+# ============================
+# | HISTORY RECORDER CLASS   |
+# ============================
+class HistoryRecorder:
+    """
+    Records one row of values per tick into fixed-size typed chunks. Without a file every chunk stays in memory.
+    With a file each chunk is appended to it once it is full, and only the latest few chunks are kept in memory,
+    so the memory used stays flat however long the run is - the file can be memory-mapped with load_history().
+    """
+
+    def __init__(self, columns, path=None, chunk_size=4096, window_chunks=4):
+
+        # one field per column in each row
+        self.columns = list(columns)
+        self.row_dtype = np.dtype([(column, dtype) for column, dtype in columns.items()])
+        self.chunk_size = chunk_size
+        self.window_chunks = window_chunks
+
+        # the full chunks kept in memory & the chunk being filled
+        self.num_rows = 0
+        self.chunks = deque()
+        self.chunk = np.zeros(chunk_size, dtype=self.row_dtype)
+        self.chunk_fill = 0
+
+        # the file the rows are appended to & how many rows are in it
+        self.path = None
+        self.num_written = 0
+        if path is not None:
+            self.stream_to(path)
+
+    def __len__(self):
+        return self.num_rows
+
+    def __getitem__(self, column):
+        return self.get_series(column)
+
+    def __getstate__(self):
+
+        # save every row when they are all in memory - or, when they are written to a file, only the rows of the chunk being
+        # filled, with the file (written up to the start of that chunk) holding the rest
+        state = dict(self.__dict__)
+        if self.path is None:
+            state["rows"] = self.get_rows()
+            state["num_written"] = 0
+        else:
+            self.flush()
+            state["rows"] = self.chunk[:self.chunk_fill].copy()
+            state["num_written"] = self.num_rows - self.chunk_fill
+        del state["chunks"], state["chunk"], state["chunk_fill"]
+        return state
+
+    def __setstate__(self, state):
+
+        # pick up the rows in the file where the saved recorder had got to - rows written to it since are written over
+        rows = state.pop("rows")
+        self.__dict__.update(state)
+        if self.path is not None:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) < self.num_written * self.row_dtype.itemsize:
+                raise ValueError("History file '{}' is missing or shorter than the {} rows it had when it was saved".format(self.path, self.num_written))
+        self.num_rows = self.num_written
+        self.chunks = deque()
+        self.chunk = np.zeros(self.chunk_size, dtype=self.row_dtype)
+        self.chunk_fill = 0
+        self.extend(rows)
+
+    def append(self, *values):
+
+        # fill in the next row of the current chunk - moving on to a new chunk once it is full
+        self.chunk[self.chunk_fill] = values
+        self.chunk_fill += 1
+        self.num_rows += 1
+        if self.chunk_fill == self.chunk_size:
+            self.finish_chunk()
+
+    def extend(self, rows):
+
+        # copy the rows into the chunks a chunk at a time
+        while len(rows):
+            num_copied = min(len(rows), self.chunk_size - self.chunk_fill)
+            self.chunk[self.chunk_fill:self.chunk_fill + num_copied] = rows[:num_copied]
+            self.chunk_fill += num_copied
+            self.num_rows += num_copied
+            rows = rows[num_copied:]
+            if self.chunk_fill == self.chunk_size:
+                self.finish_chunk()
+
+    def finish_chunk(self):
+
+        # keep the full chunk in memory - dropping the oldest one if it is already in the file
+        self.chunks.append(self.chunk)
+        self.chunk = np.zeros(self.chunk_size, dtype=self.row_dtype)
+        self.chunk_fill = 0
+        if self.path is not None:
+            self.flush()
+            while len(self.chunks) > self.window_chunks:
+                self.chunks.popleft()
+
+    def get_memory_start(self):
+        # the first row that is still held in memory
+        return self.num_rows - self.chunk_fill - self.chunk_size * len(self.chunks)
+
+    def get_memory_rows(self, start):
+
+        # join the chunks in memory from the one holding the start row onwards
+        first_chunk, start_in_chunk = divmod(start - self.get_memory_start(), self.chunk_size)
+        chunks = [self.chunks[i] for i in range(first_chunk, len(self.chunks))] + [self.chunk[:self.chunk_fill]]
+        return np.concatenate(chunks)[start_in_chunk:]
+
+    def get_rows(self, start=0, stop=None):
+
+        # read the rows from memory if they are all still there - otherwise from the file
+        stop = self.num_rows if stop is None else min(stop, self.num_rows)
+        if start >= self.get_memory_start():
+            return self.get_memory_rows(start)[:stop - start]
+        self.flush()
+        return np.array(load_history(self.path)[start:stop])
+
+    def get_series(self, column, start=0, stop=None):
+        return self.get_rows(start, stop)[column]
+
+    def get_window(self, column):
+        # the latest values of a column that are held in memory
+        return self.get_memory_rows(self.get_memory_start())[column]
+
+    def get_latest(self, column):
+        return self.get_rows(self.num_rows - 1)[column][0]
+
+    def stream_to(self, path):
+
+        # carry on writing to the file already being written to
+        if (self.path is not None) and os.path.abspath(path) == os.path.abspath(self.path):
+            return
+
+        # write the rows so far to a new file (copying the ones in the old file a block at a time, without changing it)
+        # & describe its rows beside it so it can be memory-mapped later
+        with open(path + ".json", "w") as description_file:
+            json.dump({"dtype": self.row_dtype.descr}, description_file)
+        with open(path, "wb") as history_file:
+            if self.path is not None:
+                with open(self.path, "rb") as old_history_file:
+                    num_bytes = self.num_written * self.row_dtype.itemsize
+                    while num_bytes > 0:
+                        block = old_history_file.read(min(num_bytes, 1 << 20))
+                        history_file.write(block)
+                        num_bytes -= len(block)
+                self.get_memory_rows(self.num_written).tofile(history_file)
+            else:
+                self.get_rows().tofile(history_file)
+        self.path = path
+        self.num_written = self.num_rows
+        while len(self.chunks) > self.window_chunks:
+            self.chunks.popleft()
+
+    def stop_streaming(self):
+
+        # read the rows back from the file (without changing it) & keep every row in memory from now on
+        if self.path is None:
+            return
+        rows = np.concatenate([load_history(self.path)[:self.num_written], self.get_memory_rows(self.num_written)])
+        self.path = None
+        self.num_rows = self.num_written = 0
+        self.chunks = deque()
+        self.chunk_fill = 0
+        self.extend(rows)
+
+    def flush(self):
+
+        # write the rows that aren't in the file yet after the ones that are - dropping any rows left past them in the file
+        # by a run that carried on after the checkpoint this one was restored from
+        if self.path is not None and self.num_written < self.num_rows:
+            with open(self.path, "r+b") as history_file:
+                history_file.seek(self.num_written * self.row_dtype.itemsize)
+                self.get_memory_rows(self.num_written).tofile(history_file)
+                history_file.truncate()
+            self.num_written = self.num_rows
+
+
+def load_history(path):
+
+    # memory-map a history file written by a HistoryRecorder
+    with open(path + ".json") as description_file:
+        row_dtype = np.dtype([tuple(field) for field in json.load(description_file)["dtype"]])
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=row_dtype)
+    return np.memmap(path, dtype=row_dtype, mode="r")
+
+
+# ============================
+# | HISTORY PYRAMID CLASS    |
+# ============================
+class HistoryPyramid:
+    """
+    Keeps the minimum & maximum of some series over blocks of ticks - level k has blocks of (base_block_size * 2**k) ticks,
+    each made from two blocks of the level below - so a long history can be drawn with a bounded number of points
+    that still shows its peaks & troughs. New ticks only update the blocks they complete.
+    """
+
+    def __init__(self, num_columns, base_block_size=16):
+
+        self.num_columns = num_columns
+        self.base_block_size = base_block_size
+        self.num_rows = 0
+
+        # the ticks not yet in a full block of the first level
+        self.pending = np.zeros((0, num_columns))
+
+        # the levels - each block holds the minimum & maximum of each series with the ticks they happened at
+        self.levels = []
+
+    def __len__(self):
+        return self.num_rows
+
+    def add_level(self):
+        self.levels.append({
+            "size": 0,
+            "mins": np.zeros((16, self.num_columns)),
+            "maxs": np.zeros((16, self.num_columns)),
+            "min_times": np.zeros((16, self.num_columns), dtype=np.int64),
+            "max_times": np.zeros((16, self.num_columns), dtype=np.int64),
+        })
+
+    def append_blocks(self, level_num, mins, maxs, min_times, max_times):
+
+        # add blocks to the end of a level - making room for them first
+        if level_num == len(self.levels):
+            self.add_level()
+        level = self.levels[level_num]
+        size, num_new = level["size"], len(mins)
+        if size + num_new > len(level["mins"]):
+            for field in ["mins", "maxs", "min_times", "max_times"]:
+                grown = np.zeros((2 * (size + num_new), self.num_columns), dtype=level[field].dtype)
+                grown[:size] = level[field][:size]
+                level[field] = grown
+        level["mins"][size:size + num_new] = mins
+        level["maxs"][size:size + num_new] = maxs
+        level["min_times"][size:size + num_new] = min_times
+        level["max_times"][size:size + num_new] = max_times
+        level["size"] += num_new
+
+    def extend(self, rows):
+
+        # group the new ticks into full blocks of the first level - keeping the rest until their block is full
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.num_columns)
+        first_pending_time = self.num_rows - len(self.pending)
+        self.pending = np.concatenate([self.pending, rows])
+        self.num_rows += len(rows)
+        num_blocks = len(self.pending) // self.base_block_size
+        if num_blocks == 0:
+            return
+        blocks = self.pending[:num_blocks * self.base_block_size].reshape(num_blocks, self.base_block_size, self.num_columns)
+        block_starts = first_pending_time + self.base_block_size * np.arange(num_blocks)[:, None]
+        self.append_blocks(0, blocks.min(axis=1), blocks.max(axis=1),
+                           block_starts + blocks.argmin(axis=1), block_starts + blocks.argmax(axis=1))
+        self.pending = self.pending[num_blocks * self.base_block_size:]
+
+        # merge each new pair of blocks into a block of the level above
+        level_num = 0
+        while level_num < len(self.levels) and self.levels[level_num]["size"] >= 2:
+            level = self.levels[level_num]
+            num_above = self.levels[level_num + 1]["size"] if level_num + 1 < len(self.levels) else 0
+            first, last = 2 * num_above, 2 * (level["size"] // 2)
+            if first == last:
+                break
+            left, right = slice(first, last, 2), slice(first + 1, last, 2)
+            take_right_min = level["mins"][right] < level["mins"][left]
+            take_right_max = level["maxs"][right] > level["maxs"][left]
+            self.append_blocks(level_num + 1,
+                               np.where(take_right_min, level["mins"][right], level["mins"][left]),
+                               np.where(take_right_max, level["maxs"][right], level["maxs"][left]),
+                               np.where(take_right_min, level["min_times"][right], level["min_times"][left]),
+                               np.where(take_right_max, level["max_times"][right], level["max_times"][left]))
+            level_num += 1
+
+    def get_view(self, max_points):
+
+        # use the finest level with few enough blocks, then the finer levels & the pending ticks to cover the end
+        level_num = 0
+        while level_num < len(self.levels) - 1 and self.levels[level_num]["size"] > max_points // 2:
+            level_num += 1
+        parts = []
+        covered = 0
+        for finer_level_num in range(level_num, -1, -1) if self.levels else []:
+            level = self.levels[finer_level_num]
+            block_size = self.base_block_size << finer_level_num
+            first_block = covered // block_size
+            blocks = slice(first_block, level["size"])
+            parts.append([level[field][blocks] for field in ["mins", "maxs", "min_times", "max_times"]])
+            covered = level["size"] * block_size
+
+        # each block gives its minimum & maximum in the order they happened
+        times, values = [], []
+        for mins, maxs, min_times, max_times in parts:
+            min_first = min_times <= max_times
+            first_times = np.where(min_first, min_times, max_times)
+            second_times = np.where(min_first, max_times, min_times)
+            first_values = np.where(min_first, mins, maxs)
+            second_values = np.where(min_first, maxs, mins)
+            times.append(np.stack([first_times, second_times], axis=1).reshape(-1, self.num_columns))
+            values.append(np.stack([first_values, second_values], axis=1).reshape(-1, self.num_columns))
+        times.append(np.repeat(np.arange(self.num_rows - len(self.pending), self.num_rows)[:, None], self.num_columns, axis=1))
+        values.append(self.pending)
+        return np.concatenate(times), np.concatenate(values)
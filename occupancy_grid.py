@@ -0,0 +1,76 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for counting the ants at each location
+import numpy as np
+
+
+# =======================================
+# | DEFINE FUNCTIONS FOR OCCUPANCY GRID |
+# =======================================
+def get_cells(x_locs, y_locs, width):
+    # the flat indices (y * width + x) of the locations
+    return np.asarray(y_locs, dtype=np.int64) * width + np.asarray(x_locs, dtype=np.int64)
+
+
+# ========================
+# | OCCUPANCY GRID CLASS |
+# ========================
+class OccupancyGrid:
+    """
+    Counts the mature ants of each colony at each location of the map. The counts are updated as the ants move,
+    mature & die, so finding the ants at a location or the density of each colony over a region never needs a scan
+    of the ants.
+    """
+
+    def __init__(self, width, height, num_colonies):
+
+        self.width = width
+        self.height = height
+
+        # the number of each colony's mature ants at each location - indexed by [colony, y, x]
+        self.counts = np.zeros((num_colonies, height, width), dtype=np.int32)
+
+    def add(self, colony_index, x_loc, y_loc, num_ants=1):
+        self.counts[colony_index, y_loc, x_loc] += num_ants
+
+    def remove(self, colony_index, x_loc, y_loc):
+        self.counts[colony_index, y_loc, x_loc] -= 1
+
+    def move(self, colony_index, old_x_loc, old_y_loc, new_x_loc, new_y_loc):
+        counts = self.counts[colony_index]
+        counts[old_y_loc, old_x_loc] -= 1
+        counts[new_y_loc, new_x_loc] += 1
+
+    def add_many(self, colony_index, x_locs, y_locs):
+        np.add.at(self.counts[colony_index].reshape(-1), get_cells(x_locs, y_locs, self.width), 1)
+
+    def remove_many(self, colony_index, x_locs, y_locs):
+        np.subtract.at(self.counts[colony_index].reshape(-1), get_cells(x_locs, y_locs, self.width), 1)
+
+    def move_many(self, colony_index, old_x_locs, old_y_locs, new_x_locs, new_y_locs):
+        # only the ants that changed location need counting again
+        moved = (old_x_locs != new_x_locs) | (old_y_locs != new_y_locs)
+        self.remove_many(colony_index, old_x_locs[moved], old_y_locs[moved])
+        self.add_many(colony_index, new_x_locs[moved], new_y_locs[moved])
+
+    def get_ants_at(self, x_loc, y_loc, colony_index=None):
+        # the number of mature ants at a location - of one colony or of every colony together
+        if colony_index is not None:
+            return int(self.counts[colony_index, y_loc, x_loc])
+        return int(self.counts[:, y_loc, x_loc].sum())
+
+    def get_region_counts(self, x_start, y_start, x_stop, y_stop):
+        # the number of each colony's mature ants in the region [x_start, x_stop) x [y_start, y_stop)
+        return self.counts[:, y_start:y_stop, x_start:x_stop].sum(axis=(1, 2))
+
+    def get_density(self, block_size):
+
+        # the density (ants per location) of each colony over each block of the map - the blocks at the edges may be cut short
+        num_block_rows, num_block_columns = -(-self.height // block_size), -(-self.width // block_size)
+        padded = np.zeros((len(self.counts), num_block_rows * block_size, num_block_columns * block_size), dtype=np.int64)
+        padded[:, :self.height, :self.width] = self.counts
+        block_counts = padded.reshape(len(self.counts), num_block_rows, block_size, num_block_columns, block_size).sum(axis=(2, 4))
+        block_rows = np.minimum(block_size, self.height - block_size * np.arange(num_block_rows))
+        block_columns = np.minimum(block_size, self.width - block_size * np.arange(num_block_columns))
+        return block_counts / np.outer(block_rows, block_columns)
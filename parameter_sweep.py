@@ -0,0 +1,225 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the command line arguments & finding the results
+import argparse
+import os
+
+# packages for naming each run of the sweep & building the grid
+import hashlib
+import itertools
+import json
+
+# package for running the simulations across all the cores
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# package for reading the sweep file
+import yaml
+
+# package for storing the results as columns
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation being swept - this never loads the GUI or plotting packages
+import ant_simulation
+
+
+# ===============================
+# | DEFINE FUNCTIONS FOR SWEEP  |
+# ===============================
+# the anthill time series kept for every colony of every run of the sweep
+sweep_series = ["num_active_ants", "food_collected"]
+
+# the outcomes kept for every colony of every run of the sweep
+colony_outcomes = ["extinction_time", "peak_population", "final_food", "food_brought_back"]
+
+# the layout of the finished runs' files - part of the run names, so runs saved in an older layout are run again
+run_file_version = 2
+
+
+def read_sweep_file(sweep_path):
+
+    # read the sweep definition - resolving the base config relative to the sweep file
+    with open(sweep_path) as sweep_file:
+        sweep = yaml.safe_load(sweep_file)
+    sweep_folder = os.path.dirname(os.path.abspath(sweep_path))
+    sweep["base_config"] = os.path.join(sweep_folder, sweep.get("base_config", ant_simulation.default_config_path))
+    if sweep.get("base_checkpoint"):
+        sweep["base_checkpoint"] = os.path.join(sweep_folder, sweep["base_checkpoint"])
+    return sweep
+
+
+def expand_sweep(sweep):
+
+    # every combination of the grid values plus any listed sets of overrides
+    grid = sweep.get("grid") or {}
+    names = list(grid)
+    cells = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))] if names else []
+    cells += [dict(cell) for cell in sweep.get("cells") or []]
+    if not cells:
+        cells = [{}]
+
+    # run each cell once per replicate - replicate r uses the same seed in every cell so the cells are compared on the same random numbers
+    first_seed = sweep.get("seed", 0)
+    runs = []
+    for cell_index, cell in enumerate(cells):
+        for replicate in range(sweep.get("replicates", 1)):
+            runs.append({"cell": cell_index, "replicate": replicate, "seed": first_seed + replicate, "overrides": cell})
+    return runs
+
+
+def get_file_hash(path):
+
+    # the hash of a file's contents - read a block at a time as checkpoints can be large
+    file_hash = hashlib.sha1()
+    with open(path, "rb") as hashed_file:
+        for block in iter(lambda: hashed_file.read(1 << 20), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def get_run_name(run, num_ticks, base_config_variables, checkpoint_hash=None):
+
+    # name the run by everything that decides its result - a changed grid, base config or checkpoint never reuses an old run
+    key = json.dumps({"overrides": run["overrides"], "seed": run["seed"], "num_ticks": num_ticks, "base_config": base_config_variables,
+                      "checkpoint": checkpoint_hash, "version": run_file_version}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def run_sweep_cell(config_path, overrides, seed, num_ticks, run_path, checkpoint_path=None):
+
+    # run one simulation headless with its overrides & seed - branching off from the checkpoint if there is one
+    # (the history is kept in memory as the runs can't share one history file)
+    overrides = dict(overrides, random_seed=seed, history_path=None)
+    if checkpoint_path is None:
+        ant_simulation.load_config(config_path, overrides)
+    ticks_run = ant_simulation.run_simulation(num_ticks, checkpoint_path, overrides)
+    anthills = [colony.anthill for colony in ant_simulation.colonies]
+    histories = [anthill.history.get_rows() for anthill in anthills]
+
+    # a colony has died out if the run ended with no mature ants & no food in its ant hill
+    died_out = [history["num_active_ants"][-1] == 0 and history["food_collected"][-1] == 0 for history in histories]
+    total_populations = [history["num_active_ants"] + history["num_ant_eggs"] + history["num_ant_larvae"] + history["num_ant_pupa"]
+                         for history in histories]
+
+    # write the run to a temporary file first so an interrupted run is never mistaken for a finished one
+    # - each outcome & series has one row per colony
+    temporary_path = run_path + ".tmp.npz"
+    np.savez(temporary_path,
+             ticks_run=ticks_run,
+             extinction_time=np.array([ticks_run if colony_died_out else -1 for colony_died_out in died_out]),
+             peak_population=np.array([int(total_population.max()) for total_population in total_populations]),
+             final_food=np.array([float(anthill.food_count) for anthill in anthills]),
+             food_brought_back=np.array([float(anthill.food_brought_back) for anthill in anthills]),
+             **{series: np.array([history[series] for history in histories], dtype=np.float64) for series in sweep_series})
+    os.replace(temporary_path, run_path)
+    return run_path
+
+
+def get_parameter_text(value):
+    # a parameter that isn't a number as text - strings as they are & anything else (such as a list of locations) as json
+    return value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+
+
+def get_parameter_columns(runs):
+
+    # one column per parameter - numbers are stored as floats (nan where a run doesn't set it) & anything else, such as
+    # the name of a compression mode, as its json text ("" where a run doesn't set it)
+    columns = {}
+    for name in sorted({name for run in runs for name in run["overrides"]}):
+        values = [run["overrides"][name] for run in runs if name in run["overrides"]]
+        if all(isinstance(value, (int, float)) for value in values):
+            columns["param_" + name] = np.array([run["overrides"].get(name, np.nan) for run in runs], dtype=np.float64)
+            continue
+        try:
+            texts = [get_parameter_text(run["overrides"][name]) if name in run["overrides"] else "" for run in runs]
+        except TypeError:
+            raise ValueError("The values of '{}' in the sweep can't be stored in the results".format(name))
+        columns["param_" + name] = np.array(texts, dtype=str)
+    return columns
+
+
+def collect_results(runs, run_paths, results_path):
+
+    # one column per parameter, outcome & series - the outcomes & series have a colony axis (padded with nan for the runs
+    # with fewer colonies) & the series are padded with nan after the colonies die out
+    columns = {
+        "cell": np.array([run["cell"] for run in runs]),
+        "replicate": np.array([run["replicate"] for run in runs]),
+        "seed": np.array([run["seed"] for run in runs]),
+    }
+    columns.update(get_parameter_columns(runs))
+
+    outcomes = [np.load(run_path) for run_path in run_paths]
+    columns["ticks_run"] = np.array([run_outcome["ticks_run"] for run_outcome in outcomes])
+    columns["num_colonies"] = np.array([len(run_outcome["extinction_time"]) for run_outcome in outcomes])
+    num_colonies = int(columns["num_colonies"].max())
+    for outcome in colony_outcomes:
+        column = np.full((len(runs), num_colonies), np.nan)
+        for row, run_outcome in enumerate(outcomes):
+            column[row, :len(run_outcome[outcome])] = run_outcome[outcome]
+        columns[outcome] = column
+    num_ticks = max(run_outcome[sweep_series[0]].shape[1] for run_outcome in outcomes)
+    for series in sweep_series:
+        column = np.full((len(runs), num_colonies, num_ticks), np.nan)
+        for row, run_outcome in enumerate(outcomes):
+            colony_series = run_outcome[series]
+            column[row, :colony_series.shape[0], :colony_series.shape[1]] = colony_series
+        columns[series] = column
+
+    np.savez_compressed(results_path, **columns)
+    return columns
+
+
+def run_sweep(sweep, results_path, num_workers=None):
+
+    # keep each finished run next to the results file so an interrupted sweep can pick up where it stopped
+    num_ticks = sweep["num_ticks"]
+    checkpoint_path = sweep.get("base_checkpoint")
+    runs = expand_sweep(sweep)
+
+    # check every parameter can be stored in the results before any run is started
+    get_parameter_columns(runs)
+
+    # the runs are named by the contents of the base config & checkpoint - so editing either never reuses an old run
+    base_config_variables = ant_simulation.read_config_file(sweep["base_config"])
+    checkpoint_hash = get_file_hash(checkpoint_path) if checkpoint_path else None
+    runs_folder = os.path.splitext(results_path)[0] + "_runs"
+    os.makedirs(runs_folder, exist_ok=True)
+    run_paths = [os.path.join(runs_folder, get_run_name(run, num_ticks, base_config_variables, checkpoint_hash) + ".npz") for run in runs]
+
+    # only run the ones that haven't finished - the same run can appear twice if the grid repeats a cell
+    to_run = {run_path: run for run, run_path in zip(runs, run_paths) if not os.path.exists(run_path)}
+    print("{} runs in the sweep - {} already finished".format(len(runs), len(runs) - len(to_run)))
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(run_sweep_cell, sweep["base_config"], run["overrides"], run["seed"], num_ticks, run_path, checkpoint_path)
+                   for run_path, run in to_run.items()]
+        for num_finished, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            print("Finished run {} of {}".format(num_finished, len(futures)))
+
+    return collect_results(runs, run_paths, results_path)
+
+
+def parse_arguments(args=None):
+
+    parser = argparse.ArgumentParser(description="Run the ant simulation over a grid of config values across all cores")
+    parser.add_argument("sweep_path", help="the yaml file listing the config values to sweep")
+    parser.add_argument("results_path", help="the npz file the columns of results are written to")
+    parser.add_argument("--workers", type=int, default=None, help="the number of processes to run - defaults to the number of cores")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+
+    arguments = parse_arguments(args)
+    run_sweep(read_sweep_file(arguments.sweep_path), arguments.results_path, arguments.workers)
+    print("Sweep results written to {}".format(arguments.results_path))
+
+
+if __name__ == "__main__":
+    main()
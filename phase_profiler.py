@@ -0,0 +1,119 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for timing the phases & profiling a range of ticks
+import cProfile
+import pstats
+from time import perf_counter
+
+# package for writing the profile of the ticks to the report
+import io
+
+
+# ===========================
+# | PHASE PROFILER CLASS    |
+# ===========================
+class PhaseProfiler:
+    """
+    Times each phase of a tick & counts what the ants did in it. A tick is split into phases by calling lap() at the
+    end of each one - the time since the last lap goes to that phase. The simulation only calls it when profiling is
+    turned on, so it costs nothing otherwise. A range of ticks can also be run under cProfile.
+    """
+
+    # the phases of a tick - in the order they happen
+    phases = ["trail_decay", "tree_spawning", "egg_laying", "lifecycle", "departing", "following", "searching",
+              "food_pickup", "returning", "unloading", "recording"]
+
+    def __init__(self, profile_ticks=None, profile_path=None):
+
+        # the time spent in each phase over the run, in the latest tick & in the slowest tick for that phase
+        self.total_times = dict.fromkeys(self.phases, 0.0)
+        self.tick_times = dict.fromkeys(self.phases, 0.0)
+        self.max_tick_times = dict.fromkeys(self.phases, 0.0)
+        self.num_ticks = 0
+        self.lap_start = None
+
+        # the number of times the ants did each thing over the run
+        self.counters = {"eggs_laid": 0, "trees_spawned": 0, "trails_sampled": 0, "trails_created": 0, "ants_moved": 0,
+                         "food_picked_up": 0, "food_unloaded": 0}
+
+        # the ticks [start, stop) run under cProfile & the file its stats are saved to (printed in the report otherwise)
+        self.profile_ticks = tuple(profile_ticks) if profile_ticks else None
+        self.profile_path = profile_path
+        self.profile = None
+        self.profile_stats = None
+
+    def start_tick(self, current_time):
+        if self.profile_ticks is not None and current_time == self.profile_ticks[0]:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        for phase in self.phases:
+            self.tick_times[phase] = 0.0
+        self.lap_start = perf_counter()
+
+    def lap(self, phase):
+        # give the time since the last lap to this phase
+        now = perf_counter()
+        self.tick_times[phase] += now - self.lap_start
+        self.lap_start = now
+
+    def count(self, counter, amount=1):
+        self.counters[counter] += amount
+
+    def end_tick(self, current_time):
+
+        # add the tick's times to the run's
+        for phase, tick_time in self.tick_times.items():
+            self.total_times[phase] += tick_time
+            if tick_time > self.max_tick_times[phase]:
+                self.max_tick_times[phase] = tick_time
+        self.num_ticks += 1
+
+        # stop profiling once the last tick of the range has run
+        if self.profile is not None and current_time + 1 >= self.profile_ticks[1]:
+            self.stop_profile()
+
+    def finish(self):
+        # stop profiling if the run ended inside the range of ticks
+        if self.profile is not None:
+            self.stop_profile()
+
+    def stop_profile(self):
+        self.profile.disable()
+        if self.profile_path is not None:
+            self.profile.dump_stats(self.profile_path)
+        else:
+            stats_text = io.StringIO()
+            pstats.Stats(self.profile, stream=stats_text).sort_stats("cumulative").print_stats(25)
+            self.profile_stats = stats_text.getvalue()
+        self.profile = None
+
+    def get_summary(self, num_phases=3):
+
+        # the phases taking the most time over the run - short enough for the controller's status bar
+        total_time = sum(self.total_times.values())
+        if total_time == 0:
+            return ""
+        slowest = sorted(self.phases, key=self.total_times.get, reverse=True)[:num_phases]
+        return "  ".join("{} {:.0%}".format(phase, self.total_times[phase] / total_time) for phase in slowest)
+
+    def get_report(self):
+
+        # a table of the time spent in each phase & the counters - per tick & over the run
+        num_ticks = max(self.num_ticks, 1)
+        total_time = sum(self.total_times.values()) or 1.0
+        lines = ["Phase timings over {} ticks:".format(self.num_ticks),
+                 "{:<16} {:>10} {:>8} {:>12} {:>12}".format("phase", "total (s)", "share", "ms / tick", "max ms")]
+        for phase in self.phases:
+            lines.append("{:<16} {:>10.3f} {:>8.1%} {:>12.4f} {:>12.4f}".format(
+                phase, self.total_times[phase], self.total_times[phase] / total_time,
+                1e3 * self.total_times[phase] / num_ticks, 1e3 * self.max_tick_times[phase]))
+        lines.append("{:<16} {:>10} {:>12}".format("counter", "total", "per tick"))
+        for counter, value in self.counters.items():
+            lines.append("{:<16} {:>10} {:>12.2f}".format(counter, value, value / num_ticks))
+        if self.profile_path is not None and self.profile_ticks is not None:
+            lines.append("cProfile stats for ticks {} to {} saved to {}".format(self.profile_ticks[0], self.profile_ticks[1], self.profile_path))
+        elif self.profile_stats:
+            lines.append("cProfile stats for ticks {} to {}:".format(*self.profile_ticks))
+            lines.append(self.profile_stats)
+        return "\n".join(lines)
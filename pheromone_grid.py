@@ -0,0 +1,159 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for storing the pheromone on the map
+import numpy as np
+
+
+# ========================================
+# | DEFINE FUNCTIONS FOR PHEROMONE GRID  |
+# ========================================
+# the steps to the neighbouring locations - in the order they are weighed up when an ant follows the scent
+neighbour_steps = np.array([(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)], dtype=np.int64)
+
+
+# ========================
+# | PHEROMONE GRID CLASS |
+# ========================
+class PheromoneGrid:
+    """
+    Holds the strength of a colony's pheromone at each location of the map - the alternative to storing each trail
+    as a route. Ants heading home with food lay pheromone on each location they leave, the most where they found the
+    food, and each tick the pheromone evaporates & spreads to the neighbouring locations as whole-array operations.
+    Followers walk uphill - to a stronger neighbouring location - until there is none, so the memory used is bounded
+    by the size of the map rather than by the number of trails found.
+    """
+
+    def __init__(self, width, height, deposit, evaporation, diffusion, threshold):
+
+        self.width = width
+        self.height = height
+
+        # the pheromone laid by an ant at the food (less on the way home), the share of it that evaporates & that spreads
+        # each tick, & the least pheromone an ant can smell - weaker pheromone is cleared from the map
+        self.deposit = deposit
+        self.evaporation = evaporation
+        self.diffusion = diffusion
+        self.threshold = threshold
+
+        # the pheromone at each location - indexed by [y, x]
+        self.strengths = np.zeros((height, width), dtype=np.float32)
+
+        # the rows [y_start, y_stop) & columns [x_start, x_stop) outside of which there is no pheromone
+        # - only this window of the map is evaporated & spread each tick
+        self.window = [0, 0, 0, 0]
+
+        # the pheromone laid this tick - added to the map at the start of the next tick in the order it was laid,
+        # so every ant moving in a tick smells the same map
+        self.pending_cells = []
+        self.pending_amounts = []
+
+    def __getstate__(self):
+
+        # only save the window of the map with pheromone
+        state = dict(self.__dict__)
+        y_start, y_stop, x_start, x_stop = self.window
+        state["strengths"] = self.strengths[y_start:y_stop, x_start:x_stop].copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        y_start, y_stop, x_start, x_stop = self.window
+        window_strengths = self.strengths
+        self.strengths = np.zeros((self.height, self.width), dtype=np.float32)
+        self.strengths[y_start:y_stop, x_start:x_stop] = window_strengths
+
+    def get_deposit(self, steps_left, path_length):
+        # the pheromone falls off the nearer the ant gets to the ant hill - so the scent gets stronger towards the food
+        return self.deposit * steps_left / path_length
+
+    def lay(self, x_loc, y_loc, steps_left, path_length):
+        self.pending_cells.append(y_loc * self.width + x_loc)
+        self.pending_amounts.append(self.get_deposit(steps_left, path_length))
+
+    def lay_many(self, x_locs, y_locs, steps_left, path_lengths):
+        self.pending_cells.extend((y_locs * self.width + x_locs).tolist())
+        self.pending_amounts.extend(self.get_deposit(steps_left, path_lengths).tolist())
+
+    def add_pending(self):
+
+        # add the pheromone laid last tick to the map one deposit at a time & widen the window to take it in
+        if not self.pending_cells:
+            return
+        cells = np.array(self.pending_cells, dtype=np.int64)
+        np.add.at(self.strengths.reshape(-1), cells, np.array(self.pending_amounts, dtype=np.float64).astype(np.float32))
+        self.pending_cells, self.pending_amounts = [], []
+        y_locs, x_locs = cells // self.width, cells % self.width
+        self.set_window(y_locs.min(), y_locs.max() + 1, x_locs.min(), x_locs.max() + 1)
+
+    def set_window(self, y_start, y_stop, x_start, x_stop):
+        old_y_start, old_y_stop, old_x_start, old_x_stop = self.window
+        if old_y_start < old_y_stop:
+            y_start, y_stop, x_start, x_stop = min(y_start, old_y_start), max(y_stop, old_y_stop), min(x_start, old_x_start), max(x_stop, old_x_stop)
+        self.window = [int(y_start), int(y_stop), int(x_start), int(x_stop)]
+
+    def update(self):
+
+        # add last tick's pheromone & evaporate the window of the map with pheromone
+        self.add_pending()
+        y_start, y_stop, x_start, x_stop = self.window
+        if y_start >= y_stop:
+            return
+        if self.diffusion:
+            # the pheromone can spread one location further
+            y_start, y_stop, x_start, x_stop = max(y_start - 1, 0), min(y_stop + 1, self.height), max(x_start - 1, 0), min(x_stop + 1, self.width)
+        strengths = self.strengths[y_start:y_stop, x_start:x_stop]
+        strengths *= 1 - self.evaporation
+
+        # share out the spreading pheromone evenly between the eight neighbouring locations - what spreads off the map is lost
+        if self.diffusion:
+            shares = strengths * (self.diffusion / 8)
+            strengths *= 1 - self.diffusion
+            strengths[1:, :] += shares[:-1, :]
+            strengths[:-1, :] += shares[1:, :]
+            strengths[:, 1:] += shares[:, :-1]
+            strengths[:, :-1] += shares[:, 1:]
+            strengths[1:, 1:] += shares[:-1, :-1]
+            strengths[:-1, :-1] += shares[1:, 1:]
+            strengths[1:, :-1] += shares[:-1, 1:]
+            strengths[:-1, 1:] += shares[1:, :-1]
+
+        # clear the pheromone too weak to smell & shrink the window to what is left
+        strengths[strengths < self.threshold] = 0
+        rows, columns = np.flatnonzero(strengths.any(axis=1)), np.flatnonzero(strengths.any(axis=0))
+        if len(rows):
+            self.window = [y_start + int(rows[0]), y_start + int(rows[-1]) + 1, x_start + int(columns[0]), x_start + int(columns[-1]) + 1]
+        else:
+            self.window = [0, 0, 0, 0]
+
+    def has_scent_near(self, x_loc, y_loc):
+        # whether there is any pheromone at or around a location
+        return bool(self.strengths[max(y_loc - 1, 0):y_loc + 2, max(x_loc - 1, 0):x_loc + 2].any())
+
+    def get_uphill_step(self, x_loc, y_loc, uniform_draw):
+
+        # pick one of the neighbouring locations with more pheromone in proportion to its pheromone - None if there are none
+        current_strength = self.strengths[y_loc, x_loc]
+        uphill_steps, running_total = [], 0.0
+        for x_step, y_step in neighbour_steps.tolist():
+            x, y = x_loc + x_step, y_loc + y_step
+            if (0 <= x < self.width) and (0 <= y < self.height) and self.strengths[y, x] > current_strength:
+                running_total += float(self.strengths[y, x])
+                uphill_steps.append((running_total, x_step, y_step))
+        if not uphill_steps:
+            return None
+        target = uniform_draw * running_total
+        return next((x_step, y_step) for total, x_step, y_step in uphill_steps if total > target)
+
+    def get_uphill_steps(self, x_locs, y_locs, uniform_draws):
+
+        # get_uphill_step for many ants at once - the steps of the ants with a stronger neighbouring location & which ants those are
+        x = x_locs[:, None] + neighbour_steps[:, 0]
+        y = y_locs[:, None] + neighbour_steps[:, 1]
+        on_map = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        strengths = np.where(on_map, self.strengths[np.clip(y, 0, self.height - 1), np.clip(x, 0, self.width - 1)], 0)
+        uphill = on_map & (strengths > self.strengths[y_locs, x_locs][:, None])
+        running_totals = np.cumsum(np.where(uphill, strengths, 0).astype(np.float64), axis=1)
+        found = running_totals[:, -1] > 0
+        choices = np.argmax(running_totals > (uniform_draws * running_totals[:, -1])[:, None], axis=1)
+        return neighbour_steps[choices[found]], found
@@ -0,0 +1,73 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for hashing the keys of the random numbers
+import numpy as np
+
+# package for grouping the random numbers drawn each tick
+from collections import namedtuple
+
+
+# ========================================
+# | DEFINE FUNCTIONS FOR RANDOM STREAMS  |
+# ========================================
+# the random numbers each mature ant may use in a tick
+AntRandoms = namedtuple("AntRandoms", ["steps", "follow", "trail"])
+
+# the streams of random numbers - each is keyed separately so drawing from one never moves another on
+step_x_stream, step_y_stream, follow_stream, trail_stream, tree_stream, plant_stream, plant_food_stream = range(7)
+
+# the odd constants of the SplitMix64 generator
+golden_gamma = np.uint64(0x9E3779B97F4A7C15)
+mix_multipliers = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+def mix(values):
+
+    # the SplitMix64 finaliser - every bit of the key changes about half the bits of the result
+    with np.errstate(over="ignore"):
+        values = (values ^ (values >> np.uint64(30))) * mix_multipliers[0]
+        values = (values ^ (values >> np.uint64(27))) * mix_multipliers[1]
+    return values ^ (values >> np.uint64(31))
+
+
+def get_uniforms(seed, stream, *keys):
+
+    # a uniform number in [0, 1) for each combination of the keys - worked out from the seed, stream & keys alone,
+    # so the numbers don't depend on the order they are drawn in or on which process draws them
+    with np.errstate(over="ignore"):
+        hashed = mix(np.uint64(seed % 2**64) + np.uint64(stream + 1) * golden_gamma)
+        for key in keys:
+            hashed = mix(hashed ^ (np.asarray(key, dtype=np.int64).astype(np.uint64) + golden_gamma))
+    return (hashed >> np.uint64(11)) * 2.0**-53
+
+
+def get_ant_randoms(seed, current_time, colony_index, ant_ids):
+
+    # every ant's random step, following decision & trail choice for this tick - keyed on the ant's id
+    ant_ids = np.asarray(ant_ids, dtype=np.int64)
+    steps = np.column_stack([np.floor(3 * get_uniforms(seed, stream, current_time, colony_index, ant_ids)) - 1
+                             for stream in (step_x_stream, step_y_stream)]).astype(np.int8).reshape(-1, 2)
+    follow = get_uniforms(seed, follow_stream, current_time, colony_index, ant_ids)
+    trail = get_uniforms(seed, trail_stream, current_time, colony_index, ant_ids)
+    return AntRandoms(steps, follow, trail)
+
+
+def get_tree(seed, current_time, tree_spawn_prob, env_width, env_height, max_food_per_location):
+
+    # whether a tree spawns this tick - & if so its location & food
+    draws = get_uniforms(seed, tree_stream, current_time, np.arange(4)).tolist()
+    if draws[0] >= tree_spawn_prob:
+        return None
+    return int(draws[1] * env_width), int(draws[2] * env_height), 1 + int(draws[3] * max_food_per_location)
+
+
+def get_planted_rows(seed, first_row, num_rows, env_width, tree_percent, max_food_per_location):
+
+    # the locations planted with trees in a block of rows & their food - each row is keyed on its number, so the map
+    # can be planted in any blocks (or by different processes) & comes out the same
+    rows, columns = np.arange(first_row, first_row + num_rows)[:, None], np.arange(env_width)[None, :]
+    planted = np.flatnonzero(get_uniforms(seed, plant_stream, rows, columns) < tree_percent)
+    rows, columns = first_row + planted // env_width, planted % env_width
+    food = 1 + (get_uniforms(seed, plant_food_stream, rows, columns) * max_food_per_location).astype(np.int64)
+    return planted, food
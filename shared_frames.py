@@ -0,0 +1,195 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for sharing the frames between processes & naming the shared memory
+from multiprocessing import shared_memory
+import itertools
+import os
+
+# package for releasing the shared memory when the simulation ends
+import atexit
+
+# package for reading the frames in place
+import numpy as np
+
+# package for grouping the state read from a frame
+from collections import namedtuple
+
+
+# =======================================
+# | DEFINE FUNCTIONS FOR SHARED FRAMES  |
+# =======================================
+# the state drawn in a frame - read in place from one of the slots of shared memory
+SharedFrame = namedtuple("SharedFrame", ["seq", "time", "envir", "ant_x", "ant_y", "ant_carrying"])
+
+# the control block holds the last frame published & the frame being read (0 when none is), then for each slot the
+# frame in it (-1 while it is being written), its time, its number of ants & the size & version of its ant arrays
+published_field, reading_field = 0, 1
+seq_field, time_field, num_ants_field, ant_capacity_field, ant_generation_field = range(5)
+num_slot_fields = 5
+
+# the number of bytes each ant takes in a slot - its x & y locations (int32) & its carrying flag (int8)
+ant_bytes = 9
+
+# a count of the buffers made by this process - so each gets its own names
+buffer_counter = itertools.count()
+
+
+def get_control_field(slot, field):
+    return 2 + num_slot_fields * slot + field
+
+
+# ===============================
+# | SHARED FRAME BUFFERS CLASS  |
+# ===============================
+class SharedFrameBuffers:
+    """
+    Two copies (slots) of the state drawn in a frame - the food at each location & the mature ants' locations & carrying
+    flags - in shared memory, so a renderer in this process or another reads them in place rather than being sent a copy.
+    The simulation writes each frame into the slot the renderer isn't reading & never waits for it: sequence numbers in a
+    small control block say which frame is in each slot & which one the renderer is reading. The older slot is written
+    over first - or the newest frame, if the renderer is reading the older one - so the renderer always gets the newest
+    frame & only holds a slot while it reads it.
+    Saying which frame is read only keeps the simulation off it most of the time - between processes the simulation can
+    miss it & write over the frame as it is read. So a slot's sequence number is cleared before it is written & set once
+    it is written (a seqlock), & the renderer checks it is unchanged once it has copied the frame out, throwing the frame
+    away if not. This relies on each process's writes to the shared memory being seen in the order they are made, as they
+    are on x86.
+    """
+
+    def __init__(self, envir_shape, envir_dtype, name=None, create=True, ant_capacity=1024):
+
+        # the shape & type of the food grid - the same in every frame
+        self.envir_shape = tuple(envir_shape)
+        self.envir_dtype = np.dtype(envir_dtype)
+        self.create = create
+        self.name = name if name is not None else "ant_frames_{}_{}".format(os.getpid(), next(buffer_counter))
+        self.blocks = {}
+
+        # the control block & the food grid of each slot - the ant arrays of each slot are opened once they are used
+        self.control = np.ndarray(2 + 2 * num_slot_fields, dtype=np.int64, buffer=self.open_block("control", 8 * (2 + 2 * num_slot_fields)).buf)
+        envir_size = max(int(np.prod(self.envir_shape)) * self.envir_dtype.itemsize, 1)
+        self.envirs = [np.ndarray(self.envir_shape, dtype=self.envir_dtype, buffer=self.open_block("envir{}".format(slot), envir_size).buf)
+                       for slot in range(2)]
+        self.ant_arrays = [None, None]
+        self.ant_generations = [-1, -1]
+        self.read_slot, self.read_seq = 0, 0
+        if create:
+            self.control[:] = 0
+            for slot in range(2):
+                self.control[get_control_field(slot, ant_capacity_field)] = ant_capacity
+            atexit.register(self.close)
+
+    @classmethod
+    def attach(cls, name, envir_shape, envir_dtype):
+        # open the buffers made by the simulation (in another process) to read its frames
+        return cls(envir_shape, envir_dtype, name, create=False)
+
+    def open_block(self, suffix, size):
+        block = shared_memory.SharedMemory("{}_{}".format(self.name, suffix), create=self.create, size=size)
+        self.blocks[suffix] = block
+        return block
+
+    def close_block(self, suffix):
+        block = self.blocks.pop(suffix)
+        block.close()
+        if self.create:
+            block.unlink()
+
+    def get_ant_arrays(self, slot):
+
+        # the slot's ant arrays - opened again when they have been made bigger
+        generation = int(self.control[get_control_field(slot, ant_generation_field)])
+        if self.ant_generations[slot] != generation:
+            if self.ant_arrays[slot] is not None:
+                self.ant_arrays[slot] = None
+                self.close_block("ants{}_{}".format(slot, self.ant_generations[slot]))
+            capacity = int(self.control[get_control_field(slot, ant_capacity_field)])
+            buffer = self.open_block("ants{}_{}".format(slot, generation), ant_bytes * capacity).buf
+            self.ant_arrays[slot] = (np.ndarray(capacity, dtype=np.int32, buffer=buffer),
+                                     np.ndarray(capacity, dtype=np.int32, buffer=buffer, offset=4 * capacity),
+                                     np.ndarray(capacity, dtype=np.int8, buffer=buffer, offset=8 * capacity))
+            self.ant_generations[slot] = generation
+        return self.ant_arrays[slot]
+
+    def get_slot(self, seq):
+        # the slot holding a frame
+        return 1 if self.control[get_control_field(1, seq_field)] == seq else 0
+
+    def publish(self, current_time, envir, ant_x, ant_y, ant_carrying):
+
+        # mark the slot without the newest frame (or else the one with it) as being written - then check the renderer isn't
+        # reading the frame in it (the renderer checks the mark after saying which frame it reads, so one of the two always backs
+        # off) - the frame is only dropped if the renderer moved on to the other slot in between
+        control = self.control
+        seq = int(control[published_field]) + 1
+        newest_slot = self.get_slot(seq - 1)
+        for slot in (1 - newest_slot, newest_slot):
+            old_seq = int(control[get_control_field(slot, seq_field)])
+            control[get_control_field(slot, seq_field)] = -1
+            if (old_seq == 0) or (control[reading_field] != old_seq):
+                break
+            control[get_control_field(slot, seq_field)] = old_seq
+        else:
+            return False
+
+        # make the slot's ant arrays bigger if needed
+        num_ants = len(ant_x)
+        if num_ants > control[get_control_field(slot, ant_capacity_field)]:
+            control[get_control_field(slot, ant_capacity_field)] = 2 * num_ants
+            control[get_control_field(slot, ant_generation_field)] += 1
+
+        # write the frame & publish it
+        self.envirs[slot][...] = envir
+        slot_x, slot_y, slot_carrying = self.get_ant_arrays(slot)
+        slot_x[:num_ants], slot_y[:num_ants], slot_carrying[:num_ants] = ant_x, ant_y, ant_carrying
+        control[get_control_field(slot, time_field)] = current_time
+        control[get_control_field(slot, num_ants_field)] = num_ants
+        control[get_control_field(slot, seq_field)] = seq
+        control[published_field] = seq
+        return True
+
+    def acquire(self, last_seq=0):
+
+        # say the newest frame is being read & check it isn't being written over - None if there is no frame newer than
+        # last_seq or it is being written over (the frame drawn last is then kept)
+        control = self.control
+        seq = int(control[published_field])
+        if seq <= last_seq:
+            return None
+        slot = self.get_slot(seq)
+        control[reading_field] = seq
+        self.read_slot, self.read_seq = slot, seq
+        if control[get_control_field(slot, seq_field)] != seq:
+            control[reading_field] = 0
+            return None
+
+        # the frame's arrays - read in place until the frame is released (the slot's ant arrays may be being made bigger
+        # by the simulation if it is writing over the frame, which is then skipped)
+        num_ants = int(control[get_control_field(slot, num_ants_field)])
+        try:
+            slot_x, slot_y, slot_carrying = self.get_ant_arrays(slot)
+        except (FileNotFoundError, TypeError):
+            control[reading_field] = 0
+            return None
+        return SharedFrame(seq, int(control[get_control_field(slot, time_field)]), self.envirs[slot], slot_x[:num_ants], slot_y[:num_ants],
+                           slot_carrying[:num_ants])
+
+    def release(self):
+
+        # the frame has been read - the simulation can write over its slot again. False if the simulation has started
+        # writing over the frame since it was acquired, in which case what was read from it is to be thrown away
+        is_unchanged = self.control[get_control_field(self.read_slot, seq_field)] == self.read_seq
+        self.control[reading_field] = 0
+        return bool(is_unchanged)
+
+    def close(self):
+
+        # drop the arrays reading the shared memory before closing it - the simulation's buffers are also removed
+        if not self.blocks:
+            return
+        self.control, self.envirs, self.ant_arrays = None, None, [None, None]
+        for suffix in list(self.blocks):
+            self.close_block(suffix)
+        if self.create:
+            atexit.unregister(self.close)
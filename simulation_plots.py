@@ -0,0 +1,287 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for plotting the current state
+import matplotlib.cm as cm
+import matplotlib.pyplot as plt
+
+# package for reading the history
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the simulation whose state is being plotted
+import ant_simulation
+
+# class for drawing the history with a bounded number of points
+from history_recorder import HistoryPyramid
+
+
+# =================================
+# | DEFINE FUNCTIONS FOR PLOTTING |
+# =================================
+def turn_hours_to_more_appealing_output(hours):
+
+    # get the number of weeks
+    weeks = hours // (24 * 7)
+    hours %= (24 * 7)
+
+    # get the number of days
+    days = hours // 24
+    hours %= 24
+
+    return "{} weeks, {} days, {} hours".format(weeks, days, hours)
+
+
+def get_label_pad(max_y_val, base_pad):
+    # leave room for the tick labels of the largest value
+    return base_pad + max((5, 5*len(str(int(max_y_val)))))
+
+
+def get_stack_verts(upper_times, upper, lower_times, lower):
+    # the outline of the band between two stacked series - along the top & back along the bottom
+    return np.concatenate([np.column_stack([upper_times, upper]), np.column_stack([lower_times[::-1], lower[::-1]])])
+
+
+def get_summary_columns(rows):
+    # the series drawn in the summary graphs - the immature populations as the tops of their stacked bands
+    return np.column_stack([rows["num_active_ants"], rows["num_ant_eggs"], rows["num_ant_eggs"] + rows["num_ant_larvae"],
+                            rows["num_ant_eggs"] + rows["num_ant_larvae"] + rows["num_ant_pupa"], rows["food_collected"]])
+
+
+# ===========================
+# | SIMULATION RENDERER     |
+# ===========================
+class SimulationRenderer:
+    """
+    Creates the figure's artists once & then updates their data in place each frame.
+    The axis limits only change when the history outgrows them - between those frames only the changing
+    artists are redrawn over a saved copy of the rest of the figure (blitting) when the figure is in a window.
+    """
+
+    # the immature populations stacked in the middle panel
+    immature_labels = ["Ant Eggs", "Ant Larvea", "Ant Pupa"]
+
+    # the number of hours of history kept as they are - for drawing every hour while the run is short
+    max_short_history = 8192
+
+    def __init__(self, figure, frame, previous_renderer=None):
+
+        # the figure & the simulation being drawn - a new simulation needs a new renderer
+        self.figure = figure
+        self.anthill = frame.anthill
+
+        # the running maxima of the history, how much of it has been read & the minima/maxima it is drawn from
+        # - carried over from the previous renderer when only the figure is new
+        self.num_rows_read = 0
+        self.short_history = np.zeros((0, 5))
+        self.history_view = HistoryPyramid(num_columns=5)
+        self.max_mature = 0
+        self.max_immature = 0
+        self.max_food = 0
+        if (previous_renderer is not None) and (previous_renderer.anthill is frame.anthill):
+            for name in ["num_rows_read", "short_history", "history_view", "max_mature", "max_immature", "max_food"]:
+                setattr(self, name, getattr(previous_renderer, name))
+
+        # the axis limits currently drawn - a full redraw is needed once the history outgrows them
+        self.x_limit = 0
+        self.y_limits = {"mature": None, "immature": None, "food": None}
+
+        # set up this new plot
+        figure.clf()
+        gs = figure.add_gridspec(nrows=1, ncols=2, wspace=0.7)
+        self.title = figure.suptitle("")
+        self.env_axis = figure.add_subplot(gs[0])
+        summary_gs = gs[1].subgridspec(nrows=3, ncols=10, hspace=0.1)
+        self.mature_pop_axis = figure.add_subplot(summary_gs[0, 1:])
+        self.immature_pop_axis = figure.add_subplot(summary_gs[1, 1:])
+        self.food_axis = figure.add_subplot(summary_gs[2, 1:])
+
+        # plot the environment, the anthills' locations & the ants that are alive
+        # (the image is filled in from the locations with food in each frame - clearing the ones filled in the last frame -
+        # or copied from the shared memory, where the last frame read from it is kept track of)
+        food_dtype = frame.food_amounts.dtype if frame.food_amounts is not None else frame.frame_buffers.envir_dtype
+        self.envir = np.zeros(frame.envir_shape, dtype=food_dtype)
+        self.food_cells = np.zeros(0, dtype=np.int64)
+        self.shared_seq = 0
+        self.env_image = self.env_axis.imshow(self.envir, cmap=cm.YlOrRd, vmin=0, vmax=ant_simulation.max_food_per_location)
+        self.env_axis.axis('off')
+        anthill_locations = np.array(frame.anthill_locations).reshape(-1, 2)
+        self.env_axis.scatter(anthill_locations[:, 0], anthill_locations[:, 1], c="black")
+        self.ant_scatter = self.env_axis.scatter([], [], c=[], cmap=cm.bwr, vmin=0, vmax=1)
+
+        # plot the summary graphs - the immature populations as a stack of bands
+        self.mature_line, = self.mature_pop_axis.plot([], [])
+        self.mature_pop_axis.set_xticks([])
+        colours = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+        self.immature_bands = [self.immature_pop_axis.fill([], [], color=colours[i % len(colours)], label=label)[0]
+                               for i, label in enumerate(self.immature_labels)]
+        self.immature_pop_axis.set_xticks([])
+        self.food_line, = self.food_axis.plot([], [])
+        self.food_axis.set_xlabel("Time (hrs)", size=10)
+
+        # re-locate the graph labels
+        handles, labels = self.immature_pop_axis.get_legend_handles_labels()
+        figure.legend(handles, labels, loc='center right', fontsize="small")
+
+        # only blit when the figure is shown in a window - the changing artists are then drawn separately from the rest
+        canvas = figure.canvas
+        self.use_blit = canvas.supports_blit and getattr(canvas.manager, "window", None) is not None
+        self.changing_artists = [self.title, self.env_image, self.ant_scatter, self.mature_line, self.food_line] + self.immature_bands
+        self.background = None
+        if self.use_blit:
+            for artist in self.changing_artists:
+                artist.set_animated(True)
+            canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        # save the figure without the changing artists after any full redraw (including when the window is resized)
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_changing_artists()
+
+    def draw_changing_artists(self):
+        for artist in self.changing_artists:
+            self.figure.draw_artist(artist)
+
+    def read_new_history(self, frame):
+
+        # update the running maxima & the history views with only the ticks this renderer hasn't seen yet
+        new_rows = get_summary_columns(frame.history_rows[self.num_rows_read - frame.history_start:])
+        if len(new_rows):
+            self.max_mature = max(self.max_mature, int(new_rows[:, 0].max()))
+            self.max_immature = max(self.max_immature, int(new_rows[:, 3].max()))
+            self.max_food = max(self.max_food, float(new_rows[:, 4].max()))
+            self.history_view.extend(new_rows)
+            if len(self.short_history) < self.max_short_history:
+                self.short_history = np.concatenate([self.short_history, new_rows[:self.max_short_history - len(self.short_history)]])
+        self.num_rows_read += len(new_rows)
+
+    def set_y_limits(self, name, axis, max_y_val, label, base_pad):
+
+        # leave headroom above the largest value so far so the limits only change once it is outgrown
+        current_limit = self.y_limits[name]
+        if (current_limit is not None) and (max_y_val <= current_limit):
+            return False
+        self.y_limits[name] = 1.25 * max_y_val
+        if max_y_val != 0:
+            axis.set_ylim((-0.2*self.y_limits[name], 1.2*self.y_limits[name]))
+        else:
+            axis.set_ylim((-1, 1))
+        axis.set_ylabel(label, size=10, rotation='horizontal', labelpad=get_label_pad(max_y_val, base_pad))
+        return True
+
+    def update_limits(self):
+
+        # grow the time axis in steps so it doesn't change every frame
+        limits_changed = False
+        if self.num_rows_read > self.x_limit or self.x_limit == 0:
+            self.x_limit = max(24, int(self.num_rows_read * 1.25))
+            for axis in [self.mature_pop_axis, self.immature_pop_axis, self.food_axis]:
+                axis.set_xlim((0, self.x_limit))
+            limits_changed = True
+
+        # the population & food axes only change when a new maximum is reached
+        limits_changed |= self.set_y_limits("mature", self.mature_pop_axis, self.max_mature, "Mature\nPopulation", 25)
+        limits_changed |= self.set_y_limits("immature", self.immature_pop_axis, self.max_immature, "Immature\nPopulation", 25)
+        limits_changed |= self.set_y_limits("food", self.food_axis, self.max_food, "Food\nSupply", 15)
+        return limits_changed
+
+    def update_summary_stats(self):
+
+        # draw about two points for each pixel across the graphs - the whole history if it is short enough,
+        # otherwise the minimum & maximum of each block of ticks so the peaks & extinctions stay visible
+        max_points = 2 * max(int(self.food_axis.bbox.width), 100)
+        if self.num_rows_read <= min(max_points, self.max_short_history):
+            values = self.short_history
+            times = np.repeat(np.arange(len(values))[:, None], values.shape[1], axis=1)
+        else:
+            times, values = self.history_view.get_view(max_points)
+
+        # update the lines & bands
+        self.mature_line.set_data(times[:, 0], values[:, 0])
+        lower_times, lower = times[:, 1], np.zeros(len(values))
+        for i, band in enumerate(self.immature_bands):
+            band.set_xy(get_stack_verts(times[:, i + 1], values[:, i + 1], lower_times, lower))
+            lower_times, lower = times[:, i + 1], values[:, i + 1]
+        self.food_line.set_data(times[:, 4], values[:, 4])
+
+    def update_environment_state(self, frame):
+
+        # copy the newest frame out of the shared memory - keeping the state drawn if there isn't a newer one to read or the
+        # simulation wrote over it while it was copied
+        if frame.food_cells is None:
+            shared_frame = frame.frame_buffers.acquire(self.shared_seq)
+            if shared_frame is None:
+                return
+            try:
+                self.envir[...] = shared_frame.envir
+                ant_offsets = np.column_stack([shared_frame.ant_x, shared_frame.ant_y])
+                ant_carrying = shared_frame.ant_carrying.astype(np.float64)
+            finally:
+                is_unchanged = frame.frame_buffers.release()
+            if is_unchanged:
+                self.env_image.set_data(self.envir)
+                self.ant_scatter.set_offsets(ant_offsets)
+                self.ant_scatter.set_array(ant_carrying)
+                self.shared_seq = shared_frame.seq
+                self.title.set_text('Time Past = {}'.format(turn_hours_to_more_appealing_output(shared_frame.time)))
+            return
+
+        # update the environment & the coordinates of the ants that are alive
+        self.envir.reshape(-1)[self.food_cells] = 0
+        self.envir.reshape(-1)[frame.food_cells] = frame.food_amounts
+        self.food_cells = frame.food_cells
+        self.env_image.set_data(self.envir)
+        self.ant_scatter.set_offsets(np.column_stack([frame.ant_x, frame.ant_y]))
+        self.ant_scatter.set_array(frame.ant_carrying.astype(np.float64))
+        self.title.set_text('Time Past = {}'.format(turn_hours_to_more_appealing_output(frame.time)))
+
+    def draw_frame(self, frame):
+
+        # update the artists in place - the title shows the time of the food & ants drawn
+        self.update_environment_state(frame)
+        self.read_new_history(frame)
+        limits_changed = self.update_limits()
+        self.update_summary_stats()
+
+        # redraw everything if the limits have changed - otherwise only the changing artists
+        canvas = self.figure.canvas
+        if not self.use_blit:
+            canvas.draw_idle()
+        elif limits_changed or self.background is None:
+            canvas.draw()
+            canvas.blit(self.figure.bbox)
+        else:
+            canvas.restore_region(self.background)
+            self.draw_changing_artists()
+            canvas.blit(self.figure.bbox)
+
+
+# the renderer drawing the current figure
+renderer = None
+
+
+def plot_current_state(frame=None):
+
+    global renderer
+
+    # without a frame from the simulation's thread, take one of the current state - only the history not yet drawn is copied
+    if frame is None:
+        same_simulation = (renderer is not None) and (renderer.anthill is ant_simulation.anthill)
+        frame = ant_simulation.get_frame(renderer.num_rows_read if same_simulation else 0)
+
+    # start a new renderer for a new figure or a new (or reset) simulation - otherwise update the existing one
+    figure = plt.gcf()
+    if (renderer is None) or (renderer.figure is not figure) or (renderer.anthill is not frame.anthill):
+        renderer = SimulationRenderer(figure, frame, renderer)
+    renderer.draw_frame(frame)
+
+    '''
+    # make the figure become full screen
+    mng = plt.get_current_fig_manager()
+    mng.window.state('zoomed')
+    '''
+    # plot the figure
+    plt.show()
@@ -0,0 +1,8 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for finding the simulation's modules from the tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,93 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for running the tests & comparing the runs
+import numpy as np
+import pytest
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+import ant_simulation
+import headless_simulation
+from history_recorder import load_history
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+# a busy colony with quickly fading trails & two colonies - so the checkpoint holds trails, brood & ants away from home
+checkpoint_config = {"random_seed": 3, "environment_width": 40, "environment_height": 40, "starting_population_size": 200,
+                     "trail_depreciation_time": 2, "follow_prob": 0.5, "num_colonies": 2, "num_ants_laid_daily": 6}
+
+
+def get_run_state():
+    return [colony.anthill.history.get_rows() for colony in ant_simulation.colonies], ant_simulation.envir.copy()
+
+
+@pytest.mark.parametrize("random_streams", ["shared", "counter"])
+@pytest.mark.parametrize("simulation_engine", ["object", "vectorised"])
+@pytest.mark.parametrize("return_path_compression", ["none", "net"])
+def test_resumed_run_matches_unbroken_run(tmp_path, simulation_engine, random_streams, return_path_compression):
+
+    overrides = dict(checkpoint_config, simulation_engine=simulation_engine, random_streams=random_streams,
+                     return_path_compression=return_path_compression)
+    ant_simulation.load_config(overrides=overrides)
+    ant_simulation.run_simulation(300)
+    histories, envir = get_run_state()
+
+    # stop half way & carry on from the checkpoint - with the default config loaded in between
+    checkpoint_path = str(tmp_path / "run.ckpt")
+    ant_simulation.load_config(overrides=overrides)
+    ant_simulation.run_simulation(150)
+    ant_simulation.save_checkpoint(checkpoint_path)
+    ant_simulation.load_config()
+    ant_simulation.run_simulation(150, checkpoint_path)
+    resumed_histories, resumed_envir = get_run_state()
+
+    for history, resumed_history in zip(histories, resumed_histories):
+        np.testing.assert_array_equal(history, resumed_history)
+    np.testing.assert_array_equal(envir, resumed_envir)
+
+
+def test_run_options_are_not_carried_on(tmp_path):
+
+    # a run saved while profiled & streaming its history is carried on by a run that does neither
+    checkpoint_path = str(tmp_path / "run.ckpt")
+    ant_simulation.load_config(overrides=dict(checkpoint_config, profile_phases=True, history_path=str(tmp_path / "history.bin")))
+    ant_simulation.run_simulation(20)
+    ant_simulation.save_checkpoint(checkpoint_path)
+    ant_simulation.load_config()
+    ant_simulation.run_simulation(20, checkpoint_path)
+    assert ant_simulation.profiler is None
+    assert ant_simulation.history_path is None
+    assert ant_simulation.num_colonies == checkpoint_config["num_colonies"]
+
+
+def test_headless_run_applies_config_file_over_checkpoint(tmp_path):
+
+    checkpoint_path = str(tmp_path / "run.ckpt")
+    headless_simulation.main([ant_simulation.default_config_path, "30", str(tmp_path / "first.csv"), "--seed", "5", "--profile",
+                              "--save-checkpoint", checkpoint_path])
+    headless_simulation.main([ant_simulation.default_config_path, "30", str(tmp_path / "second.csv"), "--from-checkpoint", checkpoint_path])
+    assert ant_simulation.profiler is None
+    assert ant_simulation.random_seed == 5
+    assert ant_simulation.time == 60
+
+
+def test_resumed_run_carries_on_its_history_file(tmp_path):
+
+    # a run streaming its history is carried on into the same file
+    history_path = str(tmp_path / "history.bin")
+    overrides = dict(checkpoint_config, num_colonies=1)
+    ant_simulation.load_config(overrides=overrides)
+    ant_simulation.run_simulation(300)
+    history = ant_simulation.anthill.history.get_rows()
+
+    checkpoint_path = str(tmp_path / "run.ckpt")
+    ant_simulation.load_config(overrides=dict(overrides, history_path=history_path))
+    ant_simulation.run_simulation(150)
+    ant_simulation.save_checkpoint(checkpoint_path)
+    ant_simulation.run_simulation(150, checkpoint_path)
+    np.testing.assert_array_equal(history, load_history(history_path))
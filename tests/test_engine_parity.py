@@ -0,0 +1,40 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for running the tests & comparing the runs
+import numpy as np
+import pytest
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+import ant_simulation
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+# a small crowded map where the trails fade after an hour - so the trail store is compacted & resized while the ants
+# bring food home
+churn_config = {"random_seed": 0, "environment_width": 40, "environment_height": 40, "starting_population_size": 400,
+                "max_without_food": 200, "trail_depreciation_time": 1, "follow_prob": 0.2}
+
+
+def run_engine(engine, num_ticks, **overrides):
+
+    # run the simulation with one of the engines & return the anthill's history & the food left on the map
+    ant_simulation.load_config(overrides=dict(churn_config, simulation_engine=engine, **overrides))
+    ant_simulation.run_simulation(num_ticks)
+    return ant_simulation.anthill.history.get_rows(), ant_simulation.envir.copy()
+
+
+@pytest.mark.parametrize("random_streams", ["shared", "counter"])
+@pytest.mark.parametrize("return_path_compression", ["none", "loop_erased", "net"])
+def test_engines_match_under_trail_store_churn(return_path_compression, random_streams):
+
+    object_history, object_envir = run_engine("object", 400, return_path_compression=return_path_compression, random_streams=random_streams)
+    vectorised_history, vectorised_envir = run_engine("vectorised", 400, return_path_compression=return_path_compression,
+                                                      random_streams=random_streams)
+    np.testing.assert_array_equal(object_history, vectorised_history)
+    np.testing.assert_array_equal(object_envir, vectorised_envir)
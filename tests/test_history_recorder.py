@@ -0,0 +1,68 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for saving the recorders & checking their rows
+import pickle
+
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+from history_recorder import HistoryRecorder, load_history
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+columns = {"tick": np.int64, "value": np.float64}
+
+
+def append_rows(recorder, start, stop):
+    for tick in range(start, stop):
+        recorder.append(tick, tick / 2)
+
+
+def test_streamed_checkpoint_holds_only_the_open_chunk(tmp_path):
+
+    # the saved recorder stays small however many rows have been written to the file
+    recorder = HistoryRecorder(columns, str(tmp_path / "history.bin"), chunk_size=256)
+    append_rows(recorder, 0, 100000)
+    assert len(pickle.dumps(recorder)) < 256 * recorder.row_dtype.itemsize + 4096
+
+
+def test_restored_recorder_carries_on_its_file(tmp_path):
+
+    recorder = HistoryRecorder(columns, str(tmp_path / "history.bin"), chunk_size=256)
+    append_rows(recorder, 0, 1000)
+    saved = pickle.dumps(recorder)
+
+    # the saved run carries on past the checkpoint - the restored one writes over those rows with its own
+    append_rows(recorder, 1000, 1500)
+    recorder.flush()
+    restored = pickle.loads(saved)
+    assert len(restored) == 1000
+    restored.append(-1, -1.0)
+    restored.flush()
+    rows = load_history(str(tmp_path / "history.bin"))
+    assert len(rows) == 1001
+    np.testing.assert_array_equal(rows["tick"][:1000], np.arange(1000))
+    assert rows["tick"][1000] == -1
+    np.testing.assert_array_equal(restored.get_rows()["tick"], rows["tick"])
+
+
+def test_restored_recorder_can_move_to_memory_or_a_new_file(tmp_path):
+
+    recorder = HistoryRecorder(columns, str(tmp_path / "history.bin"), chunk_size=256)
+    append_rows(recorder, 0, 1000)
+    saved = pickle.dumps(recorder)
+    in_memory, moved = pickle.loads(saved), pickle.loads(saved)
+    in_memory.stop_streaming()
+    moved.stream_to(str(tmp_path / "moved.bin"))
+    for restored in [in_memory, moved]:
+        append_rows(restored, 1000, 1100)
+        np.testing.assert_array_equal(restored.get_rows()["tick"], np.arange(1100))
+    moved.flush()
+    np.testing.assert_array_equal(load_history(str(tmp_path / "moved.bin"))["tick"], np.arange(1100))
+    assert len(load_history(str(tmp_path / "history.bin"))) == 1000
@@ -0,0 +1,61 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for running the tests & comparing the runs
+import numpy as np
+import pytest
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+import ant_simulation
+from ant_classes import AllAntsDead
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+# a colony with quickly developing, short-lived brood (so the lifecycle & food sharing kernels are busy) & one tracing
+# shortened searches home
+kernel_configs = {
+    "brood": {"max_without_food": 100, "time_till_egg_hatch": 30, "time_till_larvae_become_pupa": 50,
+              "time_till_pupa_become_mature_ants": 60, "num_ants_laid_daily": 6},
+    "loop_erased": {"return_path_compression": "loop_erased", "starting_population_size": 300},
+}
+
+
+def run_vectorised(num_ticks, use_kernels, **overrides):
+
+    # run the vectorised engine with or without the kernels & return the anthill's history & the food left on the map
+    ant_simulation.load_config(overrides=dict(simulation_engine="vectorised", random_seed=11, **overrides))
+    ant_simulation.initialise_environment()
+    if use_kernels is not None:
+        ant_simulation.ant_population.use_kernels = use_kernels
+    for _ in range(num_ticks):
+        try:
+            ant_simulation.update_state()
+        except AllAntsDead:
+            break
+    return ant_simulation.anthill.history.get_rows(), ant_simulation.envir.copy()
+
+
+@pytest.mark.parametrize("config_name", list(kernel_configs))
+def test_kernels_match_numpy_code(config_name):
+
+    # the kernels run as plain python when numba isn't installed - so their logic is checked either way
+    numpy_history, numpy_envir = run_vectorised(300, False, **kernel_configs[config_name])
+    kernel_history, kernel_envir = run_vectorised(300, True, **kernel_configs[config_name])
+    np.testing.assert_array_equal(numpy_history, kernel_history)
+    np.testing.assert_array_equal(numpy_envir, kernel_envir)
+
+
+@pytest.mark.parametrize("config_name", list(kernel_configs))
+def test_compiled_kernels_match_numpy_code(config_name):
+
+    pytest.importorskip("numba")
+    numpy_history, numpy_envir = run_vectorised(1000, False, **kernel_configs[config_name])
+    compiled_history, compiled_envir = run_vectorised(1000, None, **kernel_configs[config_name])
+    assert ant_simulation.ant_population.use_kernels
+    np.testing.assert_array_equal(numpy_history, compiled_history)
+    np.testing.assert_array_equal(numpy_envir, compiled_envir)
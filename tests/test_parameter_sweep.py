@@ -0,0 +1,72 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for writing the sweep's files & checking the results
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+import ant_simulation
+import parameter_sweep
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+def write_base_config(folder, **overrides):
+
+    # a copy of the default config (with a small colony so the runs are quick) for the sweep to start from
+    config_variables = dict(ant_simulation.read_config_file(ant_simulation.default_config_path), starting_population_size=20, **overrides)
+    config_path = os.path.join(folder, "base_config.yaml")
+    with open(config_path, "w") as config_file:
+        yaml.safe_dump(config_variables, config_file)
+    return config_path
+
+
+def test_sweep_stores_text_parameters(tmp_path):
+
+    sweep = {"base_config": write_base_config(str(tmp_path)), "num_ticks": 20, "replicates": 1,
+             "grid": {"return_path_compression": ["none", "net"]}, "cells": [{"follow_prob": 0.5}]}
+    columns = parameter_sweep.run_sweep(sweep, str(tmp_path / "results.npz"), num_workers=1)
+    assert columns["param_return_path_compression"].tolist() == ["none", "net", ""]
+    np.testing.assert_array_equal(columns["param_follow_prob"], [np.nan, np.nan, 0.5])
+
+    # the results file is read back without pickling
+    results = np.load(str(tmp_path / "results.npz"))
+    assert results["param_return_path_compression"].tolist() == ["none", "net", ""]
+
+
+def test_sweep_checks_parameters_before_running(tmp_path):
+
+    sweep = {"base_config": write_base_config(str(tmp_path)), "num_ticks": 20, "grid": {"follow_prob": [0.5, object()]}}
+    with pytest.raises(ValueError):
+        parameter_sweep.run_sweep(sweep, str(tmp_path / "results.npz"), num_workers=1)
+    assert not os.path.exists(str(tmp_path / "results_runs"))
+
+
+def test_changed_base_config_is_run_again(tmp_path):
+
+    sweep = {"base_config": write_base_config(str(tmp_path)), "num_ticks": 20, "grid": {"follow_prob": [0.5]}}
+    first_columns = parameter_sweep.run_sweep(sweep, str(tmp_path / "results.npz"), num_workers=1)
+    write_base_config(str(tmp_path), max_food_per_location=5)
+    second_columns = parameter_sweep.run_sweep(sweep, str(tmp_path / "results.npz"), num_workers=1)
+    assert len(os.listdir(str(tmp_path / "results_runs"))) == 2
+    assert first_columns["food_brought_back"][0, 0] != second_columns["food_brought_back"][0, 0]
+
+
+def test_sweep_keeps_every_colony(tmp_path):
+
+    sweep = {"base_config": write_base_config(str(tmp_path)), "num_ticks": 20, "grid": {"num_colonies": [1, 3]}}
+    columns = parameter_sweep.run_sweep(sweep, str(tmp_path / "results.npz"), num_workers=1)
+    assert columns["num_colonies"].tolist() == [1, 3]
+    assert columns["num_active_ants"].shape == (2, 3, 20)
+    assert columns["peak_population"].shape == (2, 3)
+    assert not np.isnan(columns["num_active_ants"][1]).any()
+    assert np.isnan(columns["num_active_ants"][0, 1:]).all()
+    np.testing.assert_array_equal(columns["num_active_ants"][1, :, 0], [20, 20, 20])
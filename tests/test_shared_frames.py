@@ -0,0 +1,95 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for reading the frames from another process & checking them
+import multiprocessing
+
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+from shared_frames import SharedFrameBuffers, reading_field
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+envir_shape = (64, 64)
+
+
+def publish_frame(frame_buffers, seq, num_ants=8):
+    # a frame where every value is its sequence number - so a frame mixing two of them is easy to spot
+    envir = np.full(envir_shape, seq % 1000, dtype=np.int16)
+    ants = np.full(num_ants, seq, dtype=np.int32)
+    return frame_buffers.publish(seq, envir, ants, ants, np.full(num_ants, seq % 2, dtype=np.int8))
+
+
+def read_frames(name, num_frames, results):
+
+    # copy out frames as they are published, counting the ones that mixed two frames but weren't thrown away
+    frame_buffers = SharedFrameBuffers.attach(name, envir_shape, np.int16)
+    last_seq, num_read, num_mixed = 0, 0, 0
+    while last_seq < num_frames:
+        shared_frame = frame_buffers.acquire(last_seq)
+        if shared_frame is None:
+            continue
+        envir, ant_x = shared_frame.envir.copy(), shared_frame.ant_x.copy()
+        if not frame_buffers.release():
+            continue
+        num_read += 1
+        num_mixed += bool(np.any(envir != shared_frame.seq % 1000) or np.any(ant_x != shared_frame.seq))
+        last_seq = shared_frame.seq
+    frame_buffers.close()
+    results.put((num_read, num_mixed))
+
+
+def test_frame_is_read_back():
+
+    frame_buffers = SharedFrameBuffers(envir_shape, np.int16, ant_capacity=4)
+    try:
+        assert publish_frame(frame_buffers, 1, num_ants=10)
+        shared_frame = frame_buffers.acquire()
+        assert shared_frame.seq == 1
+        assert np.all(shared_frame.envir == 1) and shared_frame.ant_x.tolist() == [1] * 10
+        assert frame_buffers.release()
+        assert frame_buffers.acquire(1) is None
+    finally:
+        frame_buffers.close()
+
+
+def test_frame_written_over_while_read_is_thrown_away():
+
+    frame_buffers = SharedFrameBuffers(envir_shape, np.int16)
+    try:
+        publish_frame(frame_buffers, 1)
+        assert frame_buffers.acquire() is not None
+
+        # the simulation misses that the frame is being read (as it can from another process) & writes over it
+        frame_buffers.control[reading_field] = 0
+        publish_frame(frame_buffers, 2)
+        publish_frame(frame_buffers, 3)
+        assert not frame_buffers.release()
+    finally:
+        frame_buffers.close()
+
+
+def test_frames_read_from_another_process_are_whole():
+
+    frame_buffers = SharedFrameBuffers(envir_shape, np.int16)
+    try:
+        num_frames = 5000
+        results = multiprocessing.Queue()
+        reader = multiprocessing.Process(target=read_frames, args=(frame_buffers.name, num_frames, results))
+        reader.start()
+        for seq in range(1, num_frames):
+            publish_frame(frame_buffers, seq, num_ants=8 + seq // 100)
+        while not publish_frame(frame_buffers, num_frames, num_ants=8 + num_frames // 100):
+            pass
+        num_read, num_mixed = results.get(timeout=60)
+        reader.join()
+        assert num_read > 0
+        assert num_mixed == 0
+    finally:
+        frame_buffers.close()
@@ -0,0 +1,71 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for running the tests & comparing the runs
+import numpy as np
+import pytest
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+import ant_simulation
+import tiled_simulation
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+# a small crowded map where the trails fade after an hour, with two colonies - so the ants are handed between the tiles &
+# the trail stores are compacted while the ants bring food home
+tiled_config = {"random_seed": 0, "environment_width": 40, "environment_height": 40, "starting_population_size": 200,
+                "max_without_food": 200, "trail_depreciation_time": 1, "follow_prob": 0.2, "num_colonies": 2,
+                "simulation_engine": "vectorised", "random_streams": "counter"}
+
+
+def run_single_process(num_ticks, **overrides):
+    ant_simulation.load_config(overrides=dict(tiled_config, **overrides))
+    ant_simulation.run_simulation(num_ticks)
+    return [colony.anthill.history.get_rows() for colony in ant_simulation.colonies], ant_simulation.envir.copy()
+
+
+def run_tiled(num_ticks, num_tiles, use_processes, **overrides):
+
+    # run the tiled simulation from the config without loading it into the single-process simulation
+    config_variables = dict(ant_simulation.read_config_file(ant_simulation.default_config_path), **tiled_config, **overrides)
+    simulation = tiled_simulation.TiledSimulation(num_tiles, use_processes, config_variables)
+    try:
+        for _ in range(num_ticks):
+            simulation.update_state()
+        envir = simulation.get_envir()
+    finally:
+        simulation.close()
+    return [colony.anthill.history.get_rows() for colony in simulation.colonies], envir
+
+
+@pytest.mark.parametrize("return_path_compression", ["none", "loop_erased", "net"])
+def test_tile_count_does_not_change_the_run(return_path_compression):
+
+    histories, envir = run_single_process(200, return_path_compression=return_path_compression)
+    for num_tiles in [1, 3, 7]:
+        tiled_histories, tiled_envir = run_tiled(200, num_tiles, False, return_path_compression=return_path_compression)
+        for history, tiled_history in zip(histories, tiled_histories):
+            np.testing.assert_array_equal(history, tiled_history)
+        np.testing.assert_array_equal(envir, tiled_envir)
+
+
+def test_tiles_in_processes_match_single_process():
+
+    histories, envir = run_single_process(100, return_path_compression="loop_erased")
+    tiled_histories, tiled_envir = run_tiled(100, 2, True, return_path_compression="loop_erased")
+    for history, tiled_history in zip(histories, tiled_histories):
+        np.testing.assert_array_equal(history, tiled_history)
+    np.testing.assert_array_equal(envir, tiled_envir)
+
+
+def test_tiled_run_leaves_the_loaded_config_alone():
+
+    ant_simulation.load_config(overrides={"simulation_engine": "object", "random_streams": "shared"})
+    run_tiled(5, 2, False)
+    assert ant_simulation.simulation_engine == "object"
+    assert ant_simulation.random_stream_type == "shared"
@@ -0,0 +1,57 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for building random paths & checking them
+import pickle
+
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+from ant_classes import TrailStore
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+def test_store_size_follows_the_paths_in_use():
+
+    # add & drop many more paths than are ever in use at once - checking the paths in use keep their steps
+    rng = np.random.default_rng(0)
+    trail_store = TrailStore()
+    live_paths = {}
+    for _ in range(20000):
+        steps = rng.integers(-1, 2, size=(int(rng.integers(0, 30)), 2), dtype=np.int8)
+        path_id = trail_store.add_path(steps)
+        trail_store.acquire(path_id)
+        assert path_id not in live_paths
+        live_paths[path_id] = steps
+        if len(live_paths) > 200:
+            dropped = list(live_paths)[int(rng.integers(0, len(live_paths)))]
+            trail_store.release(dropped)
+            del live_paths[dropped]
+    for path_id, steps in live_paths.items():
+        np.testing.assert_array_equal(trail_store.get_path(path_id), steps)
+    assert trail_store.num_paths <= 8 * len(live_paths)
+    assert len(trail_store.offsets) <= max(16 * len(live_paths), 1024)
+
+    # the store is saved & restored with its dropped ids
+    restored = pickle.loads(pickle.dumps(trail_store))
+    np.testing.assert_array_equal(restored.free_ids, trail_store.free_ids)
+    for path_id, steps in live_paths.items():
+        np.testing.assert_array_equal(restored.get_path(path_id), steps)
+
+
+def test_dropped_ids_are_handed_out_again():
+
+    trail_store = TrailStore(capacity=4)
+    path_ids = [trail_store.add_path(np.ones((3, 2), dtype=np.int8)) for _ in range(4)]
+    trail_store.acquire(np.array(path_ids))
+    trail_store.release(np.array(path_ids[:3]))
+    new_path_id = trail_store.add_path(np.zeros((3, 2), dtype=np.int8))
+    assert new_path_id == path_ids[0]
+    assert trail_store.num_paths == 4
+    np.testing.assert_array_equal(trail_store.get_path(path_ids[3]), np.ones((3, 2)))
+    np.testing.assert_array_equal(trail_store.get_path(new_path_id), np.zeros((3, 2)))
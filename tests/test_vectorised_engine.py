@@ -0,0 +1,34 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# packages for running the tests & comparing the runs
+import numpy as np
+import pytest
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+import ant_simulation
+
+
+# ==============================
+# | DEFINE FUNCTIONS FOR TESTS |
+# ==============================
+def run_engine(engine, num_ticks, **overrides):
+
+    # run the simulation from the default config with one of the engines & return the anthill's history & the food left
+    ant_simulation.load_config(overrides=dict(overrides, simulation_engine=engine))
+    ant_simulation.run_simulation(num_ticks)
+    return ant_simulation.anthill.history.get_rows(), ant_simulation.envir.copy()
+
+
+@pytest.mark.parametrize("random_seed", [0, 1, 2])
+@pytest.mark.parametrize("starting_population_size", [50, 500])
+def test_vectorised_engine_matches_object_engine(random_seed, starting_population_size):
+
+    object_history, object_envir = run_engine("object", 500, random_seed=random_seed, starting_population_size=starting_population_size)
+    vectorised_history, vectorised_envir = run_engine("vectorised", 500, random_seed=random_seed,
+                                                      starting_population_size=starting_population_size)
+    np.testing.assert_array_equal(object_history, vectorised_history)
+    np.testing.assert_array_equal(object_envir, vectorised_envir)
@@ -0,0 +1,532 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for running each tile in its own process
+import multiprocessing
+
+# package for storing the ants & food as arrays
+import numpy as np
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# the single-process simulation - its config & the placing of the ant hills are shared with the tiled runs
+import ant_simulation
+
+# the classes used to store the trails & the ants
+from ant_classes import AllAntsDead, AntHill, Colony, TrailStore
+from vectorised_ants import AntPopulation, EGG, MATURE
+
+# the class used to store the food on each tile
+from food_grid import FoodGrid
+
+# the counter-based random streams - so the random numbers don't depend on which process draws them
+import random_streams
+
+
+# ===================================
+# | DEFINE FUNCTIONS FOR THE TILES  |
+# ===================================
+def get_tile_rows(env_height, num_tiles):
+    # the first row of each tile & the row after the last one - the map is cut into bands of (almost) equal height
+    return [tile_index * env_height // num_tiles for tile_index in range(num_tiles + 1)]
+
+
+def get_tile_indices(y_locs, tile_rows):
+    # the tile each location is on
+    return np.searchsorted(tile_rows, y_locs, side="right") - 1
+
+
+def package_ants(population, ants, path_ids, trail_store):
+
+    # copy the ants out of the population along with the steps of the paths they follow - path_ids are the ids the
+    # coordinator knows the paths by, which replace the ids in the trail store they are copied from
+    paths = {path_id: trail_store.get_path(local_path_id).copy()
+             for path_id, local_path_id in zip(path_ids.tolist(), population.food_scent_id[ants].tolist()) if path_id >= 0}
+    columns, search_steps = population.take_ants(ants)
+    columns["food_scent_id"] = path_ids
+    return columns, search_steps, paths
+
+
+# ================
+# | TILE CLASSES |
+# ================
+class TileAntHill:
+    """
+    Stands in for a colony's ant hill on a tile - its location & a trail store with the paths of the colony's ants on
+    the tile, which the coordinator knows by the ids of its own trail store.
+    """
+
+    # the searches are shortened into ways home the same way as in the ant hill
+    add_return_path = AntHill.add_return_path
+
+    def __init__(self, x_location, y_location, return_path_compression):
+
+        # the ant hill's location
+        self.x_loc = x_location
+        self.y_loc = y_location
+
+        # the paths of the ants on the tile - the trails themselves are only kept by the coordinator
+        self.trail_store = TrailStore()
+        self.pheromones = None
+
+        # keep track of how the ants' searches found on the tile are shortened into their ways home
+        self.return_path_compression = return_path_compression
+        self.num_search_steps = 0
+        self.num_return_steps = 0
+
+        # the ids of the paths in the coordinator's trail store & in this one
+        self.global_path_ids = {}
+        self.local_path_ids = {}
+        self.num_kept_path_ids = 0
+
+    def set_global_path_ids(self, local_path_ids, global_path_ids):
+
+        # forget the paths no ant on the tile follows any more once there are plenty of them
+        if len(self.global_path_ids) > 2 * self.num_kept_path_ids + 1024:
+            for local_path_id in [path_id for path_id in self.global_path_ids if not self.trail_store.is_in_use(path_id)]:
+                global_path_id = self.global_path_ids.pop(local_path_id)
+                if self.local_path_ids.get(global_path_id) == local_path_id:
+                    del self.local_path_ids[global_path_id]
+            self.num_kept_path_ids = len(self.global_path_ids)
+        for local_path_id, global_path_id in zip(local_path_ids.tolist(), global_path_ids.tolist()):
+            self.global_path_ids[local_path_id] = global_path_id
+            self.local_path_ids[global_path_id] = local_path_id
+
+    def get_global_path_ids(self, local_path_ids):
+        return np.array([self.global_path_ids[path_id] if path_id >= 0 else -1 for path_id in local_path_ids.tolist()], dtype=np.int64)
+
+    def get_local_path_id(self, global_path_id, steps):
+
+        # the path as it is stored on the tile - copied in unless an ant on the tile still follows it (the tile's store
+        # hands out the ids of dropped paths again, so the id must still stand for this path)
+        local_path_id = self.local_path_ids.get(global_path_id)
+        if (local_path_id is None or not self.trail_store.is_in_use(local_path_id)
+                or self.global_path_ids.get(local_path_id) != global_path_id):
+            local_path_id = self.trail_store.add_path(steps)
+            self.global_path_ids[local_path_id] = global_path_id
+            self.local_path_ids[global_path_id] = local_path_id
+        return local_path_id
+
+
+class Tile:
+    """
+    A band of the map's rows - the food on it & the mature ants of each colony that are away from their ant hill.
+    Each tick is run in two halves: the ants age & take their step, then, once the ants that stepped onto the band
+    from elsewhere have been handed over, the ants that stepped look for food in the order of their ids.
+    """
+
+    def __init__(self, config_variables, stream_seed, tile_rows, tile_index, anthill_locations):
+
+        # the rows of the map the tile holds
+        self.tile_rows = tile_rows
+        self.tile_index = tile_index
+        self.first_row = tile_rows[tile_index]
+        self.stream_seed = stream_seed
+
+        # the food on the tile - planted with the same trees as these rows of the whole map
+        max_food = config_variables["max_food_per_location"]
+        self.food_grid = FoodGrid(config_variables["environment_width"], tile_rows[tile_index + 1] - self.first_row, max_food)
+        self.food_grid.plant_from_streams(stream_seed, config_variables["environment_starting_tree_percent"], max_food,
+                                          [y_loc for _, y_loc in anthill_locations], [x_loc for x_loc, _ in anthill_locations], self.first_row)
+
+        # each colony's ants on the tile & the ones that stepped this tick
+        compression = config_variables.get("return_path_compression", "none")
+        self.populations = [AntPopulation(config_variables) for _ in anthill_locations]
+        self.anthills = [TileAntHill(x_loc, y_loc, compression) for x_loc, y_loc in anthill_locations]
+        self.stepped = [np.zeros(0, dtype=np.int64) for _ in anthill_locations]
+
+    def start_tick(self, current_time, trees, path_ids):
+
+        # plant the trees that spawned on the tile & learn the ids the coordinator gave the ways home found last tick
+        for x_loc, y_loc, food in trees:
+            self.food_grid.add_food(y_loc - self.first_row, x_loc, food)
+        for anthill, (local_path_ids, global_path_ids) in zip(self.anthills, path_ids):
+            anthill.set_global_path_ids(local_path_ids, global_path_ids)
+        return [self.step_colony(current_time, colony_index) for colony_index in range(len(self.populations))]
+
+    def step_colony(self, current_time, colony_index):
+
+        population, anthill = self.populations[colony_index], self.anthills[colony_index]
+        if 4 * population.num_dead > population.size:
+            population.remove_dead_ants()
+
+        # age the ants & move them - the ants' random numbers are keyed on their ids
+        n = population.size
+        randoms = random_streams.get_ant_randoms(self.stream_seed, current_time, colony_index, population.id[:n])
+        dying, mature, _, counts = population.age_ants(anthill.trail_store)
+        carrying = population.carrying_status[:n].astype(bool)
+        stepped = population.step_ants_towards_food(np.flatnonzero(mature & ~carrying), anthill, np.arange(n), randoms)
+        going_home = np.flatnonzero(mature & carrying)
+        population.move_ants_towards_anthill(going_home, anthill)
+
+        # the ants that got to their ant hill go back to the coordinator - the searchers find no food there
+        moved = np.concatenate([stepped, going_home])
+        was_stepped = np.arange(len(moved)) < len(stepped)
+        at_anthill = (population.x_loc[moved] == anthill.x_loc) & (population.y_loc[moved] == anthill.y_loc)
+        population.time_since_eaten[moved[at_anthill & was_stepped]] += 1
+        destinations = np.where(at_anthill, -1, get_tile_indices(population.y_loc[moved], self.tile_rows))
+
+        # hand over the ants that left the tile - the coordinator keeps their hold on the paths they follow
+        handovers = {}
+        for destination in np.unique(destinations[destinations != self.tile_index]).tolist():
+            leaving = destinations == destination
+            ants = moved[leaving]
+            local_path_ids = population.food_scent_id[ants]
+            package = package_ants(population, ants, anthill.get_global_path_ids(local_path_ids), anthill.trail_store)
+            anthill.trail_store.release(local_path_ids[local_path_ids >= 0])
+            handovers[destination] = (package, was_stepped[leaving])
+        self.stepped[colony_index] = moved[(destinations == self.tile_index) & was_stepped]
+        return {"num_mature": counts[0], "dead_ids": population.id[np.flatnonzero(dying)], "handovers": handovers}
+
+    def finish_tick(self, turn_order, arrivals):
+
+        # take in the ants that stepped onto the tile
+        for colony_index, colony_arrivals in enumerate(arrivals):
+            for package, was_stepped in colony_arrivals:
+                ants = self.put_ants(colony_index, package)
+                self.stepped[colony_index] = np.concatenate([self.stepped[colony_index], ants[was_stepped]])
+
+        # the colonies look for food in turn - each colony's ants in the order of their ids
+        pickups = [None] * len(self.populations)
+        for colony_index in turn_order:
+            population, anthill = self.populations[colony_index], self.anthills[colony_index]
+            stepped = self.stepped[colony_index]
+            stepped = stepped[np.argsort(population.id[stepped], kind="stable")]
+            num_search_steps, num_return_steps = anthill.num_search_steps, anthill.num_return_steps
+            population.find_food(stepped, self.food_grid.amounts, anthill, first_row=self.first_row)
+            self.stepped[colony_index] = np.zeros(0, dtype=np.int64)
+
+            # report the ways home found - the coordinator adds them to its trail store
+            found = stepped[(population.carrying_status[stepped] == 1) & (population.following_status[stepped] == 0)]
+            local_path_ids = population.food_scent_id[found]
+            paths = [anthill.trail_store.get_path(path_id) for path_id in local_path_ids.tolist()]
+            pickups[colony_index] = {
+                "ids": population.id[found],
+                "local_path_ids": local_path_ids,
+                "steps": np.concatenate(paths) if paths else np.zeros((0, 2), dtype=np.int8),
+                "lengths": np.array([len(path) for path in paths], dtype=np.int64),
+                "num_search_steps": anthill.num_search_steps - num_search_steps,
+                "num_return_steps": anthill.num_return_steps - num_return_steps,
+            }
+        return pickups
+
+    def put_ants(self, colony_index, package):
+
+        # add the ants to the tile, following copies of their paths
+        columns, search_steps, paths = package
+        population, anthill = self.populations[colony_index], self.anthills[colony_index]
+        global_path_ids = columns["food_scent_id"]
+        ants = population.put_ants(dict(columns, food_scent_id=np.full(len(global_path_ids), -1)), search_steps)
+        # (one ant at a time - a path copied in may move the paths nothing holds yet)
+        for i, path_id in zip(ants[global_path_ids >= 0].tolist(), global_path_ids[global_path_ids >= 0].tolist()):
+            population.set_food_scent(i, anthill.get_local_path_id(path_id, paths[path_id]), anthill.trail_store)
+        return ants
+
+    def get_food(self):
+        return self.food_grid.amounts
+
+
+class LocalTile:
+    """
+    Runs a tile in the coordinator's own process - the same calls as a tile in its own process.
+    """
+
+    def __init__(self, *tile_args):
+        self.tile = Tile(*tile_args)
+        self.result = None
+
+    def send(self, method_name, *args):
+        self.result = getattr(self.tile, method_name)(*args)
+
+    def receive(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+def run_tile(connection, tile_args):
+
+    # build the tile & run the calls sent to it until told to stop
+    tile = Tile(*tile_args)
+    while True:
+        method_name, args = connection.recv()
+        if method_name is None:
+            break
+        connection.send(getattr(tile, method_name)(*args))
+    connection.close()
+
+
+class TileProcess:
+    """
+    Runs a tile in its own process - the calls are sent through a pipe, so all the tiles work on a tick at once.
+    """
+
+    def __init__(self, *tile_args):
+        self.connection, tile_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=run_tile, args=(tile_connection, tile_args), daemon=True)
+        self.process.start()
+
+    def send(self, method_name, *args):
+        self.connection.send((method_name, args))
+
+    def receive(self):
+        return self.connection.recv()
+
+    def close(self):
+        self.connection.send((None, ()))
+        self.process.join()
+
+
+# ===========================
+# | TILED SIMULATION CLASS  |
+# ===========================
+class TiledSimulation:
+    """
+    Runs the simulation with the map cut into bands of rows (tiles), each holding its food & the ants away from their
+    ant hill - in its own process or not. The coordinator keeps each colony's ant hill (its food, trails, history & the
+    ants in it) & hands the ants over as they leave & come home. The random numbers come from the counter-based streams,
+    so a run is the same as the vectorised engine's with random_streams set to "counter" - whatever the number of tiles.
+    """
+
+    def __init__(self, num_tiles, use_processes=True, config_variables=None):
+
+        # the tiled runs use the vectorised engine & the counter-based streams - the rest of the run's options come from the
+        # config (the single-process simulation's unless one is given), which is kept with the run rather than loaded into it
+        config_variables = dict(ant_simulation.config_variables if config_variables is None else config_variables,
+                                simulation_engine="vectorised", random_streams="counter")
+        if config_variables.get("trail_backend", "routes") != "routes":
+            raise ValueError("The tiled simulation only supports trails kept as routes")
+        if config_variables.get("track_occupancy") or config_variables.get("profile_phases") or config_variables.get("profile_ticks"):
+            raise ValueError("The tiled simulation doesn't support occupancy tracking or profiling")
+        if config_variables.get("return_path_compression", "none") not in ant_simulation.return_path_compressions:
+            raise ValueError("Unknown return path compression '{}' - choose from {}".format(config_variables["return_path_compression"],
+                                                                                         ant_simulation.return_path_compressions))
+        if not 1 <= num_tiles <= config_variables["environment_height"]:
+            raise ValueError("The number of tiles must be between 1 & the height of the map")
+        self.config_variables = config_variables
+
+        # initialise the time & the seed of the random streams
+        self.time = 0
+        self.stream_seed = config_variables.get("random_seed")
+        if self.stream_seed is None:
+            self.stream_seed = int(np.random.default_rng().integers(2**63))
+
+        # define the colonies - the ants start off in their ant hills, so with the coordinator
+        colony_locations = config_variables.get("colony_locations")
+        num_colonies = len(colony_locations) if colony_locations else config_variables.get("num_colonies", 1)
+        anthill_locations = ant_simulation.place_colonies(colony_locations, num_colonies, config_variables["environment_width"],
+                                                          config_variables["environment_height"])
+        self.colonies = [self.create_colony(i, x_loc, y_loc, len(anthill_locations)) for i, (x_loc, y_loc) in enumerate(anthill_locations)]
+
+        # the path each colony's ants on the tiles follow - held in the coordinator's trail store while the ant is away
+        self.away_path_ids = [{} for _ in self.colonies]
+
+        # define the tiles & the ids given to the ways home they found - sent to them at the start of the next tick
+        self.tile_rows = get_tile_rows(config_variables["environment_height"], num_tiles)
+        tile_class = TileProcess if use_processes else LocalTile
+        self.tiles = [tile_class(config_variables, self.stream_seed, self.tile_rows, tile_index, anthill_locations) for tile_index in range(num_tiles)]
+        self.new_path_ids = [[(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)) for _ in self.colonies] for _ in self.tiles]
+
+    def create_colony(self, colony_index, x_loc, y_loc, colony_count):
+
+        # define the anthill & its ants - all mature & in the ant hill
+        config_variables = self.config_variables
+        population_size = config_variables["starting_population_size"]
+        anthill = AntHill(population_size, x_loc, y_loc, config_variables["trail_depreciation_time"],
+                          config_variables.get("return_path_compression", "none"),
+                          ant_simulation.get_colony_path(config_variables.get("history_path"), colony_index, colony_count), None)
+        ant_population = AntPopulation(config_variables, capacity=max(population_size, 1024))
+        for i in range(population_size):
+            ant_population.add_ant(i, MATURE, x_loc, y_loc)
+        return Colony(colony_index, anthill, ant_population=ant_population)
+
+    def lay_egg(self, colony):
+
+        # add a new ant to the colony
+        anthill = colony.anthill
+        if anthill.time_since_last_new_ant > (24/self.config_variables["num_ants_laid_daily"]):
+            colony.ant_population.add_ant(anthill.new_ant_id(), EGG, anthill.x_loc, anthill.y_loc)
+            anthill.time_since_last_new_ant = 0
+        else:
+            anthill.time_since_last_new_ant += 1
+
+    def update_state(self):
+
+        # update the time - the colonies take turns to go first each tick
+        self.time += 1
+        first_colony = self.time % len(self.colonies)
+        colonies_in_turn = self.colonies[first_colony:] + self.colonies[:first_colony]
+        turn_order = [colony.index for colony in colonies_in_turn]
+
+        # update the trail lists over time
+        for colony in colonies_in_turn:
+            colony.anthill.decay_trails()
+
+        # spawn a new tree on the tile it falls on - never on an ant hill
+        trees = [[] for _ in self.tiles]
+        config_variables = self.config_variables
+        tree = random_streams.get_tree(self.stream_seed, self.time, config_variables["tree_spawn_prob"], config_variables["environment_width"],
+                                       config_variables["environment_height"], config_variables["max_food_per_location"])
+        if tree is not None and all((tree[0] != colony.anthill.x_loc) or (tree[1] != colony.anthill.y_loc) for colony in self.colonies):
+            trees[int(get_tile_indices(tree[1], self.tile_rows))].append(tree)
+
+        # add new ants to the colonies
+        for colony in colonies_in_turn:
+            self.lay_egg(colony)
+
+        # the tiles age & move their ants while the ant hills are updated
+        for tile, tile_trees, new_path_ids in zip(self.tiles, trees, self.new_path_ids):
+            tile.send("start_tick", self.time, tile_trees, new_path_ids)
+        handovers = [[[] for _ in self.colonies] for _ in self.tiles]
+        counts = {colony.index: self.update_anthill(colony, handovers) for colony in colonies_in_turn}
+
+        # count the ants on the tiles & pass on the ants that left them
+        for tile in self.tiles:
+            for colony_index, report in enumerate(tile.receive()):
+                colony = self.colonies[colony_index]
+                counts[colony_index][0] += report["num_mature"]
+                colony.anthill.dead_ant_count += len(report["dead_ids"])
+                for ant_id in report["dead_ids"].tolist():
+                    self.set_away_path_id(colony, ant_id, -1)
+                for destination, (package, was_stepped) in report["handovers"].items():
+                    if destination == -1:
+                        self.put_ants_home(colony, package)
+                    else:
+                        handovers[destination][colony_index].append((package, was_stepped))
+
+        # the ants that stepped look for food - & the ways home found are added to the coordinator's trail stores
+        for tile, arrivals in zip(self.tiles, handovers):
+            tile.send("finish_tick", turn_order, arrivals)
+        pickups = [tile.receive() for tile in self.tiles]
+        for colony in self.colonies:
+            self.add_return_paths(colony, [tile_pickups[colony.index] for tile_pickups in pickups])
+
+        all_colonies_dead = True
+        for colony in colonies_in_turn:
+            # keep track of all the variables at that point in time
+            anthill = colony.anthill
+            count_num_active_ants, count_num_ant_eggs, count_num_larvae, count_num_pupa = counts[colony.index]
+            anthill.history.append(count_num_active_ants, count_num_ant_eggs, count_num_larvae, count_num_pupa,
+                                   anthill.dead_ant_count, anthill.food_count)
+
+            # check if the colony still has mature ants or food
+            if (count_num_active_ants != 0) or (anthill.food_count != 0):
+                all_colonies_dead = False
+
+        # stop the simulation if there are no more mature or baby ants
+        if all_colonies_dead:
+            print("All ants have died")
+            raise AllAntsDead("All ants have died")
+
+    def update_anthill(self, colony, handovers):
+
+        population, anthill = colony.ant_population, colony.anthill
+        if 4 * population.num_dead > population.size:
+            population.remove_dead_ants()
+
+        # age & develop the ants - every mature ant with the coordinator is in the ant hill
+        n = population.size
+        randoms = random_streams.get_ant_randoms(self.stream_seed, self.time, colony.index, population.id[:n])
+        dying, mature, brood_hungry, counts = population.age_ants(anthill.trail_store)
+        anthill.dead_ant_count += int(dying.sum())
+
+        # the ants share the ant hill's food & trails in the order of their ids - the ants that came home were added at the end
+        departing = mature & ~population.carrying_status[:n].astype(bool)
+        at_anthill_events = np.flatnonzero(brood_hungry | mature)
+        at_anthill_events = at_anthill_events[np.argsort(population.id[at_anthill_events], kind="stable")]
+        population.update_ants_at_anthill(at_anthill_events, brood_hungry, departing, anthill, np.arange(n), randoms)
+
+        # the ants leaving take their first step - those still in the ant hill find no food there
+        stepped = population.step_ants_towards_food(np.flatnonzero(departing), anthill, np.arange(n), randoms)
+        at_anthill = (population.x_loc[stepped] == anthill.x_loc) & (population.y_loc[stepped] == anthill.y_loc)
+        population.time_since_eaten[stepped[at_anthill]] += 1
+
+        # the rest are handed over to the tile they stepped onto - the coordinator keeps their hold on the trail they follow
+        leaving = stepped[~at_anthill]
+        destinations = get_tile_indices(population.y_loc[leaving], self.tile_rows)
+        for destination in np.unique(destinations).tolist():
+            ants = leaving[destinations == destination]
+            path_ids = population.food_scent_id[ants].copy()
+            for ant_id, path_id in zip(population.id[ants].tolist(), path_ids.tolist()):
+                if path_id >= 0:
+                    self.away_path_ids[colony.index][ant_id] = path_id
+            package = package_ants(population, ants, path_ids, anthill.trail_store)
+            handovers[destination][colony.index].append((package, np.ones(len(ants), dtype=bool)))
+        return list(counts)
+
+    def set_away_path_id(self, colony, ant_id, path_id):
+
+        # swap the path an ant away from the ant hill holds on to
+        trail_store = colony.anthill.trail_store
+        old_path_id = self.away_path_ids[colony.index].pop(ant_id, -1)
+        if path_id >= 0:
+            self.away_path_ids[colony.index][ant_id] = path_id
+            trail_store.acquire(path_id)
+        if old_path_id >= 0:
+            trail_store.release(old_path_id)
+
+    def put_ants_home(self, colony, package):
+
+        # the ants that got home hold on to their paths from the ant hill again
+        columns, search_steps, _ = package
+        trail_store = colony.anthill.trail_store
+        for ant_id, path_id in zip(columns["id"].tolist(), columns["food_scent_id"].tolist()):
+            old_path_id = self.away_path_ids[colony.index].pop(ant_id, -1)
+            if path_id >= 0:
+                trail_store.acquire(path_id)
+            if old_path_id >= 0:
+                trail_store.release(old_path_id)
+        colony.ant_population.put_ants(columns, search_steps)
+
+    def add_return_paths(self, colony, pickups):
+
+        # add the ways home found on the tiles to the trail store in the order of the ants' ids - as the vectorised engine does
+        anthill = colony.anthill
+        ant_ids = np.concatenate([pickup["ids"] for pickup in pickups])
+        tile_indices = np.repeat(np.arange(len(pickups)), [len(pickup["ids"]) for pickup in pickups])
+        local_path_ids = np.concatenate([pickup["local_path_ids"] for pickup in pickups])
+        paths = [path for pickup in pickups if len(pickup["ids"]) for path in np.split(pickup["steps"], np.cumsum(pickup["lengths"])[:-1])]
+        order = np.argsort(ant_ids, kind="stable")
+        anthill.num_search_steps += sum(pickup["num_search_steps"] for pickup in pickups)
+        anthill.num_return_steps += sum(pickup["num_return_steps"] for pickup in pickups)
+        path_ids = np.zeros(len(order), dtype=np.int64)
+        if len(order):
+            path_ids[order] = anthill.trail_store.reserve([len(paths[i]) for i in order])
+            anthill.trail_store.steps[anthill.trail_store.offsets[path_ids[order[0]]]:anthill.trail_store.size] = np.concatenate([paths[i] for i in order])
+        for ant_id, path_id in zip(ant_ids.tolist(), path_ids.tolist()):
+            self.set_away_path_id(colony, ant_id, path_id)
+
+        # tell each tile the ids of the paths it found
+        for tile_index in range(len(self.tiles)):
+            found_here = tile_indices == tile_index
+            self.new_path_ids[tile_index][colony.index] = (local_path_ids[found_here], path_ids[found_here])
+
+    def get_envir(self):
+        # the food at each location of the whole map - gathered from the tiles
+        for tile in self.tiles:
+            tile.send("get_food")
+        return np.concatenate([tile.receive() for tile in self.tiles])
+
+    def close(self):
+        for tile in self.tiles:
+            tile.close()
+
+
+def run_simulation(num_ticks, num_tiles, use_processes=True, config_variables=None):
+
+    # start a tiled simulation & step it until the tick count is reached or the colonies die out
+    simulation = TiledSimulation(num_tiles, use_processes, config_variables)
+    try:
+        for _ in range(num_ticks):
+            try:
+                simulation.update_state()
+            except AllAntsDead:
+                break
+    finally:
+        simulation.close()
+    for colony in simulation.colonies:
+        colony.anthill.history.flush()
+    return simulation
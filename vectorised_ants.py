@@ -0,0 +1,699 @@
+# ===================
+# | IMPORT PACKAGES |
+# ===================
+# package for storing the ants as arrays
+import numpy as np
+
+# package for compiling the colony kernels - the numpy code is used instead when numba isn't installed
+try:
+    from numba import njit
+    numba_available = True
+except ImportError:
+    numba_available = False
+
+    def njit(*args, **kwargs):
+        # leave the kernels as plain python functions
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+
+# ===================
+# | IMPORT CLASSES  |
+# ===================
+# helpers for resizing the arrays
+from ant_classes import grow_array, resize_array
+
+
+# ======================
+# | MATURITY CONSTANTS |
+# ======================
+# the maturity statuses of the ants are stored as small integer codes
+EGG, LARVAE, PUPA, MATURE, DEAD = range(5)
+maturity_status_names = ["egg", "larvae", "pupa", "mature", "dead"]
+
+
+# ===================
+# | COLONY KERNELS  |
+# ===================
+# each kernel walks the ants one at a time in the order of the ant list - following the same rules as the numpy code
+# in AntPopulation (& the Ant objects in ant_simulation.update_ants) so either gives the same run. They are compiled
+# with numba when it is installed & used in place of the numpy code for the steps that are branchy or sequential
+@njit(cache=True)
+def update_lifecycle(maturity_status, time_since_born, time_since_eaten, max_without_food, max_lifespan, time_till_egg_hatch,
+                     full_time_till_larvae_become_pupa, full_time_till_pupa_become_mature_ants, time_till_hungry,
+                     dying, mature, brood_hungry, counts):
+
+    # age the ants, kill the starved & the old, count the stages then develop the immature ants
+    # - filling in which ants died, which were mature before developing & which of the brood are hungry
+    counts[:] = 0
+    num_dying = 0
+    for i in range(len(maturity_status)):
+        status = maturity_status[i]
+        dying[i] = False
+        mature[i] = False
+        brood_hungry[i] = False
+        if status == DEAD:
+            continue
+        time_since_born[i] += 1
+        if time_since_eaten[i] > max_without_food or time_since_born[i] > max_lifespan:
+            maturity_status[i] = DEAD
+            dying[i] = True
+            num_dying += 1
+            continue
+
+        if status == MATURE:
+            mature[i] = True
+            counts[0] += 1
+            continue
+        if status == EGG:
+            counts[1] += 1
+            if time_since_born[i] > time_till_egg_hatch:
+                status = LARVAE
+        elif status == LARVAE:
+            counts[2] += 1
+            if time_since_born[i] > full_time_till_larvae_become_pupa:
+                status = PUPA
+        elif status == PUPA:
+            counts[3] += 1
+            if time_since_born[i] > full_time_till_pupa_become_mature_ants:
+                status = MATURE
+        maturity_status[i] = status
+
+        # the brood that has hatched eats from the ant hill if hungry - the rest count the hours since they ate
+        if status != EGG:
+            if time_since_eaten[i] > time_till_hungry:
+                brood_hungry[i] = True
+            else:
+                time_since_eaten[i] += 1
+    return num_dying
+
+
+@njit(cache=True)
+def share_food(ants, x_loc, y_loc, time_since_eaten, envir_flat, env_width, anthill_x_loc, anthill_y_loc, time_till_hungry,
+               num_food_brought_back_to_nest, food_to_pick_up):
+
+    # the ants that land on food outside the ant hill eat if hungry & pick up what is left - in the order of the ant list,
+    # so the ants on the same location share it first come first served
+    for j in range(len(ants)):
+        i = ants[j]
+        food_to_pick_up[j] = 0
+        cell = y_loc[i] * env_width + x_loc[i]
+        if envir_flat[cell] <= 0 or (x_loc[i] == anthill_x_loc and y_loc[i] == anthill_y_loc):
+            time_since_eaten[i] += 1
+            continue
+
+        # eat one food if hungry
+        food_left = envir_flat[cell]
+        if time_since_eaten[i] > time_till_hungry:
+            time_since_eaten[i] = 0
+            food_left -= 1
+        else:
+            time_since_eaten[i] += 1
+
+        # if there is still food left, pick it up and bring it home
+        if food_left > 0:
+            food_to_pick_up[j] = min(food_left, num_food_brought_back_to_nest)
+            food_left -= food_to_pick_up[j]
+        envir_flat[cell] = food_left
+
+
+@njit(cache=True)
+def trace_search_logs(ants, search_tail, search_length, search_log_prev):
+
+    # walk back through each ant's search log - returns the entries from the latest step to the first, one ant after another
+    lengths = np.empty(len(ants), dtype=np.int64)
+    total_length = 0
+    for j in range(len(ants)):
+        lengths[j] = search_length[ants[j]]
+        total_length += lengths[j]
+    entries = np.empty(total_length, dtype=np.int64)
+    k = 0
+    for j in range(len(ants)):
+        cursor = search_tail[ants[j]]
+        for _ in range(lengths[j]):
+            entries[k] = cursor
+            cursor = search_log_prev[cursor]
+            k += 1
+    return entries, lengths
+
+
+# ========================
+# | ANT POPULATION CLASS |
+# ========================
+class AntPopulation:
+    """
+    Stores every ant in the colony as a set of numpy arrays (one entry per ant) so that each tick
+    can be advanced with whole-array operations rather than a python loop over Ant objects.
+    The rules applied each tick are the same as those in ant_simulation.update_ants().
+    """
+
+    # the per-ant arrays & their types
+    ant_fields = {
+        "id": np.int64,
+        "x_loc": np.int64,
+        "y_loc": np.int64,
+        "maturity_status": np.int8,
+        "time_since_born": np.int64,
+        "time_since_eaten": np.int64,
+        "carrying_status": np.int8,
+        "num_food_carrying": np.float64,
+        "following_status": np.int8,
+        "food_scent_id": np.int64,
+        "food_scent_length": np.int64,
+        "count_steps_out": np.int64,
+        "count_steps_back": np.int64,
+        "search_tail": np.int64,
+        "search_length": np.int64,
+    }
+
+    def __init__(self, config_variables, capacity=1024):
+
+        # read the parameters governing the ants
+        self.set_parameters(config_variables)
+
+        # create the per-ant arrays - dead ants stay in them until they are periodically removed
+        self.size = 0
+        self.num_dead = 0
+        for field, dtype in self.ant_fields.items():
+            setattr(self, field, np.zeros(capacity, dtype=dtype))
+
+        # every step taken while searching is logged here - each entry points back to the ant's previous step
+        self.search_log_size = 0
+        self.search_log_steps = np.zeros((capacity, 2), dtype=np.int8)
+        self.search_log_prev = np.zeros(capacity, dtype=np.int64)
+
+    def __getstate__(self):
+
+        # only save the parts of the arrays in use - along with their capacities so they are restored to the same size
+        state = dict(self.__dict__)
+        state["capacities"] = {"ants": len(self.id), "search_log": len(self.search_log_prev)}
+        for field in self.ant_fields:
+            state[field] = getattr(self, field)[:self.size].copy()
+
+        # save each current search as its steps in the order they were taken - the links are rebuilt on restore
+        state["search_log_steps"] = self.get_search_steps(np.flatnonzero(self.search_length[:self.size] > 0))
+        del state["search_log_prev"]
+        return state
+
+    def __setstate__(self, state):
+        capacities = state.pop("capacities")
+        self.__dict__.update(state)
+        for field in self.ant_fields:
+            setattr(self, field, grow_array(getattr(self, field), capacities["ants"]))
+
+        # link each ant's steps one after another in a fresh search log
+        searching = np.flatnonzero(self.search_length[:self.size] > 0)
+        lengths = self.search_length[searching]
+        self.search_log_size = int(lengths.sum())
+        self.search_log_prev = np.arange(self.search_log_size, dtype=np.int64) - 1
+        self.search_log_prev[np.cumsum(lengths) - lengths] = -1
+        self.search_tail[searching] = np.cumsum(lengths) - 1
+        capacity = max(capacities["search_log"], self.search_log_size)
+        self.search_log_steps = grow_array(self.search_log_steps, capacity)
+        self.search_log_prev = grow_array(self.search_log_prev, capacity)
+
+    def set_parameters(self, config_variables):
+        self.env_width = config_variables["environment_width"]
+        self.env_height = config_variables["environment_height"]
+        self.follow_prob = config_variables["follow_prob"]
+        self.max_lifespan = config_variables["max_lifespan"]
+        self.max_without_food = config_variables["max_without_food"]
+        self.time_till_hungry = config_variables["time_till_hungry"]
+        self.time_till_egg_hatch = config_variables["time_till_egg_hatch"]
+        self.full_time_till_larvae_become_pupa = self.time_till_egg_hatch + config_variables["time_till_larvae_become_pupa"]
+        self.full_time_till_pupa_become_mature_ants = self.full_time_till_larvae_become_pupa + config_variables["time_till_pupa_become_mature_ants"]
+        self.num_food_brought_back_to_nest = config_variables["num_food_brought_back_to_nest"]
+        self.use_kernels = numba_available and config_variables.get("use_numba", True)
+        self.random_streams = config_variables.get("random_streams", "shared")
+
+    def __len__(self):
+        return self.size - self.num_dead
+
+    def remove_dead_ants(self):
+
+        # move the living ants to the start of the arrays, keeping them in the same order
+        living = self.maturity_status[:self.size] != DEAD
+        num_living = int(living.sum())
+        for field in self.ant_fields:
+            array = getattr(self, field)
+            array[:num_living] = array[:self.size][living]
+        self.size = num_living
+        self.num_dead = 0
+        return living
+
+    def add_ant(self, ant_id, maturity_status, starting_x_loc, starting_y_loc):
+
+        # make room for the new ant if needed
+        if self.size == len(self.id):
+            for field in self.ant_fields:
+                setattr(self, field, grow_array(getattr(self, field), 2 * self.size))
+
+        # set the new ant's starting values
+        i = self.size
+        self.size += 1
+        for field in self.ant_fields:
+            getattr(self, field)[i] = 0
+        self.id[i] = ant_id
+        self.maturity_status[i] = maturity_status
+        self.x_loc[i] = starting_x_loc
+        self.y_loc[i] = starting_y_loc
+        self.food_scent_id[i] = -1
+        self.search_tail[i] = -1
+
+    def take_ants(self, ants):
+
+        # copy out the ants' values & searches, then drop them from the arrays - the paths they follow are left to the
+        # caller, so the reference counts in the trail store are unchanged
+        columns = {field: getattr(self, field)[ants].copy() for field in self.ant_fields if field != "search_tail"}
+        search_steps = self.get_search_steps(ants)
+        self.maturity_status[ants] = DEAD
+        self.search_tail[ants] = -1
+        self.search_length[ants] = 0
+        self.food_scent_id[ants] = -1
+        self.num_dead += len(ants)
+        return columns, search_steps
+
+    def put_ants(self, columns, search_steps):
+
+        # make room for the ants if needed
+        num_new = len(columns["id"])
+        if self.size + num_new > len(self.id):
+            for field in self.ant_fields:
+                setattr(self, field, grow_array(getattr(self, field), max(2 * len(self.id), self.size + num_new)))
+
+        # add the ants to the end of the arrays & link the steps of their searches one after another in the search log
+        # (the log is made room in first, so any compacting of it only sees the searches already there)
+        self.make_room_in_search_log(len(search_steps))
+        ants = np.arange(self.size, self.size + num_new)
+        self.size += num_new
+        for field, values in columns.items():
+            getattr(self, field)[ants] = values
+        lengths = self.search_length[ants]
+        entries = np.arange(self.search_log_size, self.search_log_size + len(search_steps))
+        self.search_log_steps[entries] = search_steps
+        self.search_log_prev[entries] = entries - 1
+        self.search_log_prev[entries[np.cumsum(lengths[lengths > 0]) - lengths[lengths > 0]]] = -1
+        self.search_tail[ants] = np.where(lengths > 0, self.search_log_size + np.cumsum(lengths) - 1, -1)
+        self.search_log_size += len(search_steps)
+        return ants
+
+    def get_mature_ants(self):
+        mature = self.maturity_status[:self.size] == MATURE
+        return self.x_loc[:self.size][mature], self.y_loc[:self.size][mature], self.carrying_status[:self.size][mature]
+
+    # =================
+    # | PATH HANDLING |
+    # =================
+    def set_food_scent(self, ants, path_ids, trail_store):
+
+        # swap the paths in the ant hill's trail store that the ants follow, keeping the reference counts up to date
+        path_ids = np.broadcast_to(np.asarray(path_ids, dtype=np.int64), np.shape(ants))
+        trail_store.acquire(path_ids[path_ids >= 0])
+        old_path_ids = self.food_scent_id[ants]
+        trail_store.release(old_path_ids[old_path_ids >= 0])
+        self.food_scent_id[ants] = path_ids
+        self.food_scent_length[ants] = np.where(path_ids >= 0, trail_store.lengths[path_ids], 0)
+
+    def make_room_in_search_log(self, num_new):
+
+        # make room in the search log if needed - dropping old searches first, then resizing it to twice what is in use
+        if self.search_log_size + num_new > len(self.search_log_prev):
+            self.compact_search_log()
+            in_use = self.search_log_size + num_new
+            if not (2 * in_use <= len(self.search_log_prev) <= 8 * in_use):
+                self.search_log_steps = resize_array(self.search_log_steps[:self.search_log_size], 2 * in_use)
+                self.search_log_prev = resize_array(self.search_log_prev[:self.search_log_size], 2 * in_use)
+
+    def log_search_steps(self, ants, steps):
+
+        # link each new step to the ant's previous step
+        num_new = len(ants)
+        self.make_room_in_search_log(num_new)
+        entries = np.arange(self.search_log_size, self.search_log_size + num_new)
+        self.search_log_steps[entries] = steps
+        self.search_log_prev[entries] = self.search_tail[ants]
+        self.search_tail[ants] = entries
+        self.search_length[ants] += 1
+        self.search_log_size += num_new
+
+    def trace_search_logs(self, ants):
+
+        # walk back through each ant's search log at the same time - returns the entries from the latest step to the first
+        if self.use_kernels:
+            return trace_search_logs(np.asarray(ants, dtype=np.int64), self.search_tail, self.search_length, self.search_log_prev)
+        lengths = self.search_length[ants]
+        offsets = np.cumsum(lengths) - lengths
+        entries = np.zeros(int(lengths.sum()), dtype=np.int64)
+        cursors = self.search_tail[ants].copy()
+        for step in range(int(lengths.max(initial=0))):
+            walking = step < lengths
+            entries[offsets[walking] + step] = cursors[walking]
+            cursors[walking] = self.search_log_prev[cursors[walking]]
+        return entries, lengths
+
+    def get_search_steps(self, ants):
+
+        # the steps of each ant's current search in the order they were taken - one ant after another
+        entries, lengths = self.trace_search_logs(ants)
+        latest = np.repeat(np.cumsum(lengths) - 1, lengths)
+        first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self.search_log_steps[entries[latest + first - np.arange(len(entries))]]
+
+    def compact_search_log(self):
+
+        # find the log entries that are still part of an ant's current search
+        searching = np.flatnonzero(self.search_length[:self.size] > 0)
+        live_entries, lengths = self.trace_search_logs(searching)
+        live = np.zeros(self.search_log_size, dtype=bool)
+        live[live_entries] = True
+
+        # move the live entries to the start of the log & re-point the links between them
+        new_index = np.cumsum(live) - 1
+        kept_prev = self.search_log_prev[:self.search_log_size][live]
+        self.search_log_steps[:live.sum()] = self.search_log_steps[:self.search_log_size][live]
+        self.search_log_prev[:live.sum()] = np.where(kept_prev >= 0, new_index[kept_prev], -1)
+        self.search_tail[searching] = new_index[self.search_tail[searching]]
+        self.search_log_size = int(live.sum())
+
+    def reset_search(self, i):
+        self.search_tail[i] = -1
+        self.search_length[i] = 0
+
+    # =======================
+    # | UPDATING THE COLONY |
+    # =======================
+    def eat_from_anthill_if_hungry(self, i, anthill, amount_eaten=1):
+
+        # if it's hungry & there is food in the ant hill, eat
+        if self.time_since_eaten[i] > self.time_till_hungry and anthill.food_count >= amount_eaten:
+            anthill.food_count -= amount_eaten
+            self.time_since_eaten[i] = 0
+        else:
+            self.time_since_eaten[i] += 1
+
+    def update_ants_at_anthill(self, ants, brood_hungry, departing, anthill, mature_rank, randoms, profiler=None):
+
+        # these ants share the ant hill's food & trails so they are updated in the same order as the ant list
+        follow_draws, trail_draws = randoms.follow.tolist(), randoms.trail.tolist()
+        for i in ants:
+            if brood_hungry[i]:
+                amount_it_will_eat = self.time_since_born[i] / self.full_time_till_pupa_become_mature_ants
+                self.eat_from_anthill_if_hungry(i, anthill, amount_it_will_eat)
+                if profiler is not None:
+                    profiler.lap("lifecycle")
+
+            elif departing[i]:
+                # restart the current search & eat if hungry
+                self.reset_search(i)
+                self.eat_from_anthill_if_hungry(i, anthill)
+
+                # choose to maybe follow a trail
+                if anthill.has_active_trails():
+                    self.following_status[i] = 1 if follow_draws[mature_rank[i]] < self.follow_prob else 0
+                    trail_id = anthill.get_trail(trail_draws[mature_rank[i]]) if self.following_status[i] and anthill.pheromones is None else -1
+                    self.set_food_scent(i, trail_id, anthill.trail_store)
+                    self.count_steps_out[i] = 0
+                    if profiler is not None and trail_id != -1:
+                        profiler.count("trails_sampled")
+                if profiler is not None:
+                    profiler.lap("departing")
+
+            else:
+                # unload the food
+                anthill.food_count += self.num_food_carrying[i]
+                anthill.food_brought_back += self.num_food_carrying[i]
+                self.num_food_carrying[i] = 0
+                self.carrying_status[i] = 0
+                self.count_steps_back[i] = 0
+                self.eat_from_anthill_if_hungry(i, anthill)
+
+                # update the trail list associated with the anthill - a followed trail that has since
+                # fully decayed is laid again as a new trail (the pheromone on the map was laid on the way home)
+                if anthill.pheromones is None:
+                    if self.following_status[i] and anthill.has_trail(self.food_scent_id[i]):
+                        anthill.increase_trail_strength(self.food_scent_id[i])
+                    else:
+                        anthill.add_trail(self.food_scent_id[i])
+                        if profiler is not None:
+                            profiler.count("trails_created")
+
+                # reset variables for next run
+                self.following_status[i] = 0
+                self.set_food_scent(i, -1, anthill.trail_store)
+                self.reset_search(i)
+                if profiler is not None:
+                    profiler.count("food_unloaded")
+                    profiler.lap("unloading")
+
+    def move_ants_towards_food(self, ants, envir, anthill, mature_rank, randoms, profiler=None):
+
+        # move the ants one step & those that land on food eat & pick up what they can
+        ants = self.step_ants_towards_food(ants, anthill, mature_rank, randoms, profiler)
+        self.find_food(ants, envir, anthill, profiler)
+        if profiler is not None:
+            profiler.lap("food_pickup")
+
+    def step_ants_towards_food(self, ants, anthill, mature_rank, randoms, profiler=None):
+
+        # ants that have reached the end of their trail (or the strongest pheromone around) stop following it & wait
+        trail_store = anthill.trail_store
+        following = self.following_status[ants].astype(bool)
+        if anthill.pheromones is not None:
+            followers = ants[following]
+            uphill_steps, found = anthill.pheromones.get_uphill_steps(self.x_loc[followers], self.y_loc[followers], randoms.trail[mature_rank[followers]])
+            trail_ended = following.copy()
+            trail_ended[following] = ~found
+        else:
+            trail_ended = following & (self.count_steps_out[ants] == self.food_scent_length[ants])
+        ended = ants[trail_ended]
+        self.following_status[ended] = 0
+        self.count_steps_out[ended] = 0
+        self.set_food_scent(ended, -1, trail_store)
+        self.time_since_eaten[ended] += 1
+        ants = ants[~trail_ended]
+        following = following[~trail_ended]
+
+        # the followers take the next step on their trail (walking the trail backwards from the ant hill) - or uphill
+        steps = np.zeros((len(ants), 2), dtype=np.int64)
+        followers = ants[following]
+        if anthill.pheromones is not None:
+            steps[following] = uphill_steps
+        else:
+            self.count_steps_out[followers] += 1
+            trail_step = trail_store.offsets[self.food_scent_id[followers]] + self.food_scent_length[followers] - self.count_steps_out[followers]
+            steps[following] = -trail_store.steps[trail_step]
+        if profiler is not None:
+            profiler.lap("following")
+
+        # the searchers take their random step - kept on the screen
+        searchers = ants[~following]
+        random_steps = randoms.steps[mature_rank[searchers]]
+        steps[~following, 0] = np.clip(self.x_loc[searchers] + random_steps[:, 0], 0, self.env_width - 1) - self.x_loc[searchers]
+        steps[~following, 1] = np.clip(self.y_loc[searchers] + random_steps[:, 1], 0, self.env_height - 1) - self.y_loc[searchers]
+
+        # keep track of the ants movements & move them
+        self.log_search_steps(ants, steps)
+        self.x_loc[ants] += steps[:, 0]
+        self.y_loc[ants] += steps[:, 1]
+        if profiler is not None:
+            profiler.count("ants_moved", len(ants))
+            profiler.lap("searching")
+        return ants
+
+    def find_food(self, ants, envir, anthill, profiler=None, first_row=0):
+
+        # the ants eat & pick up the food one at a time in the compiled kernel
+        # (envir may hold only a band of the map's rows starting at first_row - the ants' locations are on the whole map)
+        if self.use_kernels:
+            food_to_pick_up = np.zeros(len(ants), dtype=np.int64)
+            y_loc = self.y_loc - first_row if first_row else self.y_loc
+            share_food(ants, self.x_loc, y_loc, self.time_since_eaten, envir.reshape(-1), self.env_width, anthill.x_loc, anthill.y_loc - first_row,
+                       self.time_till_hungry, self.num_food_brought_back_to_nest, food_to_pick_up)
+            pickers = food_to_pick_up > 0
+            self.pick_up_food(ants[pickers], food_to_pick_up[pickers], anthill, profiler)
+            return
+
+        # only ants that land on food outside the ant hill can find it
+        x, y = self.x_loc[ants], self.y_loc[ants]
+        on_food = (envir[y - first_row, x] > 0) & ~((x == anthill.x_loc) & (y == anthill.y_loc))
+        self.time_since_eaten[ants[~on_food]] += 1
+        ants = ants[on_food]
+
+        # sort the ants by the cell they are on - ants on the same cell share it in the order they are given (the ant list's)
+        cells = (self.y_loc[ants] - first_row) * self.env_width + self.x_loc[ants]
+        order = np.argsort(cells, kind="stable")
+        ants, cells = ants[order], cells[order]
+
+        # work out how much food is left on the cell by the time each ant gets to it
+        hungry = self.time_since_eaten[ants] > self.time_till_hungry
+        wanted = hungry + self.num_food_brought_back_to_nest
+        wanted_before = np.cumsum(wanted) - wanted
+        first_on_cell = np.ones(len(cells), dtype=bool)
+        first_on_cell[1:] = cells[1:] != cells[:-1]
+        wanted_before -= np.maximum.accumulate(np.where(first_on_cell, wanted_before, 0))
+        envir_flat = envir.reshape(-1)
+        food_left = np.maximum(envir_flat[cells] - wanted_before, 0)
+
+        # ants that arrive after the food is gone find nothing
+        self.time_since_eaten[ants[food_left <= 0]] += 1
+        got_food = food_left > 0
+        ants, cells, hungry, food_left = ants[got_food], cells[got_food], hungry[got_food], food_left[got_food]
+
+        # eat one food if hungry
+        self.time_since_eaten[ants] = np.where(hungry, 0, self.time_since_eaten[ants] + 1)
+        food_left -= hungry
+
+        # if there is still food left, pick it up and bring it home
+        food_to_pick_up = np.minimum(food_left, self.num_food_brought_back_to_nest)
+        np.subtract.at(envir_flat, cells, (hungry + np.maximum(food_to_pick_up, 0)).astype(envir.dtype))
+        pickers = food_to_pick_up > 0
+        self.pick_up_food(ants[pickers], food_to_pick_up[pickers], anthill, profiler)
+
+    def pick_up_food(self, ants, food_to_pick_up, anthill, profiler=None):
+
+        # the ants carry the food they picked up home
+        self.num_food_carrying[ants] = food_to_pick_up
+        self.carrying_status[ants] = 1
+        if profiler is not None:
+            profiler.count("food_picked_up", len(ants))
+        self.count_steps_back[ants] = 0
+
+        # check if this is the food the followers were supposed to have picked up - followers of the pheromone on the map find their own way home
+        followers = self.following_status[ants].astype(bool)
+        off_trail = followers & ((anthill.pheromones is not None) | (self.count_steps_out[ants] != self.food_scent_length[ants]))
+        self.following_status[ants[off_trail]] = 0
+
+        # set the searchers trail home - their search retraced backwards (added to the store in the order of the ant list)
+        searchers = np.sort(ants[~followers | off_trail])
+        if len(searchers) == 0:
+            return
+        entries, lengths = self.trace_search_logs(searchers)
+        trail_store = anthill.trail_store
+        if anthill.return_path_compression == "none":
+            path_ids = trail_store.reserve(lengths)
+            trail_store.steps[trail_store.offsets[path_ids[0]]:trail_store.size] = -self.search_log_steps[entries]
+            anthill.num_search_steps += int(lengths.sum())
+            anthill.num_return_steps += int(lengths.sum())
+            self.set_food_scent(searchers, path_ids, trail_store)
+        else:
+            # shortened ways home are worked out one ant at a time - each is taken up by its ant as soon as it is added,
+            # as adding the next one can compact the store & drop the paths no ant follows yet
+            search_ends = np.cumsum(lengths)
+            for ant, end, length in zip(searchers, search_ends, lengths):
+                path_id = anthill.add_return_path(self.search_log_steps[entries[end - length:end][::-1]])
+                self.set_food_scent(ant, path_id, trail_store)
+
+    def move_ants_towards_anthill(self, ants, anthill, profiler=None):
+
+        # get the next increments back to the ant hill & move the ants in this direction
+        trail_store = anthill.trail_store
+        self.count_steps_back[ants] += 1
+        if anthill.pheromones is not None:
+            anthill.pheromones.lay_many(self.x_loc[ants], self.y_loc[ants], self.food_scent_length[ants] - self.count_steps_back[ants] + 1,
+                                        self.food_scent_length[ants])
+        path_step = trail_store.offsets[self.food_scent_id[ants]] + self.count_steps_back[ants] - 1
+        self.x_loc[ants] += trail_store.steps[path_step, 0]
+        self.y_loc[ants] += trail_store.steps[path_step, 1]
+        self.time_since_eaten[ants] += 1
+        if profiler is not None:
+            profiler.count("ants_moved", len(ants))
+            profiler.lap("returning")
+
+    def develop_ants(self):
+
+        n = self.size
+        maturity_status = self.maturity_status[:n]
+        time_since_born = self.time_since_born[:n]
+        time_since_eaten = self.time_since_eaten[:n]
+        time_since_born[maturity_status != DEAD] += 1
+
+        # check if the ants are now dead from starvation or old age
+        dying = (maturity_status != DEAD) & ((time_since_eaten > self.max_without_food) | (time_since_born > self.max_lifespan))
+        maturity_status[dying] = DEAD
+
+        # count the ants in each stage before they develop
+        mature = maturity_status == MATURE
+        eggs = maturity_status == EGG
+        larvae = maturity_status == LARVAE
+        pupa = maturity_status == PUPA
+        counts = (int(mature.sum()), int(eggs.sum()), int(larvae.sum()), int(pupa.sum()))
+
+        # develop the immature ants
+        maturity_status[eggs & (time_since_born > self.time_till_egg_hatch)] = LARVAE
+        maturity_status[larvae & (time_since_born > self.full_time_till_larvae_become_pupa)] = PUPA
+        maturity_status[pupa & (time_since_born > self.full_time_till_pupa_become_mature_ants)] = MATURE
+
+        # the immature ants that aren't eggs eat if they're hungry
+        brood_eating = ~mature & (maturity_status != EGG) & (maturity_status != DEAD)
+        brood_hungry = brood_eating & (time_since_eaten > self.time_till_hungry)
+        time_since_eaten[brood_eating & ~brood_hungry] += 1
+        return dying, mature, brood_hungry, counts
+
+    def age_ants(self, trail_store):
+
+        # age & develop the ants - in the compiled kernel or as arrays
+        n = self.size
+        if self.use_kernels:
+            dying, mature, brood_hungry = np.empty(n, dtype=bool), np.empty(n, dtype=bool), np.empty(n, dtype=bool)
+            stage_counts = np.zeros(4, dtype=np.int64)
+            update_lifecycle(self.maturity_status[:n], self.time_since_born[:n], self.time_since_eaten[:n], self.max_without_food,
+                             self.max_lifespan, self.time_till_egg_hatch, self.full_time_till_larvae_become_pupa,
+                             self.full_time_till_pupa_become_mature_ants, self.time_till_hungry, dying, mature, brood_hungry, stage_counts)
+            counts = tuple(stage_counts.tolist())
+        else:
+            dying, mature, brood_hungry, counts = self.develop_ants()
+
+        # drop the search & the path of the ants that have died
+        self.search_length[:n][dying] = 0
+        self.set_food_scent(np.flatnonzero(dying), -1, trail_store)
+        self.num_dead += int(dying.sum())
+        return dying, mature, brood_hungry, counts
+
+    def update_ants(self, anthill, envir, randoms, profiler=None, occupancy=None, colony_index=0):
+
+        # drop the dead ants once they make up a quarter of the arrays
+        # (random numbers drawn for each entry of the arrays move with the living ants)
+        if 4 * self.num_dead > self.size:
+            living = self.remove_dead_ants()
+            if self.random_streams == "counter":
+                randoms = randoms._make(values[living] for values in randoms)
+
+        # age & develop the ants
+        n = self.size
+        if occupancy is not None:
+            was_mature = self.maturity_status[:n] == MATURE
+        dying, mature, brood_hungry, counts = self.age_ants(anthill.trail_store)
+        anthill.dead_ant_count += int(dying.sum())
+
+        # count the ants that have matured onto the map & take off the mature ants that died
+        if occupancy is not None:
+            died, matured = np.flatnonzero(dying & was_mature), np.flatnonzero((self.maturity_status[:n] == MATURE) & ~mature)
+            occupancy.remove_many(colony_index, self.x_loc[died], self.y_loc[died])
+            occupancy.add_many(colony_index, self.x_loc[matured], self.y_loc[matured])
+        if profiler is not None:
+            profiler.lap("lifecycle")
+
+        # split the mature ants by what they are doing
+        carrying = self.carrying_status[:n].astype(bool)
+        at_anthill = (self.x_loc[:n] == anthill.x_loc) & (self.y_loc[:n] == anthill.y_loc)
+        departing = mature & ~carrying & at_anthill
+        going_home = np.flatnonzero(mature & carrying & ~at_anthill)
+        searching = np.flatnonzero(mature & ~carrying)
+
+        # each mature ant uses the random numbers drawn for its place among the mature ants - or for its own entry in the
+        # arrays when they come from the counter-based streams
+        mature_rank = np.cumsum(mature) - 1 if self.random_streams == "shared" else np.arange(n)
+
+        # update the ants that use the ant hill's food & trails - then move the rest
+        at_anthill_events = np.flatnonzero(brood_hungry | (mature & at_anthill))
+        self.update_ants_at_anthill(at_anthill_events, brood_hungry, departing, anthill, mature_rank, randoms, profiler)
+        if occupancy is not None:
+            moving = np.concatenate([searching, going_home])
+            old_x_locs, old_y_locs = self.x_loc[moving], self.y_loc[moving]
+        self.move_ants_towards_food(searching, envir, anthill, mature_rank, randoms, profiler)
+        self.move_ants_towards_anthill(going_home, anthill, profiler)
+        if occupancy is not None:
+            occupancy.move_many(colony_index, old_x_locs, old_y_locs, self.x_loc[moving], self.y_loc[moving])
+
+        return counts